@@ -11,6 +11,28 @@ var expanded = false;
 var sidebarOpened = false;
 var tabs = [];
 
+/*
+ * Messages to Python go through one JSON channel. Messages sent in the same
+ * turn of the event loop are batched into a single pycmd() call:
+ *   bridge:{"v": 1, "messages": [{"action": ..., "args": {...}}, ...]}
+ * Python passes each message's args to the handler registered for its action.
+ */
+var BRIDGE_VERSION = 1;
+var bridgeQueue = [];
+
+function sendToPython(action, args) {
+    bridgeQueue.push({ action: action, args: args || {} });
+    if (bridgeQueue.length === 1) {
+        Promise.resolve().then(flushBridge);
+    }
+}
+
+function flushBridge() {
+    let messages = bridgeQueue;
+    bridgeQueue = [];
+    pycmd('bridge:' + JSON.stringify({ v: BRIDGE_VERSION, messages: messages }));
+}
+
 /**
  * Load image HTML content
  * @param {string} html - The HTML content to load
@@ -131,7 +153,7 @@ function getDefExport(event, dictName) {
     } else {
         definition = cleanTermDef(termTitle.textContent) + '<br>' + definition.replace(/\n/g, '<br>');
     }
-    pycmd('addDef:' + dictName + '◳◴' + wordDefinition[0] + '◳◴' + definition);
+    sendToPython('addDef', { dictName: dictName, word: wordDefinition[0], text: definition });
 }
 
 /**
@@ -148,7 +170,7 @@ function getImageExport(event, dictName) {
         for (var i = 0; i < selImgs.length; i++) {
             urls.push(selImgs[i].dataset.url)
         }
-        pycmd('imgExport:' + word + '◳◴' + JSON.stringify(urls));
+        sendToPython('imgExport', { word: word, urls: urls });
     }
 }
 
@@ -203,7 +225,7 @@ function clipText(ev) {
         var wordDefinition = getWordPron(dictionaryElement, termBody, termTitle)
         definition = wordDefinition + definition
     }
-    pycmd('clipped:' + definition.replace('&lt', '<').replace('&gt;', '>'));
+    sendToPython('clipped', { text: definition.replace('&lt', '<').replace('&gt;', '>') });
 }
 
 /**
@@ -223,7 +245,7 @@ function getDefForField(event, dictName) {
     } else {
         definition = cleanTermDef(termTitle.textContent) + '<br>' + definition.replace(/\n/g, '<br>')
     }
-    pycmd('sendToField:' + dictName + '◳◴' + definition);
+    sendToPython('sendToField', { name: dictName, definition: definition });
 }
 
 /**
@@ -242,7 +264,7 @@ function getImageForField(event, dictName) {
             }
         }
         if (urls.length > 0) {
-            pycmd('sendImgToField:' + JSON.stringify(urls));
+            sendToPython('sendImgToField', { urls: urls });
         }
     }
 }
@@ -271,6 +293,10 @@ function navigateDict(ev, next, def = false) {
     if (next) {
         var nextEl = dict;
         while (nextEl = nextEl.nextElementSibling) {
+            if (def && nextEl.classList && nextEl.classList.contains('entryPage')) {
+                scrollToEntry(w, nextEl.parentElement, nextEl.dataset.start);
+                break;
+            }
             if (nextEl.classList && nextEl.classList.contains(wanted)) {
                 w.scrollTop = nextEl.offsetTop;
                 break;
@@ -279,6 +305,10 @@ function navigateDict(ev, next, def = false) {
     } else if (parseInt(dict.dataset.index) > 0) {
         var nextEl = dict;
         while (nextEl = nextEl.previousElementSibling) {
+            if (def && nextEl.classList && nextEl.classList.contains('entryPage')) {
+                scrollToEntry(w, nextEl.parentElement, parseInt(nextEl.dataset.end) - 1);
+                break;
+            }
             if (nextEl.classList && nextEl.classList.contains(wanted)) {
                 w.scrollTop = nextEl.offsetTop;
                 break;
@@ -437,6 +467,71 @@ document.body.addEventListener("click", function (ev) {
     handleBodyClick(ev);
 }, false);
 
+/**
+ * Get the dictionary name of the title block an entry belongs to
+ */
+function getEntryDictName(el) {
+    var dictEl = el.closest('.termPronunciation');
+    while (dictEl && !dictEl.classList.contains('dictionaryTitleBlock')) {
+        dictEl = dictEl.previousElementSibling;
+    }
+    return dictEl ? dictEl.dataset.dictname : '';
+}
+
+/**
+ * Handlers of the entry and dictionary tool buttons, by class name.
+ * The buttons are rendered without inline handlers so they are only defined here.
+ */
+var toolHandlers = {
+    ankiExportButton: function (ev, tool) { ankiExport(ev, getEntryDictName(tool)); },
+    clipper: function (ev) { clipText(ev); },
+    sendToField: function (ev, tool) { sendToField(ev, getEntryDictName(tool)); },
+    prevDef: function (ev) { navigateDef(ev, false); },
+    nextDef: function (ev) { navigateDef(ev, true); },
+    prevDict: function (ev) { navigateDict(ev, false); },
+    nextDict: function (ev) { navigateDict(ev, true); }
+};
+
+var toolSelector = '.' + Object.keys(toolHandlers).join(', .');
+
+/**
+ * Tool button tooltips, shown when the results page was rendered with tooltips enabled
+ */
+var toolTips = {
+    ankiExportButton: "Add this definition, or any selected text and this definition's header to the card exporter (opens the card exporter if it is not yet opened).",
+    clipper: "Copy this definition, or any selected text to the clipboard.",
+    sendToField: "Send this definition, or any selected text and this definition's header to the card exporter to this dictionary's target fields. It will send it to the current target window, be it an Editor window, or the Review window."
+};
+
+function findTool(ev) {
+    if (!ev.target.closest) return null;
+    var tool = ev.target.closest(toolSelector);
+    if (!tool || !tool.closest('.mainDictDisplay')) return null;
+    return tool;
+}
+
+document.body.addEventListener("click", function (ev) {
+    var tool = findTool(ev);
+    if (!tool) return;
+    for (var name in toolHandlers) {
+        if (tool.classList.contains(name)) {
+            toolHandlers[name](ev, tool);
+            return;
+        }
+    }
+}, false);
+
+document.body.addEventListener("mouseover", function (ev) {
+    var tool = findTool(ev);
+    if (!tool || tool.title || tool.closest('.mainDictDisplay').dataset.tooltips !== 'true') return;
+    for (var name in toolTips) {
+        if (tool.classList.contains(name)) {
+            tool.title = toolTips[name];
+            return;
+        }
+    }
+}, false);
+
 /**
  * Navigate to dictionary or entry
  */
@@ -445,7 +540,8 @@ function navDictOrEntry() {
     var mD = this.closest('.definitionSideBar').nextSibling;
     var idx = this.dataset.index;
     if (this.nodeName === 'LI') {
-        var el = mD.querySelectorAll('.termPronunciation[data-index="' + idx + '"]')[0];
+        scrollToEntry(w, mD, idx);
+        return;
     } else {
         var el = mD.querySelectorAll('.dictionaryTitleBlock[data-index="' + idx + '"]')[0];
     }
@@ -509,6 +605,7 @@ function focusTab(tab) {
     var index = parseInt(tab.dataset.index)
     tab.classList.add("active");
     tabs[index][1].style.display = "block";
+    tabs[index][1].lastFocused = Date.now();
     document.getElementById('defBox').scrollTop = tabs[index][2]
 }
 
@@ -518,8 +615,12 @@ function focusTab(tab) {
 function loadTab() {
     removeFocus();
     focusTab(this);
+    var content = tabs[parseInt(this.dataset.index)][1];
+    if (content.dataset.evicted) {
+        sendToPython('restoreTab', { searchId: parseInt(content.dataset.searchId) });
+    }
     resizer();
-    pycmd('updateTerm:' + this.textContent);
+    sendToPython('updateTerm', { term: this.textContent });
 }
 
 /**
@@ -733,7 +834,8 @@ function loadMoreImages(button, term) {
         
         // Call Python backend to get more images
         if (typeof pycmd !== 'undefined') {
-            pycmd('getMoreImages::' + term);
+            var block = button.closest('.imageBlock');
+            sendToPython('moreImages', { search_term: term, id_name: block ? block.id : '' });
         } else {
             console.error('pycmd not available');
             button.disabled = false;
@@ -747,90 +849,66 @@ function loadMoreImages(button, term) {
 }
 
 /**
- * Add new images to the existing image container
- * Called from Python after more images are loaded
+ * Find the image strip of an image block, or the first one on the page
+ */
+function getImageContainer(idName) {
+    var block = idName ? document.getElementById(idName) : null;
+    return (block || document).querySelector('.imageCont.horizontal-layout');
+}
+
+/**
+ * Add one thumbnail to an image strip, keeping the strip in search order
+ * Called from Python as each image finishes downloading
  */
-function appendNewImages(html) {
+function appendImage(html, idName, rank) {
     try {
-        // console.log('appendNewImages called');
-        
-        // Find the image container
-        const container = document.querySelector('.imageCont.horizontal-layout');
+        const container = getImageContainer(idName);
         if (!container) {
-            console.error('Image container not found');
+            console.warn('Image container not found:', idName);
             return false;
         }
-        
-        // Store the current scroll position
-        const scrollContainer = container.closest('#defBox') || container.parentElement;
-        const currentScrollTop = scrollContainer ? scrollContainer.scrollTop : 0;
-        
-        // Create a temporary div to parse the new HTML
         const tempDiv = document.createElement('div');
         tempDiv.innerHTML = html;
-        
-        // Find new images in the temporary div
-        const newImages = tempDiv.querySelectorAll('.imgBox');
-        
-        // Append new images to the existing container
-        newImages.forEach((img, index) => {
-            // Reset animation for new images
-            img.style.animationDelay = `${(index + 1) * 0.1}s`;
-            container.appendChild(img);
-        });
-        
-        // Re-enable the Load More button if it exists in the new HTML
-        const newButton = tempDiv.querySelector('.imageLoader');
-        if (newButton) {
-            // Replace the old button with the new one
-            const oldButton = document.querySelector('.imageLoader');
-            if (oldButton) {
-                oldButton.parentNode.replaceChild(newButton.cloneNode(true), oldButton);
-            }
-        } else {
-            // If no new button found, re-enable existing button
-            const existingButton = document.querySelector('.imageLoader');
-            if (existingButton) {
-                existingButton.disabled = false;
-                existingButton.textContent = 'Load More';
-            }
-        }
-        
-        // Ensure the container maintains scrolling capability
-        if (scrollContainer) {
-            scrollContainer.style.overflowY = 'auto';
-            scrollContainer.style.overflowX = 'hidden';
-        }
-        
-        // Trigger a resize to ensure layout is correct
-        if (typeof resizer === 'function') {
-            resizer();
+        const box = tempDiv.firstElementChild;
+        if (!box) {
+            return false;
         }
-        
-        // Ensure scrolling is still enabled on the container
-        const parentScrollContainer = container.closest('#defBox') || 
-                               container.closest('.mainDictDisplay') || 
-                               document.getElementById('defBox');
-        if (parentScrollContainer) {
-            parentScrollContainer.style.overflowY = 'auto';
-            parentScrollContainer.style.overflowX = 'hidden';
+        let next = null;
+        for (const other of container.children) {
+            if (Number(other.dataset.rank) > rank) {
+                next = other;
+                break;
+            }
         }
-        
-        // console.log('Successfully appended', newImages.length, 'new images');
+        container.insertBefore(box, next);
         return true;
     } catch (error) {
-        console.error('Error in appendNewImages:', error);
-        
-        // Re-enable the Load More button on error
-        const button = document.querySelector('.imageLoader');
-        if (button) {
-            button.disabled = false;
-            button.textContent = 'Load More';
-        }
+        console.error('Error in appendImage:', error);
         return false;
     }
 }
 
+/**
+ * Called from Python once an image lookup is complete. A pending Load More
+ * button is re-enabled, or disabled for good when nothing more was found.
+ */
+function finishImages(idName, found) {
+    const block = idName ? document.getElementById(idName) : null;
+    const button = (block || document).querySelector('.imageLoader');
+    if (!button || !button.disabled) {
+        return;
+    }
+    if (found > 0) {
+        button.disabled = false;
+        button.textContent = 'Load More';
+    } else {
+        button.textContent = 'No more images';
+    }
+    if (typeof resizer === 'function') {
+        resizer();
+    }
+}
+
 /**
  * Wait for pycmd to load and signal ready
  */
@@ -839,7 +917,7 @@ function awaitPycmdToLoad() {
         if (pycmd) {
             clearInterval(awaitPycmd);
             // console.log("AnkiDictionaryLoaded");
-            pycmd('AnkiDictionaryLoaded')
+            sendToPython('loaded');
         }
     }, 5);
 }
@@ -852,7 +930,7 @@ document.addEventListener('DOMContentLoaded', awaitPycmdToLoad, false);
 /**
  * Add a new tab with search results
  */
-function addNewTab(html, term, singleTab) {
+function addNewTab(html, term, singleTab, searchId) {
     try {
         // Handle undefined parameters gracefully
         if (typeof html === 'undefined' || html === null) {
@@ -887,11 +965,13 @@ function addNewTab(html, term, singleTab) {
             // Single tab mode: replace current content
             let currentTab = fetchCurrentTab(term);
             let currentContent = fetchCurrentTabContent(html);
+            setSearchId(currentContent, searchId);
             
             if (!currentTab) {
                 // No tabs exist, create the first one
                 let newTab = fetchNewTab(term);
                 let newContent = fetchNewTabContent(html);
+                setSearchId(newContent, searchId);
                 
                 tabsContainer.appendChild(newTab);
                 defBox.appendChild(newContent);
@@ -905,6 +985,7 @@ function addNewTab(html, term, singleTab) {
             
             let newTab = fetchNewTab(term);
             let newContent = fetchNewTabContent(html);
+            setSearchId(newContent, searchId);
             
             tabsContainer.appendChild(newTab);
             defBox.appendChild(newContent);
@@ -912,6 +993,8 @@ function addNewTab(html, term, singleTab) {
             tabs.push([newTab, newContent, 0]);
             removeFocus();
             focusTab(newTab);
+            newContent.approxBytes = html.length * 2;
+            enforceTabBudget();
         }
         
         // Initialize any interactive elements
@@ -933,6 +1016,291 @@ function addNewTab(html, term, singleTab) {
     }
 }
 
+/**
+ * Remember which lookup a tab shows, so results streamed in later find it
+ */
+function setSearchId(content, searchId) {
+    if (typeof searchId === 'undefined') {
+        delete content.dataset.searchId;
+    } else {
+        content.dataset.searchId = searchId;
+    }
+    content.loadedPages = [];
+    content.pendingEntry = null;
+    observeEntryPages(content);
+}
+
+/*
+ * Only a window of a tab's entries is kept in the page. The others are
+ * .entryPage placeholders that are requested from Python (entryPage:) as
+ * they come near the view, and loaded pages far from the view are turned
+ * back into placeholders.
+ */
+var ENTRY_HEIGHT_ESTIMATE = 80;
+var MAX_LOADED_PAGES = 6;
+
+var entryPageObserver = null;
+
+function getEntryPageObserver() {
+    if (!entryPageObserver) {
+        entryPageObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    requestEntryPage(entry.target);
+                }
+            });
+        }, { root: document.getElementById('defBox'), rootMargin: '800px 0px' });
+    }
+    return entryPageObserver;
+}
+
+/**
+ * Size a tab's new placeholders and start watching them
+ */
+function observeEntryPages(content) {
+    let observer = getEntryPageObserver();
+    content.querySelectorAll('.entryPage').forEach(page => {
+        if (!page.style.height) {
+            page.style.height = (parseInt(page.dataset.count) * ENTRY_HEIGHT_ESTIMATE) + 'px';
+        }
+        observer.observe(page);
+    });
+}
+
+function requestEntryPage(page) {
+    if (page.dataset.requested) return;
+    let content = page.closest('.tabContent');
+    if (!content || !content.dataset.searchId) return;
+    page.dataset.requested = 'true';
+    sendToPython('entryPage', {
+        searchId: parseInt(content.dataset.searchId),
+        start: parseInt(page.dataset.start)
+    });
+}
+
+/**
+ * Scroll to an entry, requesting its page first if it is not loaded
+ */
+function scrollToEntry(w, mD, idx) {
+    let el = mD.querySelector('.termPronunciation[data-index="' + idx + '"]');
+    if (el) {
+        w.scrollTop = el.offsetTop;
+        return;
+    }
+    idx = parseInt(idx);
+    let pages = mD.getElementsByClassName('entryPage');
+    for (let i = 0; i < pages.length; i++) {
+        let page = pages[i];
+        if (parseInt(page.dataset.start) <= idx && idx < parseInt(page.dataset.end)) {
+            mD.closest('.tabContent').pendingEntry = idx;
+            w.scrollTop = page.offsetTop;
+            requestEntryPage(page);
+            return;
+        }
+    }
+}
+
+/**
+ * Replace a placeholder with the entries Python rendered for it
+ */
+function loadEntryPage(searchId, start, html) {
+    let content = document.querySelector('.tabContent[data-search-id="' + searchId + '"]');
+    if (!content) return;
+    let page = content.querySelector('.entryPage[data-start="' + start + '"]');
+    if (!page) return;
+    getEntryPageObserver().unobserve(page);
+    page.insertAdjacentHTML('beforebegin', html);
+    let end = parseInt(page.dataset.end);
+    page.remove();
+    content.loadedPages.push({ start: start, end: end, bytes: html.length * 2 });
+    content.approxBytes = (content.approxBytes || 0) + html.length * 2;
+    evictEntryPages(content);
+    let idx = content.pendingEntry;
+    if (idx !== null && start <= idx && idx < end) {
+        content.pendingEntry = null;
+        let el = content.querySelector('.termPronunciation[data-index="' + idx + '"]');
+        if (el) el.closest('#defBox').scrollTop = el.offsetTop;
+    }
+}
+
+/**
+ * Show in a placeholder that its entries can no longer be loaded
+ */
+function expireEntryPage(searchId, start) {
+    let content = document.querySelector('.tabContent[data-search-id="' + searchId + '"]');
+    if (!content) return;
+    let page = content.querySelector('.entryPage[data-start="' + start + '"]');
+    if (!page) return;
+    getEntryPageObserver().unobserve(page);
+    delete page.dataset.requested;
+    page.textContent = 'These results have expired. Search again to show them.';
+    let idx = content.pendingEntry;
+    if (idx !== null && start <= idx && idx < parseInt(page.dataset.end)) {
+        content.pendingEntry = null;
+    }
+}
+
+/**
+ * Search again for a tab whose entry pages Python no longer keeps
+ */
+function reloadTab(searchId) {
+    let content = document.querySelector('.tabContent[data-search-id="' + searchId + '"]');
+    if (!content || content.dataset.evicted) return;
+    if (content.style.display == 'block') {
+        tabs[parseInt(content.dataset.index)][2] = document.getElementById('defBox').scrollTop;
+    }
+    evictTab(content);
+    sendToPython('restoreTab', { searchId: parseInt(searchId) });
+}
+
+/**
+ * Turn the loaded pages farthest from the view back into placeholders
+ */
+function evictEntryPages(content) {
+    let w = document.getElementById('defBox');
+    while (content.loadedPages.length > MAX_LOADED_PAGES) {
+        let center = w.scrollTop + w.clientHeight / 2;
+        let farthest = -1, distance = -1;
+        content.loadedPages.forEach((loaded, i) => {
+            let first = content.querySelector('.termPronunciation[data-index="' + loaded.start + '"]');
+            let d = first ? Math.abs(first.offsetTop - center) : Infinity;
+            if (d > distance) {
+                farthest = i;
+                distance = d;
+            }
+        });
+        let loaded = content.loadedPages.splice(farthest, 1)[0];
+        unloadEntryPage(content, loaded.start, loaded.end);
+        content.approxBytes -= loaded.bytes;
+    }
+}
+
+function unloadEntryPage(content, start, end) {
+    let first = content.querySelector('.termPronunciation[data-index="' + start + '"]');
+    if (!first) return;
+    let elements = [];
+    for (let el = first; el; el = el.nextElementSibling) {
+        if (el.classList.contains('termPronunciation')) {
+            if (parseInt(el.dataset.index) >= end) break;
+        } else if (!el.classList.contains('definitionBlock')) {
+            break;
+        }
+        elements.push(el);
+    }
+    let last = elements[elements.length - 1];
+    let page = document.createElement('div');
+    page.className = 'entryPage';
+    page.dataset.start = start;
+    page.dataset.end = end;
+    page.dataset.count = end - start;
+    page.style.height = (last.offsetTop + last.offsetHeight - first.offsetTop) + 'px';
+    first.before(page);
+    elements.forEach(el => el.remove());
+    getEntryPageObserver().observe(page);
+}
+
+/**
+ * Append the results of further dictionaries to the tab of a streamed lookup.
+ * Does nothing if the tab was closed or now shows another lookup.
+ */
+function appendToTab(searchId, sideBarHtml, mainHtml) {
+    try {
+        let content = document.querySelector('.tabContent[data-search-id="' + searchId + '"]');
+        if (!content) return;
+        let innerSideBar = content.querySelector('.innerSideBar');
+        let main = content.querySelector('.mainDictDisplay');
+        if (!innerSideBar || !main) return;
+
+        let fragment = document.createElement('template');
+        fragment.innerHTML = sideBarHtml;
+        let added = Array.from(fragment.content.children);
+        // The side bar ends with a <br> spacer; new lists go before it.
+        let spacer = innerSideBar.lastElementChild;
+        if (spacer && spacer.tagName === 'BR') {
+            innerSideBar.insertBefore(fragment.content, spacer);
+        } else {
+            innerSideBar.appendChild(fragment.content);
+        }
+        added.forEach(el => {
+            if (el.classList.contains('listTitle')) {
+                el.addEventListener("click", navDictOrEntry);
+                el.addEventListener("contextmenu", toggleDictEntries);
+            } else {
+                Array.from(el.getElementsByTagName("LI")).forEach(item => {
+                    item.addEventListener("click", navDictOrEntry);
+                });
+            }
+        });
+
+        main.insertAdjacentHTML('beforeend', mainHtml);
+        content.approxBytes = (content.approxBytes || 0) + (sideBarHtml.length + mainHtml.length) * 2;
+        observeEntryPages(content);
+        initializeImageSelection();
+    } catch (error) {
+        console.error('Error in appendToTab:', error);
+    }
+}
+
+/*
+ * In multi-tab mode only a budget of tabs keeps its content. The content of
+ * the least recently viewed background tabs is dropped, keeping just the tab
+ * and its search id; Python searches again when such a tab is opened.
+ */
+var tabBudget = { count: 8, bytes: 64 * 1024 * 1024 };
+
+function setTabBudget(count, megabytes) {
+    tabBudget.count = Math.max(1, count);
+    tabBudget.bytes = megabytes * 1024 * 1024;
+    enforceTabBudget();
+}
+
+/**
+ * Drop the content of background tabs until the tab budget is met
+ */
+function enforceTabBudget() {
+    let loaded = tabs.filter(tab => tab && !tab[1].dataset.evicted);
+    let count = loaded.length;
+    let bytes = loaded.reduce((sum, tab) => sum + (tab[1].approxBytes || 0), 0);
+    loaded.sort((a, b) => (a[1].lastFocused || 0) - (b[1].lastFocused || 0));
+    for (let i = 0; i < loaded.length; i++) {
+        if (count <= tabBudget.count && bytes <= tabBudget.bytes) break;
+        let content = loaded[i][1];
+        // The tab in view stays, and tabs without a search cannot be restored.
+        if (loaded[i][0].classList.contains('active') || !content.dataset.searchId) continue;
+        count--;
+        bytes -= content.approxBytes || 0;
+        evictTab(content);
+    }
+}
+
+function evictTab(content) {
+    let observer = getEntryPageObserver();
+    content.querySelectorAll('.entryPage').forEach(page => observer.unobserve(page));
+    content.innerHTML = '';
+    content.dataset.evicted = 'true';
+    content.approxBytes = 0;
+    content.loadedPages = [];
+}
+
+/**
+ * Fill a dropped tab with the results of its repeated search
+ */
+function restoreTab(searchId, html, newSearchId) {
+    let content = document.querySelector('.tabContent[data-search-id="' + searchId + '"]');
+    if (!content || !content.dataset.evicted) return;
+    content.innerHTML = html;
+    delete content.dataset.evicted;
+    setSearchId(content, newSearchId);
+    content.approxBytes = html.length * 2;
+    addSidebarListeners(content);
+    initializeImageSelection();
+    resizer();
+    if (content.style.display == 'block') {
+        document.getElementById('defBox').scrollTop = tabs[parseInt(content.dataset.index)][2];
+    }
+    enforceTabBudget();
+}
+
 /**
  * Initialize interactive elements after content is loaded
  */
@@ -1005,11 +1373,7 @@ function handleFieldCheck(checkbox) {
         
         // Send the selection back to Python
         if (typeof pycmd !== 'undefined') {
-            const data = {
-                dictName: dictName,
-                fields: selectedFields
-            };
-            pycmd('fieldsSetting:' + JSON.stringify(data));
+            sendToPython('fieldsSetting', { dictName: dictName, fields: selectedFields });
         }
         
     } catch (error) {
@@ -1029,11 +1393,7 @@ function handleAddTypeCheck(radio) {
         
         // Send the selection back to Python
         if (typeof pycmd !== 'undefined') {
-            const data = {
-                name: dictName,
-                type: value
-            };
-            pycmd('overwriteSetting:' + JSON.stringify(data));
+            sendToPython('overwriteSetting', { name: dictName, addType: value });
         }
         
     } catch (error) {
@@ -1072,7 +1432,7 @@ function handleDupChange(checkbox, className) {
         
         if (dictName && typeof pycmd !== 'undefined') {
             const value = checkbox.checked ? 1 : 0;
-            pycmd('setDup:' + value + '◳' + dictName);
+            sendToPython('setDup', { dup: value, dictName: dictName });
         }
     } catch (error) {
         console.error('Error in handleDupChange:', error);
@@ -1091,7 +1451,7 @@ function scaleFont(increase) {
         
         // Save the font size
         if (typeof pycmd !== 'undefined') {
-            pycmd('saveFS:' + newSize + ':' + newSize);
+            sendToPython('saveFontSizes', { definitions: newSize, headers: newSize });
         }
         
     } catch (error) {
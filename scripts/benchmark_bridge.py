@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the web view message bridge
+
+Page to Python: decodes and dispatches large addDef and imgExport messages in
+the previous "action:" + "◳◴"-separated string format, through a startswith
+chain, and as JSON bridge batches. Python to page: builds the addNewTab()
+call for a large results page with the previous quote escaping and with
+jsCall(). Prints MB/s for each.
+
+Usage: python scripts/benchmark_bridge.py [payload KiB] [repeats]
+"""
+
+import gc
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.bridge import Bridge, encodeMessages, jsCall
+
+LEGACY_ACTIONS = [
+    "AnkiDictionaryLoaded",
+    "updateTerm:",
+    "saveFS:",
+    "setDup:",
+    "fieldsSetting:",
+    "overwriteSetting:",
+    "clipped:",
+    "sendToField:",
+    "sendAudioToField:",
+    "sendImgToField:",
+    "addDef:",
+    "audioExport:",
+    "imgExport:",
+]
+
+
+def legacyDispatch(dAct, sink):
+    """The previous handleDictAction chain, reduced to its parsing."""
+    for prefix in LEGACY_ACTIONS:
+        if dAct.startswith(prefix):
+            break
+    if dAct.startswith("addDef:"):
+        dictName, word, text = dAct[7:].split("◳◴")
+        sink(dictName, word, text)
+    elif dAct.startswith("imgExport:"):
+        word, urls = dAct[10:].split("◳◴")
+        sink(word, json.loads(urls))
+
+
+def timeIt(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, size, legacyTime, bridgeTime):
+    mb = size / (1024 * 1024)
+    print(
+        f"   {name:22} {mb / legacyTime:>9.0f} MB/s {mb / bridgeTime:>9.0f} MB/s"
+        f" {legacyTime / bridgeTime:>7.2f}x"
+    )
+
+
+def main():
+    kib = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    definition = ("食べる <b>to eat</b>, it's 「パンを食べる」<br>" * (kib * 1024 // 60))[
+        : kib * 1024
+    ]
+    urls = [
+        "https://example.com/images/%d/picture.jpg?size=large&q=%d" % (i, i)
+        for i in range(kib * 1024 // 60)
+    ]
+    received = []
+    sink = lambda *args: received.append(args)
+    bridge = Bridge()
+    bridge.register("addDef", lambda dictName, word, text: sink(dictName, word, text))
+    bridge.register("imgExport", lambda word, urls: sink(word, urls))
+
+    print(f"Payload: {kib} KiB")
+    print(f"   {'':22} {'legacy':>14} {'bridge':>14} {'speedup':>8}")
+
+    legacyDef = "addDef:" + "Dict" + "◳◴" + "食べる" + "◳◴" + definition
+    bridgeDef = encodeMessages(
+        [("addDef", {"dictName": "Dict", "word": "食べる", "text": definition})]
+    )
+    report(
+        "addDef page → Python",
+        len(legacyDef.encode("utf-8")),
+        timeIt(lambda: legacyDispatch(legacyDef, sink), repeats),
+        timeIt(lambda: bridge.handle(bridgeDef), repeats),
+    )
+
+    legacyImg = "imgExport:" + "食べる" + "◳◴" + json.dumps(urls)
+    bridgeImg = encodeMessages([("imgExport", {"word": "食べる", "urls": urls})])
+    report(
+        "imgExport page → Python",
+        len(legacyImg.encode("utf-8")),
+        timeIt(lambda: legacyDispatch(legacyImg, sink), repeats),
+        timeIt(lambda: bridge.handle(bridgeImg), repeats),
+    )
+
+    batch = encodeMessages(
+        [("addDef", {"dictName": "Dict", "word": "w", "text": definition[:200]})] * 100
+    )
+    single = encodeMessages(
+        [("addDef", {"dictName": "Dict", "word": "w", "text": definition[:200]})]
+    )
+    report(
+        "100 addDef, batched",
+        len(batch.encode("utf-8")),
+        timeIt(lambda: [bridge.handle(single) for _ in range(100)], repeats),
+        timeIt(lambda: bridge.handle(batch), repeats),
+    )
+
+    def legacyCall():
+        html = definition.replace("'", "\\'").replace("\n", "")
+        return "addNewTab('%s', '%s', %s);" % (
+            html.replace("\r", "<br>").replace("\n", "<br>"),
+            "食べる",
+            "true",
+        )
+
+    report(
+        "addNewTab Python → page",
+        len(definition.encode("utf-8")),
+        timeIt(legacyCall, repeats),
+        timeIt(lambda: jsCall("addNewTab", definition, "食べる", True, 1), repeats),
+    )
+    print("   (batched row: legacy column is 100 separate bridge messages)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
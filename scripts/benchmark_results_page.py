@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for rendering the dictionary results page
+
+Renders a synthetic search result (1000 definitions by default, the maxSearch
+default) with the previous string-concatenation code, which embedded the
+export icon, tooltips and inline handlers in every entry, and with the
+template based ResultsPage. Prints page bytes and render time per entry.
+
+Usage: python scripts/benchmark_results_page.py [definitions] [repeats]
+"""
+
+import base64
+import gc
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.importer import normalizeDefinition
+from anki_dictionary.core.rendering import ResultsPage
+
+
+class BenchmarkView:
+    """Stand-in for MIDict with the helpers the results page calls."""
+
+    def __init__(self, termHeaders=None):
+        self.config = {
+            "frontBracket": "【",
+            "backBracket": "】",
+            "tooltips": True,
+            "highlightTarget": True,
+            "highlightSentences": True,
+        }
+        self.termHeaders = termHeaders
+        self.conjugations = {}
+        self.deinflect = True
+        self.radioCount = 0
+        self.addon_root = Path(__file__).parent.parent
+
+    def getBase64Icon(self, icon_name):
+        with open(self.addon_root / "assets" / "icons" / icon_name, "rb") as icon_file:
+            icon_base64 = base64.b64encode(icon_file.read()).decode("utf-8")
+        return "data:image/png;base64," + icon_base64
+
+    def escapePunctuation(self, term):
+        return re.sub(r"([.*+(\[\]{}\\?)!])", "\\\1", term)
+
+    def highlightTarget(self, text, term):
+        if not self.config["highlightTarget"]:
+            return text
+        parts = re.split(r"(<[^>]*>)", text)
+        for i in range(0, len(parts), 2):
+            if parts[i]:
+                pattern = "(" + self.escapePunctuation(term) + ")"
+                parts[i] = re.sub(
+                    pattern, r'<span class="targetTerm">\1</span>', parts[i]
+                )
+        return "".join(parts)
+
+    def highlightExamples(self, text):
+        return re.sub(
+            r"「([^」]+)」(?![^<]*>)",
+            r'<span class="exampleSentence">「\1」</span>',
+            text,
+        )
+
+    def processDefinitionHTML(self, text):
+        text = re.sub(r"<br\s*/?>", "<br>", text, flags=re.IGNORECASE)
+        text = text.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+        return re.sub(r"(<br>\s*){2,}", "<br><br>", text)
+
+    def getDuplicateHeaderCB(self, dictName):
+        return '<div class="dupHeadCB" data-dictname="' + dictName + '">Duplicate Header:</div>'
+
+    def getOverwriteChecks(self, dictCount, dictName):
+        self.radioCount += 1
+        return '<div class="overwriteSelectCont" data-count="' + str(self.radioCount) + '"></div>'
+
+    def getFieldChecks(self, dictName):
+        return '<div class="fieldSelectCont" title="this dictionary\'s fields"></div>'
+
+    # The renderer this benchmark compares against.
+    def getSideBar(self, results, term, font, frontBracket, backBracket):
+        html = "<div" + font + 'class="definitionSideBar"><div class="innerSideBar">'
+        dictCount = 0
+        entryCount = 0
+        for dictName, dictResults in results.items():
+            html += (
+                '<div data-index="'
+                + str(dictCount)
+                + '" class="listTitle">'
+                + dictName
+                + '</div><ol class="foundEntriesList">'
+            )
+            dictCount += 1
+            for idx, entry in enumerate(dictResults):
+                html += (
+                    '<li data-index="'
+                    + str(entryCount)
+                    + '">'
+                    + self.getPreparedTermHeader(
+                        dictName,
+                        frontBracket,
+                        backBracket,
+                        term,
+                        entry["term"],
+                        entry["altterm"],
+                        entry["pronunciation"],
+                        True,
+                    )
+                    + "</li>"
+                )
+                entryCount += 1
+            html += "</ol>"
+        return (
+            html
+            + '<br></div><div class="resizeBar" onmousedown="hresize(event)"></div></div>'
+        )
+
+    def getPreparedTermHeader(
+        self, dictName, frontBracket, backBracket, target, term, altterm, pronunciation, sb=False
+    ):
+        altFB = frontBracket
+        altBB = backBracket
+        if pronunciation == term:
+            pronunciation = ""
+        if altterm == term:
+            altterm = ""
+        if altterm == "":
+            altFB = ""
+            altBB = ""
+        if not self.termHeaders or dictName == "Images":
+            if sb:
+                header = '◳f<span class="term mainword">◳t</span>◳b◳x<span class="altterm  mainword">◳a</span>◳y<span class="pronunciation">◳p</span>'
+            else:
+                header = '◳f<span class="listTerm">◳t</span>◳b◳x<span class="listAltTerm">◳a</span>◳y<span class="listPronunciation">◳p</span>'
+        else:
+            if sb:
+                header = self.termHeaders[dictName][1]
+            else:
+                header = self.termHeaders[dictName][0]
+        return (
+            header.replace("◳t", self.highlightTarget(term, target))
+            .replace("◳a", self.highlightTarget(altterm, target))
+            .replace("◳p", self.highlightTarget(pronunciation, target))
+            .replace("◳f", frontBracket)
+            .replace("◳b", backBracket)
+            .replace("◳x", altFB)
+            .replace("◳y", altBB)
+        )
+
+    def prepareResults(self, results, term, font):
+        frontBracket = self.config["frontBracket"]
+        backBracket = self.config["backBracket"]
+        html = self.getSideBar(results, term, font, frontBracket, backBracket)
+        html += '<div class="mainDictDisplay">'
+        dictCount = 0
+        entryCount = 0
+        imgTooltip = ' title="Add this definition, or any selected text and this definition\'s header to the card exporter (opens the card exporter if it is not yet opened)." '
+        clipTooltip = ' title="Copy this definition, or any selected text to the clipboard." '
+        sendTooltip = " title=\"Send this definition, or any selected text and this definition's header to the card exporter to this dictionary's target fields. It will send it to the current target window, be it an Editor window, or the Review window.\" "
+        for dictName, dictResults in results.items():
+            duplicateHeader = self.getDuplicateHeaderCB(dictName)
+            overwrite = self.getOverwriteChecks(dictCount, dictName)
+            select = self.getFieldChecks(dictName)
+            html += (
+                '<div data-index="'
+                + str(dictCount)
+                + '" class="dictionaryTitleBlock"><div  '
+                + font
+                + '  class="dictionaryTitle">'
+                + dictName.replace("_", " ")
+                + '</div><div class="dictionarySettings">'
+                + duplicateHeader
+                + overwrite
+                + select
+                + '<div class="dictNav"><div onclick="navigateDict(event, false)" class="prevDict">▲</div><div onclick="navigateDict(event, true)" class="nextDict">▼</div></div></div></div>'
+            )
+            dictCount += 1
+            for idx, entry in enumerate(dictResults):
+                html += (
+                    '<div data-index="'
+                    + str(entryCount)
+                    + '" class="termPronunciation"><span '
+                    + font
+                    + ' class="tpCont">'
+                    + self.getPreparedTermHeader(
+                        dictName,
+                        frontBracket,
+                        backBracket,
+                        term,
+                        entry["term"],
+                        entry["altterm"],
+                        entry["pronunciation"],
+                    )
+                    + ' <span class="starcount">'
+                    + entry["starCount"]
+                    + '</span></span><div class="defTools"><div onclick="ankiExport(event, \''
+                    + dictName
+                    + '\')" class="ankiExportButton"><img '
+                    + imgTooltip
+                    + ' src="' + self.getBase64Icon("anki.png") + '"></div><div onclick="clipText(event)" '
+                    + clipTooltip
+                    + ' class="clipper">✂</div><div '
+                    + sendTooltip
+                    + " onclick=\"sendToField(event, '"
+                    + dictName
+                    + '\')" class="sendToField">➠</div><div class="defNav"><div onclick="navigateDef(event, false)" class="prevDef">▲</div><div onclick="navigateDef(event, true)" class="nextDef">▼</div></div></div></div><div'
+                    + font
+                    + ' class="definitionBlock">'
+                    + self.highlightTarget(
+                        self.processDefinitionHTML(
+                            self.highlightExamples(entry["definition"])
+                        ), term
+                    )
+                    + "</div>"
+                )
+                entryCount += 1
+        return html.replace("'", "\\'").replace("\n", "")
+
+
+def makeResults(definitions, dictionaries=5):
+    results = {}
+    perDict = definitions // dictionaries
+    for d in range(dictionaries):
+        entries = []
+        for i in range(perDict):
+            entries.append(
+                {
+                    "term": "食べる" if i % 3 else "食べ物",
+                    "altterm": "たべる" if i % 2 else "",
+                    "pronunciation": "タベル",
+                    "starCount": "★★★☆☆",
+                    "definition": (
+                        "to eat<br/>to live on (e.g. a salary)\n「パンを食べる」 it's "
+                        + "an example sentence<br><br><br>"
+                    )
+                    * 4,
+                }
+            )
+        results["Dictionary_" + str(d)] = entries
+    return results
+
+
+def timeIt(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    definitions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    results = makeResults(definitions)
+    # Lookups now return the definition HTML normalized at import time.
+    stored = {
+        dictName: [dict(e, definition=normalizeDefinition(e["definition"])) for e in entries]
+        for dictName, entries in results.items()
+    }
+    font = ' style="font-family:Noto Sans;" '
+    entries = sum(len(r) for r in results.values())
+    print(f"Definitions: {entries}")
+
+    for highlight in (False, True):
+        view = BenchmarkView()
+        view.config["highlightTarget"] = highlight
+        page = ResultsPage(view)
+        legacy = view.prepareResults(results, "食べ", font)
+        rendered = page.render(stored, "食べ", font)
+        legacyTime = timeIt(lambda: view.prepareResults(results, "食べ", font), repeats)
+        renderTime = timeIt(lambda: page.render(stored, "食べ", font), repeats)
+        legacyBytes = len(legacy.encode("utf-8"))
+        renderBytes = len(rendered.encode("utf-8"))
+        print(f"\nhighlightTarget={highlight}")
+        print(f"   {'':14} {'page':>10} {'bytes/entry':>12} {'µs/entry':>9}")
+        print(
+            f"   {'Concatenation':14} {legacyBytes / 1024:>6.0f} KiB {legacyBytes / entries:>12.0f}"
+            f" {legacyTime * 1e6 / entries:>9.1f}"
+        )
+        print(
+            f"   {'Templates':14} {renderBytes / 1024:>6.0f} KiB {renderBytes / entries:>12.0f}"
+            f" {renderTime * 1e6 / entries:>9.1f}"
+        )
+        print(
+            f"   Page {legacyBytes / renderBytes:.1f}x smaller, rendered {legacyTime / renderTime:.2f}x faster"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+JSON message channel between the dictionary web view and Python.
+
+The page sends pycmd("bridge:" + JSON) where the JSON is a versioned batch:
+
+    {"v": 1, "messages": [{"action": "addDef", "args": {...}}, ...]}
+
+Each message's args are passed as keyword arguments to the handler registered
+for its action. Calls into the page are built with jsCall(), which passes
+every argument as a JSON literal instead of splicing it into a quoted string.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+BRIDGE_VERSION = 1
+BRIDGE_PREFIX = "bridge:"
+
+
+def jsCall(function: str, *args: Any) -> str:
+    """Build the JavaScript calling a page function with JSON encoded arguments."""
+    return (
+        function
+        + "("
+        + ",".join(json.dumps(arg, ensure_ascii=False) for arg in args)
+        + ");"
+    )
+
+
+def encodeMessages(messages: List[Tuple[str, Dict[str, Any]]]) -> str:
+    """Encode a batch of messages the way the page sends them."""
+    return BRIDGE_PREFIX + json.dumps(
+        {
+            "v": BRIDGE_VERSION,
+            "messages": [{"action": action, "args": args} for action, args in messages],
+        },
+        ensure_ascii=False,
+    )
+
+
+class Bridge:
+    """Dispatches message batches from the page through one table of handlers."""
+
+    def __init__(self) -> None:
+        self.handlers: Dict[str, Callable[..., Any]] = {}
+
+    def register(self, action: str, handler: Callable[..., Any]) -> None:
+        self.handlers[action] = handler
+
+    def decode(self, message: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Decode a message batch, raising ValueError if it is not one this version reads."""
+        if not message.startswith(BRIDGE_PREFIX):
+            raise ValueError("Not a bridge message: " + message[:40])
+        batch = json.loads(message[len(BRIDGE_PREFIX) :])
+        if not isinstance(batch, dict) or batch.get("v") != BRIDGE_VERSION:
+            raise ValueError("Unsupported bridge message version")
+        return [(m["action"], m.get("args") or {}) for m in batch["messages"]]
+
+    def handle(self, message: str) -> int:
+        """Dispatch every message of a batch; returns how many were handled.
+
+        A handler that raises is reported and skipped, so the messages after
+        it in the batch still run.
+        """
+        try:
+            messages = self.decode(message)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring bridge message: {e}")
+            return 0
+        handled = 0
+        for action, args in messages:
+            handler = self.handlers.get(action)
+            if handler is None:
+                print(f"Ignoring unknown bridge action: {action}")
+                continue
+            try:
+                handler(**args)
+            except Exception as e:
+                # Actions batched together are unrelated; one failing must not drop the rest.
+                print(f"Bridge action {action} failed: {e!r}")
+                continue
+            handled += 1
+        return handled
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite connection tuning and background maintenance for the dictionary database.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.request import pathname2url
+
+from .importer import normalizeDefinition
+
+DEFAULT_MMAP_SIZE_MB = 256
+DEFAULT_CACHE_SIZE_MB = 64
+# Pages released per incremental_vacuum step, so the writer lock is never held long.
+VACUUM_STEP_PAGES = 2048
+READER_POOL_SIZE = 3
+# Rows given their display HTML per migration transaction.
+MIGRATION_BATCH_ROWS = 2000
+
+
+class ConnectionProfile:
+    """PRAGMA settings applied to every connection to dictionaries.sqlite."""
+
+    def __init__(
+        self,
+        mmapSizeMB: int = DEFAULT_MMAP_SIZE_MB,
+        cacheSizeMB: int = DEFAULT_CACHE_SIZE_MB,
+        journalMode: str = "WAL",
+        tempStore: str = "MEMORY",
+    ) -> None:
+        self.mmapSizeMB = mmapSizeMB
+        self.cacheSizeMB = cacheSizeMB
+        self.journalMode = journalMode
+        self.tempStore = tempStore
+
+    @classmethod
+    def fromConfig(cls, config: Optional[Dict[str, Any]]) -> "ConnectionProfile":
+        """Build a profile from the add-on config, falling back to the defaults."""
+        config = config or {}
+        return cls(
+            mmapSizeMB=int(config.get("dbMmapSizeMB", DEFAULT_MMAP_SIZE_MB)),
+            cacheSizeMB=int(config.get("dbCacheSizeMB", DEFAULT_CACHE_SIZE_MB)),
+        )
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        """Apply the profile to a freshly opened connection."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=" + self.journalMode + ";")
+        except sqlite3.OperationalError:
+            # WAL is unavailable on some network file systems; keep the default.
+            pass
+        cursor.execute("PRAGMA mmap_size=" + str(self.mmapSizeMB * 1024 * 1024) + ";")
+        # A negative cache_size is a size in KiB rather than a page count.
+        cursor.execute("PRAGMA cache_size=-" + str(self.cacheSizeMB * 1024) + ";")
+        cursor.execute("PRAGMA temp_store=" + self.tempStore + ";")
+        cursor.execute("PRAGMA case_sensitive_like=ON;")
+        cursor.close()
+
+    def optimize(self, conn: sqlite3.Connection) -> None:
+        """Let SQLite refresh its planner statistics before the connection closes."""
+        try:
+            conn.execute("PRAGMA optimize;")
+        except sqlite3.Error:
+            pass
+
+
+class VacuumJob(threading.Thread):
+    """Reclaim free pages on a separate connection without blocking the UI thread.
+
+    Free pages are released in small incremental_vacuum steps. Databases
+    created before incremental auto-vacuum was enabled are left alone unless
+    the job is started with full=True, which rebuilds them once with a full
+    VACUUM; that holds the write lock for the whole rebuild, so it is only
+    run when the user asks for it.
+    """
+
+    def __init__(
+        self, dbFile: str, profile: ConnectionProfile, full: bool = False
+    ) -> None:
+        super().__init__(daemon=True)
+        self.dbFile = dbFile
+        self.profile = profile
+        self.full = full
+
+    def run(self) -> None:
+        try:
+            conn = sqlite3.connect(self.dbFile, timeout=30)
+        except sqlite3.Error:
+            return
+        try:
+            self.profile.apply(conn)
+            conn.isolation_level = None
+            autoVacuum = conn.execute("PRAGMA auto_vacuum;").fetchone()[0]
+            if autoVacuum != 2:
+                if self.full:
+                    conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+                    conn.execute("VACUUM;")
+                return
+            while conn.execute("PRAGMA freelist_count;").fetchone()[0] > 0:
+                conn.execute(
+                    "PRAGMA incremental_vacuum(" + str(VACUUM_STEP_PAGES) + ");"
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Background vacuum failed: {e}")
+        finally:
+            conn.close()
+
+
+class DefinitionMigrationJob(threading.Thread):
+    """Fill in the definitionHtml column of tables created before it existed.
+
+    Rows are converted in small rowid ranges, each in its own transaction, so
+    lookups and imports are never held up for long. Rows that already have
+    their HTML are skipped, which lets an interrupted migration resume on the
+    next start. The schema version is only stored once every table is done.
+    """
+
+    def __init__(
+        self,
+        dbFile: str,
+        profile: ConnectionProfile,
+        tables: List[str],
+        schemaVersion: int,
+        onFinished: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.dbFile = dbFile
+        self.profile = profile
+        self.tables = tables
+        self.schemaVersion = schemaVersion
+        self.onFinished = onFinished
+
+    def migrateTable(self, conn: sqlite3.Connection, table: str) -> None:
+        # Tables from before the id column was added only have their rowid.
+        lastId = conn.execute(
+            "SELECT IFNULL(MAX(rowid), 0) FROM " + table + ";"
+        ).fetchone()[0]
+        for start in range(0, lastId, MIGRATION_BATCH_ROWS):
+            with conn:
+                conn.execute(
+                    "UPDATE "
+                    + table
+                    + " SET definitionHtml = normalizeDefinition(definition) WHERE rowid > ? AND rowid <= ? AND definitionHtml IS NULL;",
+                    (start, start + MIGRATION_BATCH_ROWS),
+                )
+
+    def tableExists(self, conn: sqlite3.Connection, table: str) -> bool:
+        return (
+            conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;",
+                (table,),
+            ).fetchone()
+            is not None
+        )
+
+    def run(self) -> None:
+        try:
+            conn = sqlite3.connect(self.dbFile, timeout=30)
+        except sqlite3.Error:
+            return
+        try:
+            self.profile.apply(conn)
+            conn.create_function(
+                "normalizeDefinition", 1, normalizeDefinition, deterministic=True
+            )
+            complete = True
+            for table in self.tables:
+                try:
+                    self.migrateTable(conn, table)
+                except sqlite3.OperationalError as e:
+                    # A dictionary deleted in the meantime needs no migration.
+                    if self.tableExists(conn, table):
+                        print(f"Migration of {table} failed: {e}")
+                        complete = False
+            if complete:
+                conn.execute("PRAGMA user_version=" + str(self.schemaVersion) + ";")
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Definition migration failed: {e}")
+        finally:
+            conn.close()
+        # Rows may have been migrated even if some table failed.
+        if self.onFinished is not None:
+            self.onFinished()
+
+
+class ReaderPool:
+    """Read-only connections checked out by one thread at a time.
+
+    Lookups run on these so they never share a cursor with an import running
+    on the writer connection; under WAL they also never wait for it.
+    """
+
+    def __init__(
+        self,
+        dbFile: str,
+        profile: ConnectionProfile,
+        size: int = READER_POOL_SIZE,
+        functions: Optional[Dict[str, Callable[..., Any]]] = None,
+    ) -> None:
+        self.dbFile = dbFile
+        self.profile = profile
+        self.size = size
+        # SQL functions registered on every connection, each taking one argument.
+        self.functions = functions or {}
+        self.idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self.connections: List[sqlite3.Connection] = []
+        self.lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a new read-only connection."""
+        conn = sqlite3.connect(
+            "file:" + pathname2url(self.dbFile) + "?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        self.profile.apply(conn)
+        for name, function in self.functions.items():
+            conn.create_function(name, 1, function, deterministic=True)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out an idle connection, opening one while the pool is not full."""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.connections) < self.size:
+                conn = self.connect()
+                self.connections.append(conn)
+                return conn
+        return self.idle.get()
+
+    @contextmanager
+    def cursor(self) -> Iterator[sqlite3.Cursor]:
+        """Check out a cursor on a read-only connection for the duration of a block."""
+        conn = self.acquire()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            self.idle.put(conn)
+
+    def close(self) -> None:
+        """Close every connection of the pool."""
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+            self.idle = queue.LifoQueue()
@@ -4,46 +4,125 @@ import sqlite3
 import os.path
 import re
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Set, Tuple, Union
 from aqt.utils import showInfo
 from aqt import mw
 from ..utils.common import miInfo
+from ..utils.config import get_addon_config
+from .connection import (
+    ConnectionProfile,
+    DefinitionMigrationJob,
+    ReaderPool,
+    VacuumJob,
+)
+from .deinflection import Deinflector
+from .importer import kaner, normalizeDefinition
 
 # Get the root addon path (go up from src/anki_dictionary/core to root)
 addon_path = os.path.dirname(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 )
 
+# Search types whose LIKE patterns start with a wildcard and therefore cannot
+# use the term/altterm indexes. These are narrowed through the FTS5 index.
+FTS_SEARCH_TYPES = ("Anywhere", "Backward", "Definition", "Example")
+# The trigram tokenizer cannot match substrings shorter than three characters.
+FTS_MIN_TERM_LENGTH = 3
+FTS_SUFFIX = "_fts"
+# SQLite's default SQLITE_MAX_COMPOUND_SELECT; larger groups are split.
+MAX_COMPOUND_SELECT = 500
+QUERY_PLAN_CACHE_SIZE = 128
+SEARCH_CACHE_SIZE = 256
+IMPORT_BATCH_SIZE = 10000
+# Seconds the writer waits for a lock held by another connection, such as a
+# compaction or migration running in the background.
+WRITER_BUSY_TIMEOUT = 60
+# Index name prefix and columns for every dictionary table. Single-column term
+# and altterm indexes are left out because the composite indexes cover them.
+DICT_INDEXES = (
+    ("itp", "term, pronunciation"),
+    ("iap", "altterm, pronunciation"),
+    ("ip", "pronunciation"),
+)
+FTS_SHADOW_SUFFIXES = tuple(
+    FTS_SUFFIX + s for s in ("_data", "_idx", "_content", "_docsize", "_config")
+)
+# Stored in PRAGMA user_version. 1: dictionary tables have a definitionHtml column.
+DICT_SCHEMA_VERSION = 1
+# Display HTML of a row; rows not migrated yet are normalized on the fly.
+DEFINITION_HTML_SQL = "IFNULL(definitionHtml, normalizeDefinition(definition))"
+
+
+# Frequency rank assigned to terms missing from a language's frequency list.
+UNRANKED_FREQUENCY = 999999
+# Star ratings shown for frequency ranks, most frequent first.
+STAR_COUNT_SQL = (
+    "CASE WHEN frequency < 1501 THEN '★★★★★' WHEN frequency < 5001 THEN '★★★★' "
+    "WHEN frequency < 15001 THEN '★★★' WHEN frequency < 30001 THEN '★★' "
+    "WHEN frequency < 60001 THEN '★' ELSE '' END"
+)
+
+
+def toKatakana(text: Any) -> Any:
+    """Convert hiragana to katakana, the form readings take in frequency lists."""
+    return kaner(text) if isinstance(text, str) else text
+
 
 class DictDB:
     """Database interface for dictionary management."""
 
-    def __init__(self) -> None:
-        """Initialize the database connection."""
+    def __init__(self, db_file: Optional[str] = None) -> None:
+        """Initialize the database connection, to the add-on's database unless db_file is given."""
         self.conn: Optional[sqlite3.Connection] = None
         self.c: Optional[sqlite3.Cursor] = None
         self.oldConnection: Optional[sqlite3.Cursor] = None
-
-        # Get the root addon directory by going up from this file's location
-        current_file = os.path.abspath(__file__)
-        # Go up: core -> anki_dictionary -> src -> addon_root
-        addon_root = os.path.dirname(
-            os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-        )
-        addon_name = os.path.basename(addon_root)
-
-        # First try direct path from addon root
-        db_file = os.path.join(addon_root, "user_files", "db", "dictionaries.sqlite")
-
-        # If that doesn't exist, try using Anki's addon folder structure
-        if not os.path.exists(db_file):
-            db_file = os.path.join(
-                mw.pm.addonFolder(),
-                addon_name,
-                "user_files",
-                "db",
-                "dictionaries.sqlite",
+        self.ftsEnabled: bool = False
+        self.ftsTables: Optional[Set[str]] = None
+        self.queryPlanCache: Dict[Tuple[Any, ...], str] = {}
+        self.searchCache: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+        self.searchCacheHits = 0
+        self.searchCacheMisses = 0
+        # Streamed lookups search from a worker thread while the UI thread searches too.
+        self.searchCacheLock = threading.Lock()
+        # Display metadata of every dictionary by name, loaded on first use.
+        self.dictMetadata: Optional[Dict[str, Dict[str, Any]]] = None
+        # Bumped whenever the metadata changes, so views can drop what they built from it.
+        self.metadataVersion = 0
+        self.metadataLock = threading.Lock()
+        self.profile = ConnectionProfile.fromConfig(get_addon_config())
+        self.vacuumJob: Optional[VacuumJob] = None
+        self.bulkSynchronous = 2
+        # Set between beginBulkImport and finishBulkImport, which commits the import.
+        self.bulkImportActive = False
+        self.readers: Optional[ReaderPool] = None
+        self.migrationJob: Optional[DefinitionMigrationJob] = None
+        # Serializes users of the writer connection (self.conn / self.c).
+        self.writeLock = threading.RLock()
+
+        if db_file is None:
+            # Get the root addon directory by going up from this file's location
+            current_file = os.path.abspath(__file__)
+            # Go up: core -> anki_dictionary -> src -> addon_root
+            addon_root = os.path.dirname(
+                os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
             )
+            addon_name = os.path.basename(addon_root)
+
+            # First try direct path from addon root
+            db_file = os.path.join(addon_root, "user_files", "db", "dictionaries.sqlite")
+
+            # If that doesn't exist, try using Anki's addon folder structure
+            if not os.path.exists(db_file):
+                db_file = os.path.join(
+                    mw.pm.addonFolder(),
+                    addon_name,
+                    "user_files",
+                    "db",
+                    "dictionaries.sqlite",
+                )
 
         # Ensure the directory exists
         db_dir = os.path.dirname(db_file)
@@ -51,13 +130,35 @@ class DictDB:
             os.makedirs(db_dir, exist_ok=True)
 
         try:
-            self.conn = sqlite3.connect(db_file, check_same_thread=False)
+            self.conn = sqlite3.connect(
+                db_file, check_same_thread=False, timeout=WRITER_BUSY_TIMEOUT
+            )
+            self.profile.apply(self.conn)
             self.c = self.conn.cursor()
             self.c.execute("PRAGMA foreign_keys = ON")
-            self.c.execute("PRAGMA case_sensitive_like=ON;")
         except sqlite3.OperationalError as e:
             miInfo(f"Database error: {e}\nAttempted path: {db_file}", level="err")
             raise
+        self.dbFile = db_file
+        self.readers = ReaderPool(
+            db_file, self.profile, functions={"normalizeDefinition": normalizeDefinition}
+        )
+        self.conn.create_function("katakana", 1, toKatakana, deterministic=True)
+        self.ftsEnabled = self._detectFts5()
+        self.createFrequencyTable()
+        self.migrateSchema()
+
+    def _detectFts5(self) -> bool:
+        """Check whether this SQLite build provides FTS5 with the trigram tokenizer."""
+        cursor = self._get_cursor()
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS temp.ftsprobe USING fts5(x, tokenize='trigram');"
+            )
+            cursor.execute("DROP TABLE temp.ftsprobe;")
+            return True
+        except sqlite3.OperationalError:
+            return False
 
     def _ensure_connection(self) -> bool:
         """Ensure database connection is active. Returns True if connection is ready."""
@@ -75,77 +176,149 @@ class DictDB:
             raise RuntimeError("Database connection not initialized")
         return self.c
 
+    def _read_cursor(self) -> ContextManager[sqlite3.Cursor]:
+        """Check out a cursor from the read-only connection pool.
+
+        Code holding the cursor must not call other DictDB readers: they check
+        out a second connection, and threads doing so at once can exhaust the
+        pool and wait on each other forever.
+        """
+        if not self._ensure_connection() or self.readers is None:
+            raise RuntimeError("Database connection not initialized")
+        return self.readers.cursor()
+
     def closeConnection(self) -> None:
         """Close the database connection."""
         if self.c:
             self.c.close()
+        if self.readers:
+            self.readers.close()
         if self.conn:
+            self.profile.optimize(self.conn)
             self.conn.close()
+        self.invalidateDictMetadata()
+
+    def migrateSchema(self) -> None:
+        """Bring dictionary tables of an older database up to DICT_SCHEMA_VERSION.
+
+        Adding the definitionHtml column is instant; filling it in is left to
+        a background job. Until then lookups normalize the missing rows.
+        """
+        with self.writeLock:
+            cursor = self._get_cursor()
+            cursor.execute("PRAGMA user_version;")
+            if cursor.fetchone()[0] >= DICT_SCHEMA_VERSION:
+                return
+            tables = []
+            for table in self.getAllDicts():
+                cursor.execute("PRAGMA table_info(" + table + ");")
+                columns = [row[1] for row in cursor.fetchall()]
+                if not columns:
+                    continue
+                if "definitionHtml" not in columns:
+                    cursor.execute(
+                        "ALTER TABLE " + table + " ADD COLUMN definitionHtml TEXT;"
+                    )
+                tables.append(table)
+            self.commitChanges()
+        self.migrationJob = DefinitionMigrationJob(
+            self.dbFile, self.profile, tables, DICT_SCHEMA_VERSION, self.clearSearchCache
+        )
+        self.migrationJob.start()
+
+    def scheduleVacuum(self) -> None:
+        """Reclaim the space of dropped dictionaries in the background."""
+        if self.vacuumJob is not None and self.vacuumJob.is_alive():
+            return
+        self.vacuumJob = VacuumJob(self.dbFile, self.profile)
+        self.vacuumJob.start()
+
+    def compactDatabase(self) -> bool:
+        """Rebuild the database file in the background to release all free space.
+
+        Also converts databases from older versions to incremental
+        auto-vacuum. Returns False if a vacuum is already running.
+        """
+        if self.vacuumJob is not None and self.vacuumJob.is_alive():
+            return False
+        self.vacuumJob = VacuumJob(self.dbFile, self.profile, full=True)
+        self.vacuumJob.start()
+        return True
 
     def getLangId(self, lang: str) -> Optional[int]:
         """Get language ID from language name."""
         if not self._ensure_connection():
             return None
-        cursor = self._get_cursor()
-        cursor.execute("SELECT id FROM langnames WHERE langname = ?;", (lang,))
-        result = cursor.fetchone()
-        return result[0] if result else None
+        with self._read_cursor() as cursor:
+            cursor.execute("SELECT id FROM langnames WHERE langname = ?;", (lang,))
+            result = cursor.fetchone()
+            return result[0] if result else None
 
     def deleteDict(self, d: str) -> None:
         """Delete a dictionary and its associated tables."""
         if not self._ensure_connection():
             return
-        self.dropTables(d)
-        d_clean = self.cleanDictName(d)
-        cursor = self._get_cursor()
-        cursor.execute("DELETE FROM dictnames WHERE dictname = ?;", (d_clean,))
-        self.commitChanges()
-        cursor.execute("VACUUM;")
+        with self.writeLock:
+            self.dropTables(d)
+            self.clearSearchCache()
+            d_clean = self.cleanDictName(d)
+            cursor = self._get_cursor()
+            cursor.execute("DELETE FROM dictnames WHERE dictname = ?;", (d_clean,))
+            self.commitChanges()
+            self.invalidateDictMetadata()
+            self.scheduleVacuum()
 
     def getDictsByLanguage(self, lang: str) -> List[str]:
         """Get all dictionary names for a given language."""
         if not self._ensure_connection():
             return []
         lid = self.getLangId(lang)
-        cursor = self._get_cursor()
-        cursor.execute("SELECT dictname FROM dictnames WHERE lid = ?;", (lid,))
-        try:
-            langs: List[str] = []
-            allLs = cursor.fetchall()
-            if len(allLs) > 0:
-                for l in allLs:
-                    langs.append(l[0])
-            return langs
-        except:
-            return []
+        with self._read_cursor() as cursor:
+            cursor.execute("SELECT dictname FROM dictnames WHERE lid = ?;", (lid,))
+            try:
+                langs: List[str] = []
+                allLs = cursor.fetchall()
+                if len(allLs) > 0:
+                    for l in allLs:
+                        langs.append(l[0])
+                return langs
+            except:
+                return []
 
     def addDict(
-        self, dictname: str, lang: str, termHeader: str
+        self, dictname: str, lang: str, termHeader: str, deferIndexes: bool = False
     ) -> Tuple[bool, str, Optional[str]]:
-        """Add a new dictionary to the database."""
+        """Add a new dictionary to the database.
+
+        With deferIndexes the table is created bare; finishBulkImport builds its
+        indexes once the rows are loaded.
+        """
         if not self._ensure_connection():
             return False, "Database connection failed", None
-        try:
-            lid = self.getLangId(lang)
-            clean_name = self.normalize_dict_name(dictname)
-            cursor = self._get_cursor()
-            cursor.execute(
-                'INSERT INTO dictnames (dictname, lid, fields, addtype, termHeader, duplicateHeader) VALUES (?, ?, "[]", "add", ?, 0);',
-                (clean_name, lid, termHeader),
-            )
-            self.createDB(self.formatDictName(lid, clean_name))
-            self.commitChanges()
-
-            success = True
-            message = "Dictionary added successfully"
-            final_name = clean_name
-            return success, message, final_name
-
-        except Exception as e:
-            success = False
-            message = str(e)
-            final_name = None
-            return success, message, final_name
+        with self.writeLock:
+            try:
+                lid = self.getLangId(lang)
+                clean_name = self.normalize_dict_name(dictname)
+                cursor = self._get_cursor()
+                cursor.execute(
+                    'INSERT INTO dictnames (dictname, lid, fields, addtype, termHeader, duplicateHeader) VALUES (?, ?, "[]", "add", ?, 0);',
+                    (clean_name, lid, termHeader),
+                )
+                self.createDB(self.formatDictName(lid, clean_name), deferIndexes)
+                self.commitChanges()
+                self.clearSearchCache()
+                self.invalidateDictMetadata()
+
+                success = True
+                message = "Dictionary added successfully"
+                final_name = clean_name
+                return success, message, final_name
+
+            except Exception as e:
+                success = False
+                message = str(e)
+                final_name = None
+                return success, message, final_name
 
     def normalize_dict_name(self, name: str) -> str:
         """Normalize dictionary name for database use."""
@@ -210,36 +383,42 @@ class DictDB:
         """Delete a language and all its dictionaries."""
         if not self._ensure_connection():
             return
-        self.dropTables("l" + str(self.getLangId(langname)) + "name%")
-        cursor = self._get_cursor()
-        cursor.execute("DELETE FROM langnames WHERE langname = ?;", (langname,))
-        self.commitChanges()
-        cursor.execute("VACUUM;")
+        with self.writeLock:
+            lid = self.getLangId(langname)
+            self.dropTables("l" + str(lid) + "name%")
+            self.clearSearchCache()
+            cursor = self._get_cursor()
+            cursor.execute("DELETE FROM frequency WHERE lid = ?;", (lid,))
+            cursor.execute("DELETE FROM langnames WHERE langname = ?;", (langname,))
+            self.commitChanges()
+            self.invalidateDictMetadata()
+            self.scheduleVacuum()
 
     def addLanguages(self, list: List[str]) -> None:
         """Add multiple languages to the database."""
         if not self._ensure_connection():
             return
-        cursor = self._get_cursor()
-        for l in list:
-            cursor.execute("INSERT INTO langnames (langname) VALUES (?);", (l,))
-        self.commitChanges()
+        with self.writeLock:
+            cursor = self._get_cursor()
+            for l in list:
+                cursor.execute("INSERT INTO langnames (langname) VALUES (?);", (l,))
+            self.commitChanges()
 
     def getCurrentDbLangs(self) -> List[str]:
         """Get all languages currently in the database."""
         if not self._ensure_connection():
             return []
-        cursor = self._get_cursor()
-        cursor.execute("SELECT langname FROM langnames;")
-        try:
-            langs: List[str] = []
-            allLs = cursor.fetchall()
-            if len(allLs) > 0:
-                for l in allLs:
-                    langs.append(l[0])
-            return langs
-        except:
-            return []
+        with self._read_cursor() as cursor:
+            cursor.execute("SELECT langname FROM langnames;")
+            try:
+                langs: List[str] = []
+                allLs = cursor.fetchall()
+                if len(allLs) > 0:
+                    for l in allLs:
+                        langs.append(l[0])
+                return langs
+            except:
+                return []
 
     def getUserGroups(self, dicts: List[str]) -> List[Dict[str, str]]:
         """Get user dictionary groups based on provided dictionary names."""
@@ -257,98 +436,98 @@ class DictDB:
         """Get dictionary to table mapping."""
         if not self._ensure_connection():
             return {}
-        cursor = self._get_cursor()
-        cursor.execute(
-            "SELECT dictname, lid, langname FROM dictnames INNER JOIN langnames ON langnames.id = dictnames.lid;"
-        )
-        try:
-            dicts: Dict[str, Dict[str, str]] = {}
-            allDs = cursor.fetchall()
-            if len(allDs) > 0:
-                for d in allDs:
-                    dicts[d[0]] = {
-                        "dict": self.formatDictName(d[1], d[0]),
-                        "lang": d[2],
-                    }
-            return dicts
-        except:
-            return {}
+        with self._read_cursor() as cursor:
+            cursor.execute(
+                "SELECT dictname, lid, langname FROM dictnames INNER JOIN langnames ON langnames.id = dictnames.lid;"
+            )
+            try:
+                dicts: Dict[str, Dict[str, str]] = {}
+                allDs = cursor.fetchall()
+                if len(allDs) > 0:
+                    for d in allDs:
+                        dicts[d[0]] = {
+                            "dict": self.formatDictName(d[1], d[0]),
+                            "lang": d[2],
+                        }
+                return dicts
+            except:
+                return {}
 
     def fetchDefs(self) -> List[str]:
         """Fetch definitions from dictname table."""
         if not self._ensure_connection():
             return []
-        cursor = self._get_cursor()
-        cursor.execute("SELECT definition FROM dictname LIMIT 10;")
-        try:
-            langs: List[str] = []
-            allLs = cursor.fetchall()
-            if len(allLs) > 0:
-                for l in allLs:
-                    langs.append(l[0])
-            return langs
-        except:
-            return []
+        with self._read_cursor() as cursor:
+            cursor.execute("SELECT definition FROM dictname LIMIT 10;")
+            try:
+                langs: List[str] = []
+                allLs = cursor.fetchall()
+                if len(allLs) > 0:
+                    for l in allLs:
+                        langs.append(l[0])
+                return langs
+            except:
+                return []
 
     def getAllDicts(self) -> List[str]:
         """Get all dictionary names formatted with language prefix."""
         if not self._ensure_connection():
             return []
-        cursor = self._get_cursor()
-        cursor.execute("SELECT dictname, lid FROM dictnames;")
-        try:
-            dicts: List[str] = []
-            allDs = cursor.fetchall()
-            if len(allDs) > 0:
-                for d in allDs:
-                    dicts.append(self.formatDictName(d[1], d[0]))
-            return dicts
-        except:
-            return []
+        with self._read_cursor() as cursor:
+            cursor.execute("SELECT dictname, lid FROM dictnames;")
+            try:
+                dicts: List[str] = []
+                allDs = cursor.fetchall()
+                if len(allDs) > 0:
+                    for d in allDs:
+                        dicts.append(self.formatDictName(d[1], d[0]))
+                return dicts
+            except:
+                return []
 
     def getAllDictsWithLang(self) -> List[Dict[str, str]]:
         """Get all dictionaries with their languages."""
         if not self._ensure_connection():
             return []
-        cursor = self._get_cursor()
-        cursor.execute(
-            "SELECT dictname, lid, langname FROM dictnames INNER JOIN langnames ON langnames.id = dictnames.lid;"
-        )
-        try:
-            dicts: List[Dict[str, str]] = []
-            allDs = cursor.fetchall()
-            if len(allDs) > 0:
-                for d in allDs:
-                    dicts.append(
-                        {"dict": self.formatDictName(d[1], d[0]), "lang": d[2]}
-                    )
-            return dicts
-        except:
-            return []
+        with self._read_cursor() as cursor:
+            cursor.execute(
+                "SELECT dictname, lid, langname FROM dictnames INNER JOIN langnames ON langnames.id = dictnames.lid;"
+            )
+            try:
+                dicts: List[Dict[str, str]] = []
+                allDs = cursor.fetchall()
+                if len(allDs) > 0:
+                    for d in allDs:
+                        dicts.append(
+                            {"dict": self.formatDictName(d[1], d[0]), "lang": d[2]}
+                        )
+                return dicts
+            except:
+                return []
 
     def getDefaultGroups(self) -> Dict[str, Dict[str, Any]]:
         """Get default dictionary groups by language."""
         langs = self.getCurrentDbLangs()
         dictsByLang: Dict[str, Dict[str, Any]] = {}
-        cursor = self._get_cursor()
-        for lang in langs:
-            cursor.execute(
-                "SELECT dictname, lid FROM dictnames INNER JOIN langnames ON langnames.id = dictnames.lid WHERE langname = ?;",
-                (lang,),
-            )
-            allDs = cursor.fetchall()
-            dicts: Dict[str, Any] = {}
-            dicts["customFont"] = False
-            dicts["font"] = False
-            dicts["dictionaries"] = []
-            if len(allDs) > 0:
-                for d in allDs:
-                    dicts["dictionaries"].append(
-                        {"dict": self.formatDictName(d[1], d[0]), "lang": lang}
-                    )
-            if len(dicts["dictionaries"]) > 0:
-                dictsByLang[lang] = dicts
-        return dictsByLang
+        with self._read_cursor() as cursor:
+            for lang in langs:
+                cursor.execute(
+                    "SELECT dictname, lid FROM dictnames INNER JOIN langnames ON langnames.id = dictnames.lid WHERE langname = ?;",
+                    (lang,),
+                )
+                allDs = cursor.fetchall()
+                dicts: Dict[str, Any] = {}
+                dicts["customFont"] = False
+                dicts["font"] = False
+                dicts["dictionaries"] = []
+                if len(allDs) > 0:
+                    for d in allDs:
+                        dicts["dictionaries"].append(
+                            {"dict": self.formatDictName(d[1], d[0]), "lang": lang}
+                        )
+                if len(dicts["dictionaries"]) > 0:
+                    dictsByLang[lang] = dicts
+            return dictsByLang
 
     def cleanDictName(self, name: str) -> str:
         """Clean language ID prefix from dictionary name."""
@@ -356,21 +535,10 @@ class DictDB:
 
     def getDuplicateSetting(self, name: str) -> Optional[Tuple[int, List[str]]]:
         """Get duplicate setting for a dictionary."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute(
-            "SELECT duplicateHeader, termHeader  FROM dictnames WHERE dictname=?",
-            (name,),
-        )
-        try:
-            result = cursor.fetchone()
-            if result:
-                (duplicateHeader, termHeader) = result
-                return duplicateHeader, json.loads(termHeader)
-            return None
-        except:
+        metadata = self.getDictMetadata().get(name)
+        if metadata is None:
             return None
+        return metadata["duplicateHeader"], metadata["termHeader"]
 
     def getDefEx(self, sT: str) -> bool:
         """Check if search type is definition or example."""
@@ -396,26 +564,14 @@ class DictDB:
         return terms
 
     def deconjugate(
-        self, terms: List[str], conjugations: List[Dict[str, Any]]
+        self,
+        terms: List[str],
+        conjugations: Union[Deinflector, List[Dict[str, Any]]],
     ) -> List[str]:
-        """Deconjugate terms using provided conjugation rules."""
-        deconjugations: List[str] = []
-        for term in terms:
-            for c in conjugations:
-                if term.endswith(c["inflected"]):
-                    for x in c["dict"]:
-                        deinflected = self.rreplace(term, c["inflected"], x, 1)
-                        if "prefix" in c:
-                            prefix = c["prefix"]
-                            if deinflected.startswith(prefix):
-                                deprefixedDeinflected = deinflected[len(prefix) :]
-                                if deprefixedDeinflected not in deconjugations:
-                                    deconjugations.append(deprefixedDeinflected)
-                        if deinflected not in deconjugations:
-                            deconjugations.append(deinflected)
-        deconjugations = list(filter(lambda x: len(x) > 1, deconjugations))
-        deconjugations = list(set(deconjugations))
-        return terms + deconjugations
+        """Deconjugate terms using a compiled deinflector or raw conjugation rules."""
+        if not isinstance(conjugations, Deinflector):
+            conjugations = Deinflector(conjugations)
+        return conjugations.deinflect(terms)
 
     def rreplace(self, s: str, old: str, new: str, occurrence: int) -> str:
         """Replace from right side."""
@@ -425,97 +581,260 @@ class DictDB:
     def searchTerm(
         self, term, selectedGroup, conjugations, sT, deinflect, dictLimit, maxDefs
     ):
+        """Search a dictionary group, reusing the results of recent identical lookups."""
+        key = (
+            term,
+            tuple((dic["dict"], dic["lang"]) for dic in selectedGroup["dictionaries"]),
+            sT,
+            bool(deinflect),
+            str(dictLimit),
+            maxDefs,
+        )
+        with self.searchCacheLock:
+            results = self.searchCache.get(key)
+            if results is not None:
+                self.searchCacheHits += 1
+                self.searchCache.move_to_end(key)
+                return results
+            self.searchCacheMisses += 1
+        results = self.searchGroup(
+            term, selectedGroup, conjugations, sT, deinflect, dictLimit, maxDefs
+        )
+        with self.searchCacheLock:
+            self.searchCache[key] = results
+            if len(self.searchCache) > SEARCH_CACHE_SIZE:
+                self.searchCache.popitem(last=False)
+        return results
+
+    def clearSearchCache(self) -> None:
+        """Forget cached search results after the dictionaries changed."""
+        with self.searchCacheLock:
+            self.searchCache.clear()
+
+    def getSearchCacheStats(self) -> Dict[str, int]:
+        """Get the search cache's size and hit/miss counters."""
+        return {
+            "size": len(self.searchCache),
+            "hits": self.searchCacheHits,
+            "misses": self.searchCacheMisses,
+        }
+
+    def searchGroup(
+        self, term, selectedGroup, conjugations, sT, deinflect, dictLimit, maxDefs
+    ):
+        """Search every dictionary of a group for a term."""
         alreadyConjTyped = {}
-        results = {}
         group = selectedGroup["dictionaries"]
-        totalDefs = 0
         defEx = self.getDefEx(sT)
         op = "LIKE"
         if defEx:
-            column = "definition"
+            columns = ["definition"]
         elif sT == "Pronunciation":
-            column = "pronunciation"
+            columns = ["pronunciation"]
         else:
-            column = "term"
+            columns = ["term", "altterm", "pronunciation"]
         if sT == "Exact":
             op = "="
-        terms = [term]
-        terms.append(term.lower())
-        terms.append(term.capitalize())
-        terms = list(set(terms))
+        baseTerms = [term]
+        baseTerms.append(term.lower())
+        baseTerms.append(term.capitalize())
+        baseTerms = list(set(baseTerms))
+        plan = []
         for dic in group:
             if dic["dict"] == "Images":
-                results["Images"] = True
                 continue
             if deinflect:
                 if dic["lang"] in alreadyConjTyped:
-                    terms = alreadyConjTyped[dic["lang"]]
-                elif dic["lang"] in conjugations:
-                    terms = self.deconjugate(terms, conjugations[dic["lang"]])
-                    terms = self.applySearchType(terms, sT)
-                    alreadyConjTyped[dic["lang"]] = terms
+                    rawTerms, terms = alreadyConjTyped[dic["lang"]]
                 else:
-                    terms = self.applySearchType(terms, sT)
-                    alreadyConjTyped[dic["lang"]] = terms
+                    if dic["lang"] in conjugations:
+                        rawTerms = self.deconjugate(
+                            list(baseTerms), conjugations[dic["lang"]]
+                        )
+                    else:
+                        rawTerms = list(baseTerms)
+                    terms = self.applySearchType(list(rawTerms), sT)
+                    alreadyConjTyped[dic["lang"]] = (rawTerms, terms)
             else:
                 if term in alreadyConjTyped:
-                    terms = alreadyConjTyped[term]
+                    rawTerms, terms = alreadyConjTyped[term]
                 else:
-                    terms = self.applySearchType(terms, sT)
-                    alreadyConjTyped[term] = terms
+                    rawTerms = list(baseTerms)
+                    terms = self.applySearchType(list(rawTerms), sT)
+                    alreadyConjTyped[term] = (rawTerms, terms)
+            plan.append((dic["dict"], rawTerms, terms))
 
-            toQuery = self.getQueryCriteria(column, terms, op)
-            termTuple = tuple(terms)
-            allRs = self.executeSearch(dic["dict"], toQuery, dictLimit, termTuple)
-            if len(allRs) > 0:
-                dictRes = []
-                for r in allRs:
-                    totalDefs += 1
-                    dictRes.append(self.resultToDict(r))
-                    if totalDefs >= maxDefs:
-                        results[self.cleanDictName(dic["dict"])] = dictRes
-                        return results
-                results[self.cleanDictName(dic["dict"])] = dictRes
-            elif not defEx and not sT == "Pronunciation":
-                columns = ["altterm", "pronunciation"]
-                for col in columns:
-                    toQuery = self.getQueryCriteria(col, terms, op)
-                    termTuple = tuple(terms)
-                    allRs = self.executeSearch(
-                        dic["dict"], toQuery, dictLimit, termTuple
-                    )
-                    if len(allRs) > 0:
-                        dictRes = []
-                        for r in allRs:
-                            totalDefs += 1
-                            dictRes.append(self.resultToDict(r))
-                            if totalDefs >= maxDefs:
-                                results[self.cleanDictName(dic["dict"])] = dictRes
-                                return results
-                        results[self.cleanDictName(dic["dict"])] = dictRes
-                        break
+        found = self.executeGroupSearch(plan, columns, op, sT, int(dictLimit))
+        results = {}
+        totalDefs = 0
+        for dic in group:
+            if dic["dict"] == "Images":
+                results["Images"] = True
+                continue
+            allRs = found.get(dic["dict"], [])
+            if len(allRs) == 0:
+                continue
+            dictRes = []
+            for r in allRs:
+                totalDefs += 1
+                dictRes.append(self.resultToDict(r))
+                if totalDefs >= maxDefs:
+                    results[self.cleanDictName(dic["dict"])] = dictRes
+                    return results
+            results[self.cleanDictName(dic["dict"])] = dictRes
         return results
 
-    def processDefinitionHTML(self, text):
-        """Process HTML tags in dictionary definitions for proper display."""
-        if not isinstance(text, str):
-            text = str(text) if text is not None else ""
-        
-        # First convert any newlines to <br> tags
-        text = text.replace("\n", "<br>")
-        
-        # Handle <br> tags that might already be in definitions
-        # Convert any existing <br> or <br/> or <BR> tags to proper HTML line breaks
-        text = re.sub(r'<br\s*/?>', '<br>', text, flags=re.IGNORECASE)
-        
-        # Handle other common HTML entities that might appear in definitions
-        text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
-        
-        # Ensure proper line spacing for better readability
-        # Replace multiple consecutive <br> tags with proper spacing
-        text = re.sub(r'(<br>\s*){2,}', '<br><br>', text)
-        
-        return text
+    def executeGroupSearch(
+        self,
+        plan: List[Tuple[str, List[str], List[str]]],
+        columns: List[str],
+        op: str,
+        sT: str,
+        dictLimit: int,
+    ) -> Dict[str, List[Tuple[Any, ...]]]:
+        """Search every dictionary of a lookup plan with one statement per column.
+
+        Each column is searched with a single UNION ALL statement over the
+        dictionaries that have not matched yet, so a lookup takes at most one
+        round trip per column instead of one per dictionary and column.
+        Returns the rows grouped by dictionary table.
+        """
+        if not plan or not self._ensure_connection():
+            return {}
+        found: Dict[str, List[Tuple[Any, ...]]] = {}
+        pending = plan
+        for col in columns:
+            for start in range(0, len(pending), MAX_COMPOUND_SELECT):
+                chunk = pending[start : start + MAX_COMPOUND_SELECT]
+                try:
+                    rows = self.runGroupQuery(chunk, col, op, sT, dictLimit)
+                except sqlite3.Error:
+                    # One broken table must not hide the other dictionaries' results.
+                    rows = []
+                    for idx, entry in enumerate(chunk):
+                        try:
+                            rows += [
+                                (idx,) + r[1:]
+                                for r in self.runGroupQuery(
+                                    [entry], col, op, sT, dictLimit
+                                )
+                            ]
+                        except sqlite3.Error:
+                            continue
+                for r in rows:
+                    found.setdefault(chunk[r[0]][0], []).append(r[1:])
+            pending = [entry for entry in pending if entry[0] not in found]
+            if not pending:
+                break
+        return found
+
+    def runGroupQuery(
+        self,
+        plan: List[Tuple[str, List[str], List[str]]],
+        col: str,
+        op: str,
+        sT: str,
+        dictLimit: int,
+    ) -> List[Tuple[Any, ...]]:
+        """Run the compiled UNION ALL statement for one column of a lookup plan."""
+        useFts = [self.canUseFts(dictName, rawTerms, sT) for dictName, rawTerms, _ in plan]
+        key = (
+            tuple(dictName for dictName, _, _ in plan),
+            col,
+            op,
+            tuple(len(terms) for _, _, terms in plan),
+            tuple(useFts),
+        )
+        sql = self.queryPlanCache.get(key)
+        if sql is None:
+            sql = self.compileGroupQuery(plan, col, op, useFts)
+            if len(self.queryPlanCache) >= QUERY_PLAN_CACHE_SIZE:
+                self.queryPlanCache.clear()
+            self.queryPlanCache[key] = sql
+        params: List[Any] = []
+        for (_, rawTerms, terms), fts in zip(plan, useFts):
+            if fts:
+                params.append(self.getFtsMatch(col, rawTerms))
+            params += terms
+            params.append(dictLimit)
+        with self._read_cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def compileGroupQuery(
+        self,
+        plan: List[Tuple[str, List[str], List[str]]],
+        col: str,
+        op: str,
+        useFts: List[bool],
+    ) -> str:
+        """Compile one column of a lookup plan into a UNION ALL statement.
+
+        Every dictionary contributes an ordered, LIMITed subquery tagged with its
+        rank in the plan, so the rows can be handed back to the right dictionary
+        without sorting the whole compound result again.
+        """
+        selects = []
+        for dictRank, ((dictName, _, terms), fts) in enumerate(zip(plan, useFts)):
+            selects.append(
+                "SELECT * FROM (SELECT "
+                + str(dictRank)
+                + " AS dictRank, term, altterm, pronunciation, pos, "
+                + DEFINITION_HTML_SQL
+                + ", examples, audio, starCount, frequency FROM "
+                + dictName
+                + " WHERE ("
+                + self.getSearchCriteria(dictName, col, len(terms), op, fts)
+                + ") ORDER BY LENGTH(term) ASC, frequency ASC LIMIT ?)"
+            )
+        return " UNION ALL ".join(selects) + ";"
+
+    def getSearchCriteria(
+        self, dictName: str, col: str, termCount: int, op: str, useFts: bool
+    ) -> str:
+        """Build the WHERE clause for searching one column of a dictionary.
+
+        Substring, suffix and definition searches are first narrowed through the
+        dictionary's FTS5 trigram index when it has one; the LIKE criteria are
+        still applied so results match the unindexed search exactly.
+        """
+        toQuery = self.getQueryCriteria(col, range(termCount), op)
+        if not useFts:
+            return toQuery
+        ftsTable = dictName + FTS_SUFFIX
+        return (
+            " rowid IN (SELECT rowid FROM "
+            + ftsTable
+            + " WHERE "
+            + ftsTable
+            + " MATCH ?) AND ("
+            + toQuery
+            + ") "
+        )
+
+    def canUseFts(self, dictName: str, rawTerms: List[str], sT: str) -> bool:
+        """Check whether a search can be narrowed through the FTS5 index."""
+        if sT not in FTS_SEARCH_TYPES or not self.hasFtsIndex(dictName):
+            return False
+        return all(len(t) >= FTS_MIN_TERM_LENGTH for t in rawTerms)
+
+    def getFtsMatch(self, col: str, rawTerms: List[str]) -> str:
+        """Get the FTS5 MATCH expression for the terms in one column."""
+        return " OR ".join(
+            col + ' : "' + t.replace('"', '""') + '"' for t in rawTerms
+        )
+
+    def hasFtsIndex(self, dictName: str) -> bool:
+        """Check whether a dictionary table has an FTS5 shadow index."""
+        if not self.ftsEnabled or not self._ensure_connection():
+            return False
+        if self.ftsTables is None:
+            with self._read_cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND sql LIKE 'CREATE VIRTUAL TABLE%';"
+                )
+                self.ftsTables = {r[0] for r in cursor.fetchall()}
+        return dictName + FTS_SUFFIX in self.ftsTables
 
     def resultToDict(self, r):
         # Create the output dictionary
@@ -524,7 +843,7 @@ class DictDB:
             "altterm": r[1],
             "pronunciation": r[2],
             "pos": r[3],
-            "definition": self.processDefinitionHTML(r[4]),
+            "definition": r[4],
             "examples": r[5],
             "audio": r[6],
             "starCount": r[7],
@@ -539,18 +858,20 @@ class DictDB:
         if not self._ensure_connection():
             return []
         try:
-            cursor = self._get_cursor()
-            cursor.execute(
-                "SELECT term, altterm, pronunciation, pos, definition, examples, audio, starCount FROM "
-                + dictName
-                + " WHERE "
-                + toQuery
-                + " ORDER BY LENGTH(term) ASC, frequency ASC LIMIT "
-                + dictLimit
-                + " ;",
-                termTuple,
-            )
-            out = cursor.fetchall()
+            with self._read_cursor() as cursor:
+                cursor.execute(
+                    "SELECT term, altterm, pronunciation, pos, "
+                    + DEFINITION_HTML_SQL
+                    + ", examples, audio, starCount FROM "
+                    + dictName
+                    + " WHERE "
+                    + toQuery
+                    + " ORDER BY LENGTH(term) ASC, frequency ASC LIMIT "
+                    + dictLimit
+                    + " ;",
+                    termTuple,
+                )
+                out = cursor.fetchall()
             # print("executeSearch", out)
             return out
         except:
@@ -584,51 +905,235 @@ class DictDB:
     def cleanLT(self, text):
         return re.sub(r"<((?:[^b][^r])|(?:[b][^r]))", r"&lt;\1", str(text))
 
-    def createDB(self, text: str) -> None:
-        """Create a new dictionary table with indexes."""
+    def createDB(self, text: str, deferIndexes: bool = False) -> None:
+        """Create a new dictionary table, with indexes unless they are built after a bulk import."""
         cursor = self._get_cursor()
         cursor.execute(
             "CREATE TABLE  IF NOT EXISTS  "
             + text
-            + "(term CHAR(40) NOT NULL, altterm CHAR(40), pronunciation CHAR(100), pos CHAR(40), definition TEXT, examples TEXT, audio TEXT, frequency MEDIUMINT, starCount TEXT);"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS it" + text + " ON " + text + " (term);"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS itp"
-            + text
-            + " ON "
-            + text
-            + " ( term, pronunciation );"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS ia" + text + " ON " + text + " (altterm);"
+            + "(id INTEGER PRIMARY KEY, term CHAR(40) NOT NULL, altterm CHAR(40), pronunciation CHAR(100), pos CHAR(40), definition TEXT, examples TEXT, audio TEXT, frequency MEDIUMINT, starCount TEXT, definitionHtml TEXT);"
         )
+        if deferIndexes:
+            return
+        self.createIndexes(text)
+        self.createFtsIndex(text)
+
+    def createIndexes(self, text: str) -> None:
+        """Create the lookup indexes of a dictionary table."""
+        cursor = self._get_cursor()
+        for prefix, columns in DICT_INDEXES:
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS "
+                + prefix
+                + text
+                + " ON "
+                + text
+                + " ("
+                + columns
+                + ");"
+            )
+
+    def createFtsIndex(self, text: str) -> None:
+        """Create the FTS5 trigram shadow index for a dictionary table.
+
+        The index uses the table as external content keyed on its INTEGER PRIMARY
+        KEY, so it stays valid when VACUUM renumbers implicit rowids.
+        """
+        if not self.ftsEnabled:
+            return
+        cursor = self._get_cursor()
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS iap"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS "
             + text
-            + " ON "
+            + FTS_SUFFIX
+            + " USING fts5(term, altterm, pronunciation, definition, content='"
             + text
-            + " ( altterm, pronunciation );"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS ia" + text + " ON " + text + " (pronunciation);"
+            + "', content_rowid='id', tokenize='trigram');"
         )
+        self.ftsTables = None
+        self.queryPlanCache.clear()
 
     def importToDict(
-        self, dictName: str, dictionaryData: List[Tuple[Any, ...]]
+        self, dictName: str, dictionaryData: Iterable[Tuple[Any, ...]]
     ) -> None:
-        """Import dictionary data to specified dictionary table."""
+        """Import dictionary rows to a dictionary table in fixed-size batches.
+
+        Rows may come from a generator; only IMPORT_BATCH_SIZE of them are held
+        at a time. Nothing is committed, so the whole import stays one transaction.
+        """
         if not self._ensure_connection():
             return
-        cursor = self._get_cursor()
-        cursor.executemany(
-            "INSERT INTO "
-            + dictName
-            + " (term, altterm, pronunciation, pos, definition, examples, audio, frequency, starCount) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);",
-            dictionaryData,
-        )
+        with self.writeLock:
+            self.clearSearchCache()
+            cursor = self._get_cursor()
+            hasFts = self.hasFtsIndex(dictName)
+            if hasFts:
+                cursor.execute("SELECT IFNULL(MAX(id), 0) FROM " + dictName + ";")
+                lastId = cursor.fetchone()[0]
+            rows = iter(dictionaryData)
+            try:
+                while True:
+                    batch = list(islice(rows, IMPORT_BATCH_SIZE))
+                    if not batch:
+                        break
+                    cursor.executemany(
+                        "INSERT INTO "
+                        + dictName
+                        + " (term, altterm, pronunciation, pos, definition, examples, audio, frequency, starCount, definitionHtml) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+                        batch,
+                    )
+                if hasFts:
+                    cursor.execute(
+                        "INSERT INTO "
+                        + dictName
+                        + FTS_SUFFIX
+                        + " (rowid, term, altterm, pronunciation, definition) SELECT id, term, altterm, pronunciation, definition FROM "
+                        + dictName
+                        + " WHERE id > ?;",
+                        (lastId,),
+                    )
+            except Exception:
+                # Do not leave a half-imported dictionary for the next commit.
+                self._get_connection().rollback()
+                raise
+
+    def createFrequencyTable(self) -> None:
+        """Create the table holding every language's frequency list."""
+        with self.writeLock:
+            cursor = self._get_cursor()
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS frequency (lid INTEGER NOT NULL, term TEXT NOT NULL, reading TEXT NOT NULL, rank INTEGER NOT NULL);"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS ifreq ON frequency (lid, term, reading);"
+            )
+            self.commitChanges()
+
+    def hasFrequencyList(self, lang: str) -> bool:
+        """Check whether a frequency list was imported for a language."""
+        if not self._ensure_connection():
+            return False
+        lid = self.getLangId(lang)
+        with self._read_cursor() as cursor:
+            cursor.execute("SELECT 1 FROM frequency WHERE lid = ? LIMIT 1;", (lid,))
+            return cursor.fetchone() is not None
+
+    def importFrequencyList(self, lang: str, frequencyList: List[Any]) -> bool:
+        """Replace a language's frequency list, ranking terms by their position.
+
+        Lists are either plain terms or [term, reading] pairs. Returns False when
+        the list has neither format.
+        """
+        if not self._ensure_connection() or not frequencyList:
+            return False
+        first = frequencyList[0]
+        if isinstance(first, str):
+            rows = ((f, "", rank) for rank, f in enumerate(frequencyList))
+        elif (
+            isinstance(first, list)
+            and len(first) == 2
+            and isinstance(first[0], str)
+            and isinstance(first[1], str)
+        ):
+            rows = ((f[0], f[1], rank) for rank, f in enumerate(frequencyList))
+        else:
+            return False
+        lid = self.getLangId(lang)
+        with self.writeLock:
+            cursor = self._get_cursor()
+            cursor.execute("DELETE FROM frequency WHERE lid = ?;", (lid,))
+            cursor.executemany(
+                "INSERT INTO frequency (lid, term, reading, rank) VALUES (" + str(lid) + ", ?, ?, ?);",
+                rows,
+            )
+            self.commitChanges()
+        return True
+
+    def loadFrequencyFile(self, lang: str, filePath: str) -> bool:
+        """Import a frequency list JSON file for a language."""
+        try:
+            with open(filePath, "r", encoding="utf-8-sig") as frequencyFile:
+                frequencyList = json.load(frequencyFile)
+        except (OSError, ValueError):
+            return False
+        return self.importFrequencyList(lang, frequencyList)
+
+    def applyFrequencyList(self, lang: str, dictNames: Optional[List[str]] = None) -> None:
+        """Back-fill frequency ranks and star counts from a language's frequency list.
+
+        Applies to the given dictionary tables, or to every dictionary of the
+        language, so new frequency data does not require re-importing them.
+        Every row is re-ranked; terms missing from the list become unranked.
+        During a bulk import nothing is committed, so finishBulkImport commits
+        the rows once they are indexed.
+        """
+        if not self._ensure_connection() or not self.hasFrequencyList(lang):
+            return
+        lid = self.getLangId(lang)
+        if dictNames is None:
+            dictNames = [
+                self.formatDictName(lid, name) for name in self.getDictsByLanguage(lang)
+            ]
+        with self.writeLock:
+            cursor = self._get_cursor()
+            for dictName in dictNames:
+                # One pass over the table; the star count is derived from the
+                # new rank, which the inner SELECT looks up once per row.
+                cursor.execute(
+                    "UPDATE "
+                    + dictName
+                    + " SET (frequency, starCount) = (SELECT frequency, "
+                    + STAR_COUNT_SQL
+                    + " FROM (SELECT IFNULL((SELECT MIN(rank) FROM frequency f WHERE f.lid = ? AND f.term = "
+                    + dictName
+                    + ".term AND f.reading IN ('', katakana("
+                    + dictName
+                    + ".pronunciation))), ?) AS frequency));",
+                    (lid, UNRANKED_FREQUENCY),
+                )
+            if not self.bulkImportActive:
+                self.commitChanges()
+            self.clearSearchCache()
+
+    def beginBulkImport(self) -> None:
+        """Stop syncing to disk on every write while a dictionary is bulk loaded."""
+        if not self._ensure_connection():
+            return
+        with self.writeLock:
+            self.commitChanges()
+            cursor = self._get_cursor()
+            cursor.execute("PRAGMA synchronous;")
+            self.bulkSynchronous = cursor.fetchone()[0]
+            cursor.execute("PRAGMA synchronous=OFF;")
+            self.bulkImportActive = True
+
+    def finishBulkImport(self, dictName: str) -> None:
+        """Index a bulk loaded dictionary table, commit it and restore syncing."""
+        if not self._ensure_connection():
+            return
+        with self.writeLock:
+            cursor = self._get_cursor()
+            try:
+                self.createIndexes(dictName)
+                if self.ftsEnabled:
+                    self.createFtsIndex(dictName)
+                    cursor.execute(
+                        "INSERT INTO "
+                        + dictName
+                        + FTS_SUFFIX
+                        + "("
+                        + dictName
+                        + FTS_SUFFIX
+                        + ") VALUES('rebuild');"
+                    )
+                cursor.execute("ANALYZE " + dictName + ";")
+                self.commitChanges()
+            finally:
+                self.bulkImportActive = False
+                cursor.execute(
+                    "PRAGMA synchronous=" + str(self.bulkSynchronous) + ";"
+                )
+            self.clearSearchCache()
 
     def dropTables(self, text: str) -> None:
         """Drop all tables matching the given pattern."""
@@ -636,142 +1141,127 @@ class DictDB:
             return
         cursor = self._get_cursor()
         cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ?;",
+            "SELECT name, sql FROM sqlite_master WHERE type='table' AND name LIKE ?;",
             (text,),
         )
-        dicts = cursor.fetchall()
-        for name in dicts:
-            cursor.execute("DROP TABLE " + name[0] + " ;")
+        for name, sql in cursor.fetchall():
+            # FTS indexes and their shadow tables are dropped with their dictionary.
+            if sql.startswith("CREATE VIRTUAL TABLE") or name.endswith(
+                FTS_SHADOW_SUFFIXES
+            ):
+                continue
+            cursor.execute("DROP TABLE IF EXISTS " + name + FTS_SUFFIX + " ;")
+            cursor.execute("DROP TABLE IF EXISTS " + name + " ;")
+        self.ftsTables = None
+        self.queryPlanCache.clear()
+
+    def getDictMetadata(self) -> Dict[str, Dict[str, Any]]:
+        """Get the term header, duplicate header, fields and add type of every dictionary.
+
+        They are read in one query the first time and kept until a setter or
+        an added or deleted dictionary invalidates them. The returned values
+        are shared and must not be modified.
+        """
+        with self.metadataLock:
+            if self.dictMetadata is not None:
+                return self.dictMetadata
+            if not self._ensure_connection():
+                return {}
+            metadata: Dict[str, Dict[str, Any]] = {}
+            with self._read_cursor() as cursor:
+                cursor.execute(
+                    "SELECT dictname, termHeader, duplicateHeader, fields, addtype FROM dictnames"
+                )
+                rows = cursor.fetchall()
+            for dictname, termHeader, duplicateHeader, fields, addType in rows:
+                try:
+                    termHeader = json.loads(termHeader)
+                    fields = json.loads(fields)
+                except (TypeError, ValueError):
+                    continue
+                metadata[dictname] = {
+                    "termHeader": termHeader,
+                    "duplicateHeader": duplicateHeader,
+                    "fields": fields,
+                    "addType": addType,
+                }
+            self.dictMetadata = metadata
+            return metadata
+
+    def invalidateDictMetadata(self) -> None:
+        """Reload the dictionary metadata on next use."""
+        with self.metadataLock:
+            self.dictMetadata = None
+            self.metadataVersion += 1
+
+    def setDictMetadata(self, column: str, value: Any, name: str) -> None:
+        """Update one dictnames column of a dictionary and invalidate the metadata."""
+        if not self._ensure_connection():
+            return
+        with self.writeLock:
+            cursor = self._get_cursor()
+            cursor.execute(
+                "UPDATE dictnames SET " + column + " = ? WHERE dictname=?", (value, name)
+            )
+            self.commitChanges()
+        self.invalidateDictMetadata()
 
     def setFieldsSetting(self, name: str, fields: str) -> None:
         """Set the fields setting for a dictionary."""
-        if not self._ensure_connection():
-            return
-        cursor = self._get_cursor()
-        cursor.execute(
-            "UPDATE dictnames SET fields = ? WHERE dictname=?", (fields, name)
-        )
-        self.commitChanges()
+        self.setDictMetadata("fields", fields, name)
 
     def setAddType(self, name: str, addType: str) -> None:
         """Set add type for a dictionary."""
-        if not self._ensure_connection():
-            return
-        cursor = self._get_cursor()
-        cursor.execute(
-            "UPDATE dictnames SET addtype = ? WHERE dictname=?", (addType, name)
-        )
-        self.commitChanges()
+        self.setDictMetadata("addtype", addType, name)
 
-    def getFieldsSetting(self, name: str) -> Optional[Dict[str, Any]]:
+    def getFieldsSetting(self, name: str) -> Optional[List[str]]:
         """Get fields setting for a dictionary."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute("SELECT fields FROM dictnames WHERE dictname=?", (name,))
-        try:
-            result = cursor.fetchone()
-            if result:
-                return json.loads(result[0])
-            return None
-        except:
-            return None
+        metadata = self.getDictMetadata().get(name)
+        return metadata["fields"] if metadata else None
 
     def getAddTypeAndFields(
         self, dictName: str
-    ) -> Optional[Tuple[Dict[str, Any], str]]:
+    ) -> Optional[Tuple[List[str], str]]:
         """Get add type and fields for a dictionary."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute(
-            "SELECT fields, addtype FROM dictnames WHERE dictname=?", (dictName,)
-        )
-        try:
-            result = cursor.fetchone()
-            if result:
-                fields, addType = result
-                return json.loads(fields), addType
-            return None
-        except:
+        metadata = self.getDictMetadata().get(dictName)
+        if metadata is None:
             return None
+        return metadata["fields"], metadata["addType"]
 
     def getDupHeaders(self) -> Optional[Dict[str, int]]:
         """Get duplicate headers for all dictionaries."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute("SELECT dictname, duplicateHeader FROM dictnames")
-        try:
-            dictHeaders = cursor.fetchall()
-            results: Dict[str, int] = {}
-            if len(dictHeaders) > 0:
-                for r in dictHeaders:
-                    results[r[0]] = r[1]
-                return results
-        except:
+        metadata = self.getDictMetadata()
+        if not metadata:
             return None
+        return {name: m["duplicateHeader"] for name, m in metadata.items()}
 
     def setDupHeader(self, duplicateHeader: int, name: str) -> None:
         """Set duplicate header for a dictionary."""
-        if not self._ensure_connection():
-            return
-        cursor = self._get_cursor()
-        cursor.execute(
-            "UPDATE dictnames SET duplicateHeader = ? WHERE dictname=?",
-            (duplicateHeader, name),
-        )
-        self.commitChanges()
+        self.setDictMetadata("duplicateHeader", duplicateHeader, name)
 
     def getTermHeaders(self) -> Optional[Dict[str, List[str]]]:
         """Get term headers for all dictionaries."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute("SELECT dictname, termHeader FROM dictnames")
-        try:
-            dictHeaders = cursor.fetchall()
-            results: Dict[str, List[str]] = {}
-            if len(dictHeaders) > 0:
-                for r in dictHeaders:
-                    results[r[0]] = json.loads(r[1])
-                return results
-        except:
+        metadata = self.getDictMetadata()
+        if not metadata:
             return None
+        return {name: m["termHeader"] for name, m in metadata.items()}
 
     def getAddType(self, name: str) -> Optional[str]:
         """Get add type for a dictionary."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute("SELECT addtype FROM dictnames WHERE dictname=?", (name,))
-        try:
-            result = cursor.fetchone()
-            return result[0] if result else None
-        except:
-            return None
+        metadata = self.getDictMetadata().get(name)
+        return metadata["addType"] if metadata else None
 
     def getDictTermHeader(self, dictname: str) -> Optional[str]:
         """Get term header for a specific dictionary."""
-        if not self._ensure_connection():
-            return None
-        cursor = self._get_cursor()
-        cursor.execute("SELECT termHeader FROM dictnames WHERE dictname=?", (dictname,))
-        result = cursor.fetchone()
-        return result[0] if result else None
+        metadata = self.getDictMetadata().get(dictname)
+        return json.dumps(metadata["termHeader"]) if metadata else None
 
     def setDictTermHeader(self, dictname: str, termheader: str) -> None:
         """Set term header for a dictionary."""
-        if not self._ensure_connection():
-            return
-        cursor = self._get_cursor()
-        cursor.execute(
-            "UPDATE dictnames SET termHeader = ? WHERE dictname=?",
-            (termheader, dictname),
-        )
-        self.commitChanges()
+        self.setDictMetadata("termHeader", termheader, dictname)
 
     def commitChanges(self) -> None:
         """Commit changes to the database."""
-        conn = self._get_connection()
-        conn.commit()
+        with self.writeLock:
+            conn = self._get_connection()
+            conn.commit()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Deinflection of search terms using a language's conjugation rules.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# How many rules may be chained onto one term, e.g. 食べさせられた -> 食べさせられる -> 食べさせる.
+MAX_DEINFLECTION_STEPS = 3
+# Upper bound on the deinflected candidates produced for one lookup.
+MAX_DEINFLECTION_CANDIDATES = 50
+
+# Trie nodes map a character to the next node; the rules ending at a node
+# are stored under this key, which can never be a single character.
+RULES_KEY = "rules"
+
+
+class Deinflector:
+    """Conjugation rules compiled into a trie of reversed inflected suffixes."""
+
+    def __init__(
+        self,
+        conjugations: List[Dict[str, Any]],
+        maxSteps: int = MAX_DEINFLECTION_STEPS,
+        maxCandidates: int = MAX_DEINFLECTION_CANDIDATES,
+    ) -> None:
+        self.maxSteps = maxSteps
+        self.maxCandidates = maxCandidates
+        self.ruleCount = 0
+        self.trie: Dict[str, Any] = {}
+        for c in conjugations:
+            self.addRule(c["inflected"], c["dict"], c.get("prefix"))
+
+    def addRule(
+        self, inflected: str, dictForms: List[str], prefix: Optional[str] = None
+    ) -> None:
+        """Add a rule replacing the inflected suffix with each dictionary form."""
+        node = self.trie
+        for char in reversed(inflected):
+            node = node.setdefault(char, {})
+        node.setdefault(RULES_KEY, []).append(
+            (len(inflected), tuple(dictForms), prefix)
+        )
+        self.ruleCount += 1
+
+    def matchingRules(
+        self, term: str
+    ) -> List[Tuple[int, Tuple[str, ...], Optional[str]]]:
+        """Get the rules whose inflected suffix ends the term, shortest first."""
+        node = self.trie
+        rules = list(node.get(RULES_KEY, []))
+        for char in reversed(term):
+            node = node.get(char)
+            if node is None:
+                break
+            rules += node.get(RULES_KEY, [])
+        return rules
+
+    def deinflectOnce(self, term: str) -> List[str]:
+        """Get the candidates produced by applying a single rule to the term."""
+        candidates = []
+        for suffixLength, dictForms, prefix in self.matchingRules(term):
+            stem = term[: len(term) - suffixLength]
+            for x in dictForms:
+                deinflected = stem + x
+                if prefix and deinflected.startswith(prefix):
+                    candidates.append(deinflected[len(prefix) :])
+                candidates.append(deinflected)
+        return candidates
+
+    def deinflect(self, terms: List[str]) -> List[str]:
+        """Get the terms followed by their deinflected candidates."""
+        seen = set(terms)
+        candidates: List[str] = []
+        frontier = list(terms)
+        for _ in range(self.maxSteps):
+            nextFrontier = []
+            for term in frontier:
+                for candidate in self.deinflectOnce(term):
+                    if len(candidate) <= 1 or candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    candidates.append(candidate)
+                    nextFrontier.append(candidate)
+                    if len(candidates) >= self.maxCandidates:
+                        return terms + candidates
+            if not nextFrontier:
+                break
+            frontier = nextFrontier
+        return terms + candidates
@@ -38,7 +38,22 @@ from ..utils.history import HistoryBrowser, HistoryModel
 from aqt.editor import Editor
 from ..exporters.card_exporter import CardExporter
 import time
+from collections import OrderedDict
 from . import database as dictdb
+from .bridge import Bridge, jsCall
+from .deinflection import Deinflector
+from .latency import LatencyHistogram
+from .rendering import DeferredEntries, ResultsPage
+from .streaming import SEARCH_PHASES, SearchWorker, StreamedSearch
+
+# Searches whose left-out entries are kept for the web view to request.
+DEFERRED_SEARCHES = 30
+# Searches remembered for restoring tabs whose content was dropped.
+TAB_SEARCHES = 200
+# Seconds to wait for an image that has to be downloaded again to export it.
+IMAGE_EXPORT_TIMEOUT = 10
+# Stands for the per-search radio group number in cached settings controls.
+RADIO_SLOT = "◳r"
 
 
 # Suppress Qt SVG warnings about path data
@@ -55,6 +70,28 @@ def qt_message_handler(mode, context, message):
         print(f"Qt Fatal: {message}")
 
 
+# Icons embedded as data URLs, by path; they are read and encoded once per session.
+iconCache: Dict[str, str] = {}
+
+
+def loadBase64Icon(icon_path: str) -> str:
+    """Get an icon as a base64 data URL."""
+    if icon_path in iconCache:
+        return iconCache[icon_path]
+    try:
+        with open(icon_path, "rb") as icon_file:
+            icon_base64 = base64.b64encode(icon_file.read()).decode("utf-8")
+    except Exception as e:
+        print(f"Error loading icon {icon_path}: {e}")
+        return ""
+    if icon_path.endswith(".svg"):
+        mime_type = "image/svg+xml"
+    else:
+        mime_type = "image/png"
+    iconCache[icon_path] = f"data:{mime_type};base64,{icon_base64}"
+    return iconCache[icon_path]
+
+
 # Install the message handler
 qInstallMessageHandler(qt_message_handler)
 import aqt
@@ -86,10 +123,15 @@ class MIDict(AnkiWebView):
         self.jSend = self.config["jReadingEdit"]
         self.maxW = self.config["maxWidth"]
         self.maxH = self.config["maxHeight"]
+        self.bridge = self.createBridge()
         self.onBridgeCmd = self.handleDictAction
         self.db = db
-        self.termHeaders = self.formatTermHeaders(self.db.getTermHeaders())
-        self.dupHeaders = self.db.getDupHeaders()
+        self.termHeaders = None
+        self.dupHeaders = None
+        self.metadataVersion = None
+        # Settings controls of each dictionary, with RADIO_SLOT for the radio group.
+        self.settingsFragments: Dict[str, str] = {}
+        self.settingsFieldNames: Optional[List[str]] = None
         self.sType = False
         self.radioCount = 0
         self.homeDir = path
@@ -104,12 +146,36 @@ class MIDict(AnkiWebView):
         self.reviewer = False
         self.threadpool = QThreadPool()
         self.customFontsLoaded = []
+        self.resultsPage = ResultsPage(self)
+        self.refreshDictMetadata()
+        self.searchCount = 0
+        self.searchWorkers: Dict[int, SearchWorker] = {}
+        self.searchLatency = LatencyHistogram(SEARCH_PHASES)
+        # What each recent search looked up, so tabs the web view dropped can be restored.
+        self.tabSearches: "OrderedDict[int, Tuple[str, Dict[str, Any], str, bool]]" = OrderedDict()
+        # Entries left out of recent results pages, by search id.
+        self.deferredEntries: "OrderedDict[int, DeferredEntries]" = OrderedDict()
+        # The term and future of the running image prefetch.
+        self.imagePrefetch: Optional[Tuple[str, Any]] = None
 
     def resetConfiguration(self, config):
         self.config = config
         self.jSend = self.config["jReadingEdit"]
         self.maxW = self.config["maxWidth"]
         self.maxH = self.config["maxHeight"]
+        self.resultsPage = ResultsPage(self)
+        self.settingsFragments = {}
+        self.setTabBudget()
+
+    def setTabBudget(self):
+        """Tell the web view how many tabs, and how much of their content, to keep."""
+        self.eval(
+            jsCall(
+                "setTabBudget",
+                int(self.config.get("maxLoadedTabs", 8)),
+                int(self.config.get("maxLoadedTabsMB", 64)),
+            )
+        )
 
     def loadImageResults(self, results):
         """
@@ -119,10 +185,7 @@ class MIDict(AnkiWebView):
                 idName: Unique identifier for the image container
         """
         html, idName = results
-        # Use json.dumps to safely encode the HTML for JavaScript
-        escaped_html = json.dumps(html)
-        escaped_idName = json.dumps(idName)
-        self.eval("loadImageHtml(%s, %s);" % (escaped_html, escaped_idName))
+        self.eval(jsCall("loadImageHtml", html, idName))
 
     def downloadImage(self, url):
         try:
@@ -147,22 +210,7 @@ class MIDict(AnkiWebView):
 
     def getBase64Icon(self, icon_name):
         """Convert icon to base64 data URL for embedding in HTML"""
-        try:
-            icon_path = join(self.addon_root, "assets", "icons", icon_name)
-            with open(icon_path, "rb") as icon_file:
-                icon_data = icon_file.read()
-                icon_base64 = base64.b64encode(icon_data).decode('utf-8')
-                # Determine MIME type based on file extension
-                if icon_name.endswith('.png'):
-                    mime_type = 'image/png'
-                elif icon_name.endswith('.svg'):
-                    mime_type = 'image/svg+xml'
-                else:
-                    mime_type = 'image/png'  # Default fallback
-                return f"data:{mime_type};base64,{icon_base64}"
-        except Exception as e:
-            print(f"Error loading icon {icon_name}: {e}")
-            return ""
+        return loadBase64Icon(join(self.addon_root, "assets", "icons", icon_name))
 
     def formatTermHeaders(self, ths):
         formattedHeaders = {}
@@ -205,7 +253,7 @@ class MIDict(AnkiWebView):
                 if not os.path.exists(filePath):
                     continue
             with open(filePath, "r", encoding="utf-8") as conjugationsFile:
-                conjugations[lang] = json.loads(conjugationsFile.read())
+                conjugations[lang] = Deinflector(json.loads(conjugationsFile.read()))
         return conjugations
 
     def cleanTerm(self, term):
@@ -227,35 +275,13 @@ class MIDict(AnkiWebView):
 
     def injectFont(self, font):
         name = re.sub(r"\..*$", "", font)
-        self.eval("addCustomFont('%s', '%s');" % (font, name))
+        self.eval(jsCall("addCustomFont", font, name))
 
     def getTabMode(self):
         if self.dictInt.tabB.singleTab:
             return "true"
         return "false"
 
-    def getHTMLResult(self, term, selectedGroup):
-        singleTab = self.getTabMode()
-        cleaned = self.cleanTerm(term)
-        font = self.getFontFamily(selectedGroup)
-        dictDefs = self.config["dictSearch"]
-        maxDefs = self.config["maxSearch"]
-        html = self.prepareResults(
-            self.db.searchTerm(
-                term,
-                selectedGroup,
-                self.conjugations,
-                self.sType.currentText(),
-                self.deinflect,
-                str(dictDefs),
-                maxDefs,
-            ),
-            cleaned,
-            font,
-        )
-        html = html.replace("\n", "")
-        return html, cleaned, singleTab
-
     def addNewTab(self, term, selectedGroup):
         if (
             selectedGroup["customFont"]
@@ -263,309 +289,178 @@ class MIDict(AnkiWebView):
         ):
             self.customFontsLoaded.append(selectedGroup["font"])
             self.injectFont(selectedGroup["font"])
-        html, cleaned, singleTab = self.getHTMLResult(term, selectedGroup)
-        self.eval(
-            "addNewTab('%s', '%s', %s);"
-            % (html.replace("\r", "<br>").replace("\n", "<br>"), cleaned, singleTab)
+        singleTab = self.getTabMode()
+        for worker in self.searchWorkers.values():
+            # A lookup is superseded unless it already has a tab of its own.
+            if singleTab == "true" or not worker.shown:
+                worker.cancel()
+        self.startSearch(
+            term, selectedGroup, self.sType.currentText(), self.deinflect, singleTab
         )
 
-    def addResultWrappers(self, results):
-        for idx, result in enumerate(results):
-            if "dictionaryTitleBlock" not in result:
-                results[idx] = '<div class="definitionBlock">' + result + "</div>"
-        return results
-
-    def escapePunctuation(self, term):
-        return re.sub(r"([.*+(\[\]{}\\?)!])", "\\\1", term)
+    def restoreTab(self, searchId):
+        """Search again for a tab whose content the web view dropped to save memory."""
+        tabSearch = self.tabSearches.get(searchId)
+        if tabSearch is None:
+            return
+        term, selectedGroup, sT, deinflect = tabSearch
+        self.startSearch(term, selectedGroup, sT, deinflect, "false", searchId)
+
+    def startSearch(self, term, selectedGroup, sT, deinflect, singleTab, restoreId=None):
+        """Look up a term on a search worker, for a new tab or a tab to restore."""
+        self.searchCount += 1
+        self.tabSearches[self.searchCount] = (term, selectedGroup, sT, deinflect)
+        if len(self.tabSearches) > TAB_SEARCHES:
+            self.tabSearches.popitem(last=False)
+        search = StreamedSearch(
+            self.db,
+            term,
+            selectedGroup["dictionaries"],
+            self.conjugations,
+            sT,
+            deinflect,
+            str(self.config["dictSearch"]),
+            self.config["maxSearch"],
+            self.config.get("streamResults", True),
+        )
+        deferred = DeferredEntries()
+        self.deferredEntries[self.searchCount] = deferred
+        if len(self.deferredEntries) > DEFERRED_SEARCHES:
+            self.deferredEntries.popitem(last=False)
+        worker = SearchWorker(
+            search,
+            self.resultsPage,
+            self.searchLatency,
+            self.searchCount,
+            self.cleanTerm(term),
+            self.getFontFamily(selectedGroup),
+            singleTab,
+            self.getSearchSettings(selectedGroup),
+            deferred,
+            restoreId,
+        )
+        worker.signals.pageReady.connect(
+            lambda html, imagesId, worker=worker: self.showSearchPage(
+                worker, html, imagesId
+            )
+        )
+        worker.signals.resultsReady.connect(
+            lambda sideBar, main, imagesId, worker=worker: self.appendSearchResults(
+                worker, sideBar, main, imagesId
+            )
+        )
+        worker.signals.finished.connect(
+            lambda worker=worker: self.searchWorkers.pop(worker.searchId, None)
+        )
+        self.searchWorkers[worker.searchId] = worker
+        self.threadpool.start(worker)
 
-    def highlightTarget(self, text, term):
-        if self.config["highlightTarget"]:
-            if not isinstance(text, str):
-                text = str(text) if text is not None else ""
-            try:
-                # Split text into HTML tags and content
-                parts = re.split(r"(<[^>]*>)", text)
-
-                # Only apply highlighting to non-tag parts
-                for i in range(0, len(parts), 2):  # Process only non-tag parts
-                    if parts[i]:  # Skip empty strings
-                        # For Japanese text, we don't need word boundaries
-                        if any(
-                            "\u4e00" <= c <= "\u9fff"
-                            or "\u3040" <= c <= "\u309f"
-                            or "\u30a0" <= c <= "\u30ff"
-                            for c in term
-                        ):
-                            pattern = "(" + self.escapePunctuation(term) + ")"
-                        else:
-                            # For non-Japanese text, keep word boundaries
-                            pattern = r"\b(" + self.escapePunctuation(term) + r")\b"
+    def refreshDictMetadata(self):
+        """Drop headers and settings built from dictionary metadata that has changed since."""
+        if self.metadataVersion == self.db.metadataVersion:
+            return
+        self.metadataVersion = self.db.metadataVersion
+        self.termHeaders = self.formatTermHeaders(self.db.getTermHeaders())
+        self.dupHeaders = self.db.getDupHeaders() or {}
+        self.resultsPage.clearCache()
+        self.settingsFragments = {}
 
-                        parts[i] = re.sub(
-                            pattern, r'<span class="targetTerm">\1</span>', parts[i]
-                        )
+    def getSearchSettings(self, selectedGroup):
+        """Render the settings controls of a group's dictionaries for a search worker.
 
-                return "".join(parts)
-            except Exception as e:
-                print(f"Error during highlightTarget: {e}")
-                return text  # Fallback to the original text
-        return text
+        A dictionary's controls are rendered once and reused until its
+        metadata or the collection's field names change; only the radio group
+        name differs from one search to the next.
+        """
+        self.refreshDictMetadata()
+        fieldNames = self.getFieldNames()
+        if fieldNames != self.settingsFieldNames:
+            self.settingsFieldNames = fieldNames
+            self.settingsFragments = {}
+        settings = {}
+        for dictCount, dic in enumerate(selectedGroup["dictionaries"]):
+            dictName = self.db.cleanDictName(dic["dict"])
+            fragment = self.settingsFragments.get(dictName)
+            if fragment is None:
+                fragment = self.resultsPage.getDictionarySettings(dictName, dictCount)
+                # The Images settings are kept in the config, not the database.
+                if dictName != "Images":
+                    self.settingsFragments[dictName] = fragment
+            settings[dictName] = fragment.replace(RADIO_SLOT, str(self.radioCount))
+            self.radioCount += 1
+        return settings
 
-    def highlightExamples(self, text):
-        if self.config["highlightSentences"]:
-            return re.sub(
-                r"「([^」]+)」(?![^<]*>)",
-                r'<span class="exampleSentence">「\1」</span>',
-                text,
+    def showSearchPage(self, worker, html, imagesId):
+        if worker.cancelled:
+            return
+        worker.shown = True
+        if worker.restoreId is not None:
+            self.evalTimed(jsCall("restoreTab", worker.restoreId, html, worker.searchId))
+        else:
+            self.evalTimed(
+                jsCall(
+                    "addNewTab",
+                    html,
+                    worker.term,
+                    worker.singleTab == "true",
+                    worker.searchId,
+                )
             )
-        return text
+        if imagesId:
+            self.getImages(worker.term, imagesId)
 
-    def processDefinitionHTML(self, text):
-        """Process HTML tags in dictionary definitions for proper display."""
-        if not isinstance(text, str):
-            text = str(text) if text is not None else ""
-        
-        # Handle <br> tags that might be in definitions
-        # Convert any existing <br> or <br/> or <BR> tags to proper HTML line breaks
-        text = re.sub(r'<br\s*/?>', '<br>', text, flags=re.IGNORECASE)
-        
-        # Handle other common HTML entities that might appear in definitions
-        text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
-        
-        # Ensure proper line spacing for better readability
-        # Replace multiple consecutive <br> tags with proper spacing
-        text = re.sub(r'(<br>\s*){2,}', '<br><br>', text)
-        
-        return text
+    def appendSearchResults(self, worker, sideBar, main, imagesId):
+        if worker.cancelled:
+            return
+        self.evalTimed(jsCall("appendToTab", worker.searchId, sideBar, main))
+        if imagesId:
+            self.getImages(worker.term, imagesId)
 
-    def getSideBar(self, results, term, font, frontBracket, backBracket):
-        html = "<div" + font + 'class="definitionSideBar"><div class="innerSideBar">'
-        dictCount = 0
-        entryCount = 0
-        for dictName, dictResults in results.items():
-            if dictName == "Images":
-                html += (
-                    '<div data-index="'
-                    + str(dictCount)
-                    + '" class="listTitle">'
-                    + dictName
-                    + '</div><ol class="foundEntriesList"><li data-index="'
-                    + str(entryCount)
-                    + '">'
-                    + self.getPreparedTermHeader(
-                        dictName,
-                        frontBracket,
-                        backBracket,
-                        term,
-                        term,
-                        term,
-                        term,
-                        True,
-                    )
-                    + "</li></ol>"
-                )
-                entryCount += 1
-                dictCount += 1
-                continue
-            html += (
-                '<div data-index="'
-                + str(dictCount)
-                + '" class="listTitle">'
-                + dictName
-                + '</div><ol class="foundEntriesList">'
-            )
-            dictCount += 1
-            for idx, entry in enumerate(dictResults):
-                html += (
-                    '<li data-index="'
-                    + str(entryCount)
-                    + '">'
-                    + self.getPreparedTermHeader(
-                        dictName,
-                        frontBracket,
-                        backBracket,
-                        term,
-                        entry["term"],
-                        entry["altterm"],
-                        entry["pronunciation"],
-                        True,
-                    )
-                    + "</li>"
-                )
-                entryCount += 1
-            html += "</ol>"
-        return (
-            html
-            + '<br></div><div class="resizeBar" onmousedown="hresize(event)"></div></div>'
-        )
+    def loadEntryPage(self, searchId, start):
+        """Send the web view a page of entries it requested for a results tab.
 
-    def getPreparedTermHeader(
-        self,
-        dictName,
-        frontBracket,
-        backBracket,
-        target,
-        term,
-        altterm,
-        pronunciation,
-        sb=False,
-    ):
-        altFB = frontBracket
-        altBB = backBracket
-        if pronunciation == term:
-            pronunciation = ""
-        if altterm == term:
-            altterm = ""
-        if altterm == "":
-            altFB = ""
-            altBB = ""
-        if not self.termHeaders or dictName == "Images":
-            if sb:
-                header = '◳f<span class="term mainword">◳t</span>◳b◳x<span class="altterm  mainword">◳a</span>◳y<span class="pronunciation">◳p</span>'
-            else:
-                header = '◳f<span class="listTerm">◳t</span>◳b◳x<span class="listAltTerm">◳a</span>◳y<span class="listPronunciation">◳p</span>'
-        else:
-            if sb:
-                header = self.termHeaders[dictName][1]
+        If the search's entries were dropped, the tab is searched again, or
+        told that the page expired when the search is no longer known either.
+        """
+        deferred = self.deferredEntries.get(searchId)
+        if deferred is None:
+            if searchId in self.tabSearches:
+                self.eval(jsCall("reloadTab", searchId))
             else:
-                header = self.termHeaders[dictName][0]
+                self.eval(jsCall("expireEntryPage", searchId, start))
+            return
+        self.deferredEntries.move_to_end(searchId)
+        html = self.resultsPage.renderEntryPage(deferred, start)
+        if html is None:
+            self.eval(jsCall("expireEntryPage", searchId, start))
+            return
+        self.eval(jsCall("loadEntryPage", searchId, start, html))
 
-        return (
-            header.replace("◳t", self.highlightTarget(term, target))
-            .replace("◳a", self.highlightTarget(altterm, target))
-            .replace("◳p", self.highlightTarget(pronunciation, target))
-            .replace("◳f", frontBracket)
-            .replace("◳b", backBracket)
-            .replace("◳x", altFB)
-            .replace("◳y", altBB)
+    def evalTimed(self, js):
+        """Run results page JavaScript, timing it until the page has handled it."""
+        start = time.perf_counter()
+        self.evalWithCallback(
+            js, lambda _: self.searchLatency.record("eval", time.perf_counter() - start)
         )
 
-    def prepareResults(self, results, term, font):
-        frontBracket = self.config["frontBracket"]
-        backBracket = self.config["backBracket"]
-        if len(results) > 0:
-            html = self.getSideBar(results, term, font, frontBracket, backBracket)
-            html += '<div class="mainDictDisplay">'
-            dictCount = 0
-            entryCount = 0
-            imgTooltip = ""
-            clipTooltip = ""
-            sendTooltip = ""
-            if self.config["tooltips"]:
-                imgTooltip = ' title="Add this definition, or any selected text and this definition\'s header to the card exporter (opens the card exporter if it is not yet opened)." '
-                clipTooltip = ' title="Copy this definition, or any selected text to the clipboard." '
-                sendTooltip = " title=\"Send this definition, or any selected text and this definition's header to the card exporter to this dictionary's target fields. It will send it to the current target window, be it an Editor window, or the Review window.\" "
-            for dictName, dictResults in results.items():
-                if dictName == "Images":
-                    html += self.getGoogleDictionaryResults(
-                        term, dictCount, frontBracket, backBracket, entryCount, font
-                    )
-                    dictCount += 1
-                    entryCount += 1
-                    continue
-                duplicateHeader = self.getDuplicateHeaderCB(dictName)
-                overwrite = self.getOverwriteChecks(dictCount, dictName)
-                select = self.getFieldChecks(dictName)
-                html += (
-                    '<div data-index="'
-                    + str(dictCount)
-                    + '" class="dictionaryTitleBlock"><div  '
-                    + font
-                    + '  class="dictionaryTitle">'
-                    + dictName.replace("_", " ")
-                    + '</div><div class="dictionarySettings">'
-                    + duplicateHeader
-                    + overwrite
-                    + select
-                    + '<div class="dictNav"><div onclick="navigateDict(event, false)" class="prevDict">▲</div><div onclick="navigateDict(event, true)" class="nextDict">▼</div></div></div></div>'
-                )
-                dictCount += 1
-
-                for idx, entry in enumerate(dictResults):
-                    html += (
-                        '<div data-index="'
-                        + str(entryCount)
-                        + '" class="termPronunciation"><span '
-                        + font
-                        + ' class="tpCont">'
-                        + self.getPreparedTermHeader(
-                            dictName,
-                            frontBracket,
-                            backBracket,
-                            term,
-                            entry["term"],
-                            entry["altterm"],
-                            entry["pronunciation"],
-                        )
-                        + ' <span class="starcount">'
-                        + entry["starCount"]
-                        + '</span></span><div class="defTools"><div onclick="ankiExport(event, \''
-                        + dictName
-                        + '\')" class="ankiExportButton"><img '
-                        + imgTooltip
-                        + ' src="' + self.getBase64Icon("anki.png") + '"></div><div onclick="clipText(event)" '
-                        + clipTooltip
-                        + ' class="clipper">✂</div><div '
-                        + sendTooltip
-                        + " onclick=\"sendToField(event, '"
-                        + dictName
-                        + '\')" class="sendToField">➠</div><div class="defNav"><div onclick="navigateDef(event, false)" class="prevDef">▲</div><div onclick="navigateDef(event, true)" class="nextDef">▼</div></div></div></div><div'
-                        + font
-                        + ' class="definitionBlock">'
-                        + self.highlightTarget(
-                            self.processDefinitionHTML(
-                                self.highlightExamples(entry["definition"])
-                            ), term
-                        )
-                        + "</div>"
-                    )
-                    entryCount += 1
+    def getSearchLatencyStats(self):
+        """Get the latency histograms of the query, render and eval phases of lookups."""
+        return self.searchLatency.getStats()
 
-        else:
-            html = (
-                '<style>.noresults{font-family: Arial;}.vertical-center{height: 400px; width: 60%; margin: 0 auto; display: flex; justify-content: center; align-items: center;}</style> </head> <div class="vertical-center noresults"> <div align="center"> <img src="' + self.getBase64Icon("searchzero.svg") + '" width="50px" height="40px"> <h3 align="center">No dictionary entries were found for "'
-                + term
-                + '".</h3> </div></div>'
+    def addResultWrappers(self, results):
+        for idx, result in enumerate(results):
+            if "dictionaryTitleBlock" not in result:
+                results[idx] = '<div class="definitionBlock">' + result + "</div>"
+        return results
+
+    def highlightExamples(self, text):
+        if self.config["highlightSentences"]:
+            return re.sub(
+                r"「([^」]+)」(?![^<]*>)",
+                r'<span class="exampleSentence">「\1」</span>',
+                text,
             )
-        return html.replace("'", "\\'")
-
-    def getGoogleDictionaryResults(
-        self, term, dictCount, bracketFront, bracketBack, entryCount, font
-    ):
-        dictName = "Images"
-        overwrite = self.getOverwriteChecks(dictCount, dictName)
-        select = self.getFieldChecks(dictName)
-        idName = "gcon" + str(time.time())
-        html = (
-            '<div data-index="'
-            + str(dictCount)
-            + '" class="dictionaryTitleBlock"><div class="dictionaryTitle">Images</div><div class="dictionarySettings">'
-            + overwrite
-            + select
-            + '<div class="dictNav"><div onclick="navigateDict(event, false)" class="prevDict">▲</div><div onclick="navigateDict(event, true)" class="nextDict">▼</div></div></div></div>'
-        )
-        html += (
-            '<div  data-index="'
-            + str(entryCount)
-            + '" class="termPronunciation"><span class="tpCont">'
-            + bracketFront
-            + "<span "
-            + font
-            + ' class="terms">'
-            + self.highlightTarget(term, term)
-            + "</span>"
-            + bracketBack
-            + ' <span></span></span><div class="defTools"><div onclick="ankiExport(event, \''
-            + dictName
-            + '\')" class="ankiExportButton"><img src="' + self.getBase64Icon("anki.png") + '"></div><div onclick="clipText(event)" class="clipper">✂</div><div onclick="sendToField(event, \''
-            + dictName
-            + '\')" class="sendToField">➠</div><div class="defNav"><div onclick="navigateDef(event, false)" class="prevDef">▲</div><div onclick="navigateDef(event, true)" class="nextDef">▼</div></div></div></div><div class="definitionBlock"><div class="imageBlock" id="'
-            + idName
-            + '">'
-            + self.getImages(term, idName)
-            + "</div></div>"
-        )
-        return html
+        return text
 
     def getImages(self, term, idName):
         # Track pagination offset per search term
@@ -576,8 +471,11 @@ class MIDict(AnkiWebView):
         if term not in self.image_offsets:
             self.image_offsets[term] = 0
 
-        # Always create a new DuckDuckGo instance for each search
-        # to avoid QRunnable reuse issues
+        # A prefetch for another term is no longer needed
+        if self.imagePrefetch and self.imagePrefetch[0] != term:
+            self.cancelImagePrefetch()
+
+        # Each lookup runs on the shared image search service
         imager = duckduckgoimages.DuckDuckGo()
         imager.setTermIdName(term, idName)
         # Set the search offset for pagination
@@ -585,8 +483,14 @@ class MIDict(AnkiWebView):
         # Set search region based on configuration
         imager.setSearchRegion(self.config.get('imageSearchRegion', 'United States'))
         imager.signals.resultsFound.connect(self.loadImageResults)
+        imager.signals.imageFound.connect(self.appendImage)
+        imager.signals.imagesDone.connect(
+            lambda idName, found, imager=imager: self.finishImages(
+                imager, idName, found
+            )
+        )
         imager.signals.noResults.connect(self.showNoImagesMessage)
-        self.threadpool.start(imager)
+        imager.start()
 
         return "Loading..."
 
@@ -619,69 +523,64 @@ class MIDict(AnkiWebView):
             + '\')" type="checkbox"></div>'
         )
 
-    def maybeSearchTerms(self, terms: str) -> None:
+    def maybeSearchTerms(self) -> None:
         if self.terms:
             for t in self.terms:
                 self.dictInt.initSearch(t)
             self.terms = False
 
+    def createBridge(self):
+        """Map the actions the results page sends to their handlers."""
+        bridge = Bridge()
+        bridge.register("loaded", self.onPageLoaded)
+        bridge.register("updateTerm", lambda term: self.dictInt.search.setText(term))
+        bridge.register("restoreTab", self.restoreTab)
+        bridge.register("entryPage", self.loadEntryPage)
+        bridge.register("saveFontSizes", self.saveFontSizes)
+        bridge.register("setDup", self.setDupHeader)
+        bridge.register("fieldsSetting", self.setFieldsSetting)
+        bridge.register("overwriteSetting", self.setOverwriteSetting)
+        bridge.register("clipped", self.clipText)
+        bridge.register("sendToField", self.sendToField)
+        bridge.register("sendImgToField", self.sendImgToField)
+        bridge.register("addDef", self.addDefToExportWindow)
+        bridge.register("imgExport", self.addImgsToExportWindow)
+        bridge.register("moreImages", self.loadMoreImages)
+        return bridge
+
     def handleDictAction(self, dAct):
-        if dAct.startswith("AnkiDictionaryLoaded"):
-            self.maybeSearchTerms(dAct)
-        elif dAct.startswith("updateTerm:"):
-            term = dAct[11:]
-            self.dictInt.search.setText(term)
-        elif dAct.startswith("saveFS:"):
-            f1, f2 = dAct[7:].split(":")
-            self.dictInt.writeConfig("fontSizes", [int(f1), int(f2)])
-        elif dAct.startswith("setDup:"):
-            dup, name = dAct[7:].split("◳")
-            dup = int(dup)
-            self.dictInt.db.setDupHeader(dup, name)
-            self.dupHeaders = self.db.getDupHeaders()
-        elif dAct.startswith("fieldsSetting:"):
-            fields = json.loads(dAct[14:])
-            if fields["dictName"] == "Images":
-                self.dictInt.writeConfig("ImageFields", fields["fields"])
-            else:
-                self.dictInt.updateFieldsSetting(fields["dictName"], fields["fields"])
-        elif dAct.startswith("overwriteSetting:"):
-            addType = json.loads(dAct[17:])
-            if addType["name"] == "Images":
-                self.dictInt.writeConfig("ImageAddType", addType["type"])
-            else:
-                self.dictInt.updateAddType(addType["name"], addType["type"])
-        elif dAct.startswith("clipped:"):
-            text = dAct[8:]
-            self.dictInt.mw.app.clipboard().setText(text.replace("<br>", "\n"))
-        elif dAct.startswith("sendToField:"):
-            name, text = dAct[12:].split("◳◴")
-            self.sendToField(name, text)
-        elif dAct.startswith("sendAudioToField:"):
-            urls = dAct[17:]
-            self.sendAudioToField(urls)
-        elif dAct.startswith("sendImgToField:"):
-            urls = dAct[15:]
-            self.sendImgToField(urls)
-        elif dAct.startswith("addDef:"):
-            dictName, word, text = dAct[7:].split("◳◴")
-            self.addDefToExportWindow(dictName, word, text)
-        elif dAct.startswith("audioExport:"):
-            word, urls = dAct[12:].split("◳◴")
-            self.addAudioToExportWindow(word, urls)
-        elif dAct.startswith("imgExport:"):
-            word, urls = dAct[10:].split("◳◴")
-            self.addImgsToExportWindow(word, json.loads(urls))
-        elif dAct.startswith("load_more_images:"):
-            search_term = dAct[17:]
-            self.loadMoreImages(search_term)
-        elif dAct.startswith("getMoreImages::"):
-            search_term = dAct[15:]
-            self.loadMoreImages(search_term)
-
-    def loadMoreImages(self, search_term: str) -> None:
+        self.bridge.handle(dAct)
+
+    def onPageLoaded(self):
+        self.setTabBudget()
+        self.maybeSearchTerms()
+
+    def saveFontSizes(self, definitions, headers):
+        self.dictInt.writeConfig("fontSizes", [int(definitions), int(headers)])
+
+    def setDupHeader(self, dup, dictName):
+        self.dictInt.db.setDupHeader(int(dup), dictName)
+        self.refreshDictMetadata()
+
+    def setFieldsSetting(self, dictName, fields):
+        if dictName == "Images":
+            self.dictInt.writeConfig("ImageFields", fields)
+        else:
+            self.dictInt.updateFieldsSetting(dictName, fields)
+
+    def setOverwriteSetting(self, name, addType):
+        if name == "Images":
+            self.dictInt.writeConfig("ImageAddType", addType)
+        else:
+            self.dictInt.updateAddType(name, addType)
+
+    def clipText(self, text):
+        self.dictInt.mw.app.clipboard().setText(text.replace("<br>", "\n"))
+
+    def loadMoreImages(self, search_term: str, id_name: str = "") -> None:
         """
-        Load more images for a search term by performing a new search
+        Load more images for a search term into the image strip of id_name
+        by performing a new search
         """
         # Track pagination offset per search term
         if not hasattr(self, "image_offsets"):
@@ -693,40 +592,41 @@ class MIDict(AnkiWebView):
         else:
             self.image_offsets[search_term] = 15  # Start from second page
 
-        # Always create a new DuckDuckGo instance for each search
-        # to avoid QRunnable reuse issues
+        # Each lookup runs on the shared image search service
         imager = duckduckgoimages.DuckDuckGo()
-        imager.setTermIdName(search_term, "load_more")
+        imager.setTermIdName(search_term, id_name, loadMore=True)
         # Set the search offset for pagination
         imager.search_offset = self.image_offsets[search_term]
         # Set search region based on configuration
         imager.setSearchRegion(self.config.get('imageSearchRegion', 'United States'))
-        # Connect to a different handler for load more results
-        imager.signals.resultsFound.connect(self.loadMoreImageResults)
+        imager.signals.imageFound.connect(self.appendImage)
+        imager.signals.imagesDone.connect(
+            lambda idName, found, imager=imager: self.finishImages(
+                imager, idName, found
+            )
+        )
         imager.signals.noResults.connect(self.showNoMoreImagesMessage)
-        self.threadpool.start(imager)
+        imager.start()
 
-    def loadMoreImageResults(self, results: Tuple[str, str]) -> None:
-        """
-        Handle results from load more images request
-        """
-        html, idName = results
+    def appendImage(self, html: str, idName: str, rank: int) -> None:
+        """Add a thumbnail to an image strip as soon as it is ready."""
+        self.eval(jsCall("appendImage", html, idName, rank))
 
-        # Handle empty results
-        if not html or html.strip() == "":
-            self.showNoMoreImagesMessage()
-            return
+    def finishImages(self, imager, idName: str, found: int) -> None:
+        """Re-enable the Load More button of an image strip, or report there are no more images.
 
-        # Use json.dumps to safely encode the HTML for JavaScript
-        escaped_html = json.dumps(html)
+        The next pages are then prefetched, up to imagePrefetchPages.
+        """
+        self.eval(jsCall("finishImages", idName, found))
+        pages = int(self.config.get("imagePrefetchPages", 1))
+        if found and pages > 0:
+            self.cancelImagePrefetch()
+            self.imagePrefetch = (imager.term, imager.prefetch(pages))
 
-        # Use the appendNewImages JavaScript function to add the new images
-        try:
-            js_code = f"appendNewImages({escaped_html});"
-            self.eval(js_code)
-        except Exception as e:
-            print(f"Error in loadMoreImageResults: {e}")
-            self.showNoMoreImagesMessage()
+    def cancelImagePrefetch(self) -> None:
+        if self.imagePrefetch:
+            self.imagePrefetch[1].cancel()
+            self.imagePrefetch = None
 
     def showNoMoreImagesMessage(self) -> None:
         """
@@ -762,13 +662,22 @@ class MIDict(AnkiWebView):
             )
 
     def saveQImage(self, url: str, filename: str) -> None:
-        req = Request(
-            url,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.47 Safari/537.36"
-            },
-        )
-        file = urlopen(req).read()
+        """Save an image search result, from its cached thumbnail when there is one.
+
+        Only images missing from the cache are downloaded again.
+        """
+        cached = duckduckgoimages.getImageCache().getThumbnail(url)
+        if cached:
+            with open(cached, "rb") as imageFile:
+                file = imageFile.read()
+        else:
+            req = Request(
+                url,
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.47 Safari/537.36"
+                },
+            )
+            file = urlopen(req, timeout=IMAGE_EXPORT_TIMEOUT).read()
         image = QImage()
         image.loadFromData(file)
         image = image.scaled(
@@ -871,7 +780,7 @@ class MIDict(AnkiWebView):
                 fieldText = definition
         return fieldText
 
-    def sendImgToField(self, urls: str) -> None:
+    def sendImgToField(self, urls: List[str]) -> None:
         # print("sendImgToField midict.py")
 
         if (self.reviewer and self.reviewer.card) or (
@@ -879,7 +788,7 @@ class MIDict(AnkiWebView):
         ):
             urlsList: List[str] = []
             imgSeparator = ""
-            urls_list = json.loads(urls)
+            urls_list = urls
 
             for imgurl in urls_list:
                 try:
@@ -1014,7 +923,7 @@ class MIDict(AnkiWebView):
         return select
 
     def getSelectedOverwriteType(self, dictName: str, addType: str) -> str:
-        count = str(self.radioCount)
+        count = RADIO_SLOT
         checked = ""
         if addType == "add":
             checked = " checked"
@@ -1063,7 +972,6 @@ class MIDict(AnkiWebView):
             + ifempty
             + "</div>"
         )
-        self.radioCount += 1
         return checks
 
     def getFieldChecks(self, dictName):
@@ -1731,6 +1639,7 @@ class DictInterface(QWidget):
                     }}
                 """
         self.setStyleSheet(qss)
+        exportIcon = loadBase64Icon(join(self.iconpath, "anki.png"))
         custom_theme_css = f"""
             <style id="customThemeCss">
                 :root {{
@@ -1777,8 +1686,9 @@ class DictInterface(QWidget):
                     border-radius: 5px;
                     padding: 5px;
                 }}
-                .ankiExportButton img {{
+                .exportIcon {{
                     background-color: {active_theme_dict['anki_button_background']};
+                    background-image: url("{exportIcon}");
                 }}
                 .tablinks {{
                     border: 1px solid {active_theme_dict['border']};
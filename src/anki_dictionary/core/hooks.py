@@ -12,6 +12,7 @@ This module handles all the integration points with Anki, including:
 import os
 import re
 import json
+import threading
 from typing import Optional
 from anki.hooks import addHook, wrap
 from anki.utils import is_win, is_mac, is_lin
@@ -36,13 +37,19 @@ def closeDictionary():
     """Close dictionary when profile is unloaded."""
     if hasattr(mw, "ankiDictionary") and mw.ankiDictionary:
         mw.ankiDictionary.hide()
+    from ..integrations.image_search import closeImageSearchService
+
+    closeImageSearchService()
 
 
 def dictOnStart():
     """Initialize dictionary when profile is loaded."""
     from ..ui.main_window import removeTempFiles, initGlobalHotkeys
+    from ..integrations.image_search import getImageCache
 
     removeTempFiles()
+    # Drop expired image search results without delaying the profile load.
+    threading.Thread(target=getImageCache().prune, daemon=True).start()
     # Uncomment if global hotkeys are enabled
     # if mw.addonManager.getConfig(__name__)['globalHotkeys']:
     #     initGlobalHotkeys()
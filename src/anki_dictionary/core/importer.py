@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion of dictionary bank files into dictionary table rows.
+
+Nothing here imports Anki or Qt, so banks can be converted in worker processes.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Leave one core for Anki's UI and the database writer.
+IMPORT_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+BR_TAG = re.compile(r"<br\s*/?>", re.IGNORECASE)
+BR_RUN = re.compile(r"(<br>\s*){2,}")
+
+
+def iterDictRows(zfile, filenames, miDict=False):
+    """Yield a dictionary's table rows one bank file at a time, in bank order.
+
+    Only the banks being converted are held in memory, so importing does not
+    grow with the size of the dictionary.
+    """
+    if len(filenames) > 1 and IMPORT_WORKERS > 1 and canSpawnWorkers():
+        yield from iterDictRowsParallel(zfile, filenames, miDict)
+        return
+    for filename in filenames:
+        yield from convertBankFile(readBank(zfile, filename), miDict)
+
+
+def canSpawnWorkers():
+    """Whether worker processes can be spawned from sys.executable.
+
+    Spawned workers re-run sys.executable, which in packaged Anki builds is
+    Anki itself rather than a Python interpreter.
+    """
+    if getattr(sys, "frozen", False) or not sys.executable:
+        return False
+    return os.path.basename(sys.executable).lower().startswith("python")
+
+
+def iterDictRowsParallel(zfile, filenames, miDict):
+    """Convert banks in a process pool, one bank per task, and yield rows in bank order.
+
+    At most two banks per worker are in flight. If worker processes cannot be
+    started, the banks that are left are converted in this process instead.
+    """
+    banksDone = 0
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(IMPORT_WORKERS, mp_context=context) as pool:
+            pending = deque()
+            remaining = iter(filenames)
+            while True:
+                while len(pending) < IMPORT_WORKERS * 2:
+                    filename = next(remaining, None)
+                    if filename is None:
+                        break
+                    pending.append(
+                        pool.submit(convertBankFile, readBank(zfile, filename), miDict)
+                    )
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+                banksDone += 1
+    except (BrokenProcessPool, OSError) as e:
+        print(f"Parallel import unavailable, converting in process: {e}")
+    for filename in filenames[banksDone:]:
+        yield from convertBankFile(readBank(zfile, filename), miDict)
+
+
+def readBank(zfile, filename):
+    """Read the raw JSON of one bank file from the dictionary archive."""
+    with zfile.open(filename, "r") as jsonDictFile:
+        return jsonDictFile.read()
+
+
+def convertBankFile(data, miDict=False):
+    """Parse one bank file and convert its entries to table rows."""
+    return convertBank(json.loads(data), miDict)
+
+
+def convertBank(jsonDict, miDict=False):
+    """Convert the entries of one bank file to table rows.
+
+    Frequency ranks shipped inside the entries are only kept when the
+    language has no frequency list; otherwise the database replaces every
+    row's rank from the list after the import, unranking missing terms.
+    Each row ends with the definition's display HTML. Entries in a format
+    that is not recognized are left out.
+    """
+    rows = []
+    for count, entry in enumerate(jsonDict):
+        if (
+            isinstance(entry, list)
+            and len(entry) == 3
+            and isinstance(entry[2], dict)
+            and "pitches" in entry[2]
+        ):
+            handlePitchDictEntry(jsonDict, count, entry)
+        elif miDict:
+            handleMiDictEntry(jsonDict, count, entry, True)
+        else:
+            handleYomiDictEntry(jsonDict, count, entry, True)
+        row = jsonDict[count]
+        if not isinstance(row, tuple):
+            continue
+        rows.append(row + (normalizeDefinition(row[4]),))
+    return rows
+
+
+def getAdjustedTerm(term):
+    term = term.replace("\n", "")
+    if len(term) > 1:
+        term = term.replace("=", "")
+    return term
+
+
+def getAdjustedPronunciation(pronunciation):
+    return pronunciation.replace("\n", "")
+
+
+def getAdjustedDefinition(definition):
+    # First handle newlines and special characters
+    definition = definition.replace("\n", "<br>")
+    definition = definition.replace("◟", "<br>")
+    
+    # Normalize all <br> variants to standard <br> (case insensitive, with or without closing slash)
+    definition = re.sub(r"<br\s*/?>", "<br>", definition, flags=re.IGNORECASE)
+    
+    # Handle HTML entities
+    definition = definition.replace("<", "&lt;").replace(">", "&gt;")
+    
+    # But keep our normalized <br> tags as HTML
+    definition = definition.replace("&lt;br&gt;", "<br>")
+    
+    # Remove trailing <br> tags
+    definition = re.sub(r"<br>$", "", definition)
+    return definition
+
+
+def normalizeDefinition(definition):
+    """Turn a stored definition into the HTML shown on the results page."""
+    if not isinstance(definition, str):
+        definition = str(definition) if definition is not None else ""
+    definition = BR_TAG.sub("<br>", definition.replace("\n", "<br>"))
+    definition = (
+        definition.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+    )
+    return BR_RUN.sub("<br><br>", definition)
+
+
+def handlePitchDictEntry(jsonDict, count, entry):
+    # Initialize default values
+    term = ""
+    altterm = ""
+    reading = ""
+    pos = ""
+    definition = ""
+    examples = ""
+    audio = ""
+    frequency = ""
+    starCount = ""
+    pitch_accent = ""
+
+    # Extract pitch dictionary data
+    term = entry[0]
+    reading = entry[2].get("reading", entry[0])
+    pitch_accent = (
+        entry[2]["pitches"][0].get("position") if entry[2]["pitches"] else None
+    )
+    # altterm = str(pitch_accent) if pitch_accent is not None else ""
+
+    # Create a 9-element tuple
+    jsonDict[count] = (
+        term,  # term
+        altterm,  # altterm (pitch accent position)
+        reading,  # pronunciation
+        pos,  # part of speech
+        definition,  # definition
+        examples,  # examples
+        audio,  # audio
+        frequency,  # frequency
+        starCount,  # star count
+    )
+
+
+def handleMiDictEntry(jsonDict, count, entry, freq=False):
+    # Handle both list and dict formats
+    if isinstance(entry, list):
+        # Convert list format to expected structure
+        term = entry[0] if len(entry) > 0 else ""
+        altterm = entry[1] if len(entry) > 1 else ""
+        details = entry[2] if len(entry) > 2 and isinstance(entry[2], dict) else {}
+
+        # Extract from details or use defaults
+        pronunciation = details.get("pronunciation", altterm)
+        pos = details.get("pos", "")
+        definition = details.get("definition", "")
+        frequency = details.get("frequency", "") if freq else ""
+        starCount = details.get("starCount", "") if freq else ""
+    elif isinstance(entry, dict):
+        # Handle dict format (original code)
+        term = entry.get("term", "")
+        altterm = entry.get("altterm", "")
+        pronunciation = entry.get("pronunciation", "")
+        pos = entry.get("pos", "")
+        definition = entry.get("definition", "")
+        frequency = entry.get("frequency", "") if freq else ""
+        starCount = entry.get("starCount", "") if freq else ""
+    else:
+        # Fallback for unexpected formats
+        return
+
+    if pronunciation == "":
+        pronunciation = term
+
+    term = getAdjustedTerm(term)
+    altTerm = getAdjustedTerm(altterm)
+    pronunciation = getAdjustedPronunciation(pronunciation)
+    definition = getAdjustedDefinition(definition)
+
+    jsonDict[count] = (
+        term,
+        altTerm,
+        pronunciation,
+        pos,
+        definition,
+        "",
+        "",
+        frequency,
+        starCount,
+    )
+
+
+def handleYomiDictEntry(jsonDict, count, entry, freq=False):
+    def extract_definition(items):
+        """Extracts definition text from deeply nested dictionary structure."""
+
+        def recursive_extract(item):
+            if isinstance(item, str):
+                return item.strip()
+            elif isinstance(item, dict):
+                if "name" in item.get("data", {}) and item["data"]["name"] == "語釈":
+                    return recursive_extract(item.get("content", ""))
+                return recursive_extract(item.get("content", ""))
+            elif isinstance(item, list):
+                return " ".join(
+                    text for text in map(recursive_extract, item) if text
+                )
+            return ""
+
+        definitions = []
+        for item in items:
+            text = recursive_extract(item)
+            if text:
+                # Replace any newline characters with <br/> to preserve line breaks
+                text = text.replace("\n", "<br/>")
+                definitions.append(text)
+        return "<br/>".join(definitions)  # Join definitions with <br/>
+
+    def find_header_section(items):
+        """Find the header section in the content."""
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, dict):
+                    if item.get("type") == "structured-content":
+                        return find_header_section(item.get("content", []))
+                    if item.get("data", {}).get("name") == "見出部":
+                        return item.get("content", [])
+        return []
+
+    def extract_pitch(content):
+        """
+        Extract pitch accents from content by recursively searching through nested structures.
+        Returns a list of integer accent positions.
+        """
+        accents = []
+
+        def recursive_search(item):
+            if isinstance(item, dict) and "data" in item:
+                name = item.get("data", {}).get("name", "")
+
+            if not isinstance(item, (dict, list)):
+                return
+
+            if isinstance(item, dict):
+                name = item.get("data", {}).get("name", "")
+                if name.startswith("accent"):
+                    try:
+                        accent_num = int(name.replace("accent", ""))
+                        accents.append(accent_num)
+                    except ValueError:
+                        pass
+
+                if "content" in item:
+                    recursive_search(item["content"])
+
+            elif isinstance(item, list):
+                for sub_item in item:
+                    recursive_search(sub_item)
+
+        accents.clear()
+        recursive_search(content)
+        accents.sort()
+        return accents
+
+    term = entry[0]
+    reading = entry[1] if entry[1] else term
+    pos = entry[2] if len(entry) > 2 else ""
+    frequency = entry[8] if freq and len(entry) > 8 else ""
+    starCount = entry[9] if freq and len(entry) > 9 else ""
+    definition = ""
+    pitch_accents = []
+
+    if len(entry) > 5 and isinstance(entry[5], list):
+        definition = extract_definition(entry[5])
+
+        header_section = find_header_section(entry[5])
+        if header_section:
+            pitch_accents = extract_pitch(header_section)
+
+    # Always create a 9-element tuple
+    jsonDict[count] = (
+        term,  # term
+        (
+            " ".join(str(p) for p in pitch_accents) if pitch_accents else ""
+        ),  # altterm (pitch accent)
+        reading,  # pronunciation
+        pos,  # part of speech
+        definition,  # definition
+        "",  # examples
+        "",  # audio
+        frequency,  # frequency
+        starCount,  # star count
+    )
+
+
+def kaner(to_translate, hiraganer=False):
+    hiragana = (
+        "がぎぐげござじずぜぞだぢづでどばびぶべぼぱぴぷぺぽ"
+        "あいうえおかきくけこさしすせそたちつてと"
+        "なにぬねのはひふへほまみむめもやゆよらりるれろ"
+        "わをんぁぃぅぇぉゃゅょっゐゑ"
+    )
+    katakana = (
+        "ガギグゲゴザジズゼゾダヂヅデドバビブベボパピプペポ"
+        "アイウエオカキクケコサシスセソタチツテト"
+        "ナニヌネノハヒフヘホマミムメモヤユヨラリルレロ"
+        "ワヲンァィゥェォャュョッヰヱ"
+    )
+    if hiraganer:
+        katakana = [ord(char) for char in katakana]
+        translate_table = dict(zip(katakana, hiragana))
+        return to_translate.translate(translate_table)
+    else:
+        hiragana = [ord(char) for char in hiragana]
+        translate_table = dict(zip(hiragana, katakana))
+        return to_translate.translate(translate_table)
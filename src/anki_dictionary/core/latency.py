@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Latency histograms for the phases of a dictionary lookup.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Upper bounds of the histogram buckets in milliseconds; slower timings go to
+# a final overflow bucket.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """Counts timings per phase in fixed millisecond buckets.
+
+    Timings may be recorded from any thread.
+    """
+
+    def __init__(
+        self, phases: Iterable[str], buckets: Tuple[int, ...] = LATENCY_BUCKETS_MS
+    ) -> None:
+        self.phases = list(phases)
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts: Dict[str, List[int]] = {
+                phase: [0] * (len(self.buckets) + 1) for phase in self.phases
+            }
+            self.totals: Dict[str, float] = {phase: 0.0 for phase in self.phases}
+            self.maxima: Dict[str, float] = {phase: 0.0 for phase in self.phases}
+
+    def record(self, phase: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self.lock:
+            self.counts[phase][bisect_left(self.buckets, ms)] += 1
+            self.totals[phase] += ms
+            self.maxima[phase] = max(self.maxima[phase], ms)
+
+    def percentile(self, phase: str, fraction: float) -> float:
+        """Estimate a percentile as the upper bound of the bucket it falls in."""
+        with self.lock:
+            counts = list(self.counts[phase])
+            maximum = self.maxima[phase]
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        seen = 0
+        for idx, count in enumerate(counts):
+            seen += count
+            if seen >= fraction * total:
+                if idx < len(self.buckets):
+                    return float(min(self.buckets[idx], maximum))
+                return maximum
+        return maximum
+
+    def getStats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the count, mean, p50, p95, maximum and bucket counts of each phase."""
+        stats = {}
+        for phase in self.phases:
+            with self.lock:
+                counts = list(self.counts[phase])
+                total = self.totals[phase]
+                maximum = self.maxima[phase]
+            count = sum(counts)
+            stats[phase] = {
+                "count": count,
+                "meanMs": total / count if count else 0.0,
+                "p50Ms": self.percentile(phase, 0.5),
+                "p95Ms": self.percentile(phase, 0.95),
+                "maxMs": maximum,
+                "buckets": counts,
+            }
+        return stats
+
+    def format(self) -> str:
+        """Format the statistics as a small text table."""
+        lines = ["phase      count    mean ms   p50 ms   p95 ms   max ms"]
+        for phase, s in self.getStats().items():
+            lines.append(
+                "%-8s %7d %10.1f %8.1f %8.1f %8.1f"
+                % (phase, s["count"], s["meanMs"], s["p50Ms"], s["p95Ms"], s["maxMs"])
+            )
+        return "\n".join(lines)
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Precompiled HTML templates for the dictionary results page.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Term header placeholders: ◳t term, ◳a altterm, ◳p pronunciation,
+# ◳f/◳b brackets and ◳x/◳y brackets around the altterm.
+HEADER_SLOT = re.compile(r"◳([tapfbxy])")
+
+DEFAULT_HEADER = '◳f<span class="listTerm">◳t</span>◳b◳x<span class="listAltTerm">◳a</span>◳y<span class="listPronunciation">◳p</span>'
+DEFAULT_SIDEBAR_HEADER = '◳f<span class="term mainword">◳t</span>◳b◳x<span class="altterm  mainword">◳a</span>◳y<span class="pronunciation">◳p</span>'
+
+
+class HtmlTemplate:
+    """Markup with {slot} placeholders, filled in with str.format().
+
+    Slot values are inserted as given. Pages reach the web view as JSON
+    arguments (see bridge.jsCall), so nothing is escaped for JavaScript.
+    """
+
+    def __init__(self, markup: str) -> None:
+        self.markup = markup
+
+    def render(self, **values: str) -> str:
+        return self.markup.format(**values)
+
+
+# Kana and CJK ideographs; terms containing them are highlighted without word boundaries.
+CJK_CHARACTERS = re.compile("[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]")
+TARGET_TERM_START = '<span class="targetTerm">'
+TARGET_TERM_END = "</span>"
+
+
+class Highlighter:
+    """Marks the search term and its variants in text, leaving HTML tags untouched.
+
+    The pattern is compiled once per search. Text is scanned for the terms
+    only; a match is skipped when it lies between a tag's '<' and '>'.
+    """
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms = sorted({t for t in terms if t}, key=len, reverse=True)
+        self.pattern: Optional["re.Pattern[str]"] = None
+        if self.terms:
+            alternatives = []
+            for t in self.terms:
+                if CJK_CHARACTERS.search(t):
+                    alternatives.append(re.escape(t))
+                else:
+                    alternatives.append(r"\b" + re.escape(t) + r"\b")
+            self.pattern = re.compile("|".join(alternatives))
+
+    def highlight(self, text: Any) -> str:
+        if not isinstance(text, str):
+            text = str(text) if text is not None else ""
+        if self.pattern is None or not any(t in text for t in self.terms):
+            return text
+        parts = []
+        pos = 0
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            if text.rfind("<", 0, start) > text.rfind(">", 0, start) and text.find(
+                ">", start
+            ) != -1:
+                continue
+            parts.append(text[pos:start])
+            parts.append(TARGET_TERM_START + match.group() + TARGET_TERM_END)
+            pos = match.end()
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+def compileHeader(header: str) -> HtmlTemplate:
+    """Turn a term header written with ◳ placeholders into a template."""
+    markup = header.replace("{", "{{").replace("}", "}}")
+    return HtmlTemplate(HEADER_SLOT.sub(r"{\1}", markup))
+
+
+SIDEBAR_START = HtmlTemplate(
+    '<div{font}class="definitionSideBar"><div class="innerSideBar">'
+)
+SIDEBAR_TITLE = HtmlTemplate(
+    '<div data-index="{index}" class="listTitle">{dictName}</div><ol class="foundEntriesList">'
+)
+SIDEBAR_ENTRY = HtmlTemplate('<li data-index="{index}">{header}</li>')
+SIDEBAR_END = HtmlTemplate(
+    '<br></div><div class="resizeBar" onmousedown="hresize(event)"></div></div><div class="mainDictDisplay" data-tooltips="{tooltips}">'
+)
+# Tool buttons carry no handlers, tooltips or icon data of their own: dictionary.js
+# handles their clicks and hover by class name and reads the dictionary name from
+# the data-dictname attribute of the dictionary's title block.
+DICTIONARY_NAV = '<div class="dictNav"><div class="prevDict">▲</div><div class="nextDict">▼</div></div>'
+DICTIONARY_TITLE = HtmlTemplate(
+    '<div data-index="{index}" data-dictname="{dictName}" class="dictionaryTitleBlock"><div  {font}  class="dictionaryTitle">{title}</div><div class="dictionarySettings">{settings}'
+    + DICTIONARY_NAV
+    + "</div></div>"
+)
+ENTRY_TOOLS = '<div class="defTools"><div class="ankiExportButton"><div class="exportIcon"></div></div><div class="clipper">✂</div><div class="sendToField">➠</div><div class="defNav"><div class="prevDef">▲</div><div class="nextDef">▼</div></div></div>'
+ENTRY = HtmlTemplate(
+    '<div data-index="{index}" class="termPronunciation"><span {font} class="tpCont">{header} <span class="starcount">{starCount}</span></span>'
+    + ENTRY_TOOLS
+    + '</div><div{font} class="definitionBlock">{definition}</div>'
+)
+IMAGES = HtmlTemplate(
+    '<div data-index="{index}" data-dictname="Images" class="dictionaryTitleBlock"><div class="dictionaryTitle">Images</div><div class="dictionarySettings">{settings}'
+    + DICTIONARY_NAV
+    + '</div></div><div  data-index="{entryIndex}" class="termPronunciation"><span class="tpCont">{f}<span {font} class="terms">{term}</span>{b} <span></span></span>'
+    + ENTRY_TOOLS
+    + '</div><div class="definitionBlock"><div class="imageBlock" id="{imagesId}">Loading...</div></div>'
+)
+# Stands in for a page of entries until dictionary.js requests it.
+ENTRY_PAGE = HtmlTemplate(
+    '<div class="entryPage" data-start="{start}" data-end="{end}" data-count="{count}"></div>'
+)
+NO_RESULTS = HtmlTemplate(
+    '<style>.noresults{{font-family: Arial;}}.vertical-center{{height: 400px; width: 60%; margin: 0 auto; display: flex; justify-content: center; align-items: center;}}</style> </head> <div class="vertical-center noresults"> <div align="center"> <img src="{icon}" width="50px" height="40px"> <h3 align="center">No dictionary entries were found for "{term}".</h3> </div></div>'
+)
+
+
+# Entries rendered into a results page up front, and per page requested later.
+ENTRY_PAGE_SIZE = 30
+
+
+class DeferredEntries:
+    """The entries of one search that were left out of its results page.
+
+    Pages are keyed by the index of their first entry and stay available, so
+    the web view can drop them again and request them when they come back
+    into view.
+    """
+
+    def __init__(self, pageSize: int = ENTRY_PAGE_SIZE, inline: int = ENTRY_PAGE_SIZE) -> None:
+        self.pageSize = pageSize
+        self.inlineRemaining = inline
+        self.pages: Dict[int, Tuple[str, List[Dict[str, Any]], Callable[[Any], str], str]] = {}
+
+
+class ResultsPage:
+    """Renders search results for a dictionary view in a single pass.
+
+    The view supplies the config, the term headers and the highlighting and
+    settings helpers. The header templates of each dictionary are compiled
+    once and reused.
+    """
+
+    def __init__(self, view: Any) -> None:
+        self.view = view
+        self.config = view.config
+        self.headers: Dict[str, Tuple[HtmlTemplate, HtmlTemplate]] = {}
+
+    def clearCache(self) -> None:
+        self.headers = {}
+
+    def getHeaders(self, dictName: str) -> Tuple[HtmlTemplate, HtmlTemplate]:
+        """Get the header templates of a dictionary for the main display and the side bar."""
+        headers = self.headers.get(dictName)
+        if headers is None:
+            termHeaders = self.view.termHeaders
+            if not termHeaders or dictName == "Images":
+                header, sbHeader = DEFAULT_HEADER, DEFAULT_SIDEBAR_HEADER
+            else:
+                header, sbHeader = termHeaders[dictName]
+            headers = (compileHeader(header), compileHeader(sbHeader))
+            self.headers[dictName] = headers
+        return headers
+
+    def getHighlighter(
+        self, results: Dict[str, List[Dict[str, Any]]], term: str
+    ) -> Callable[[Any], str]:
+        """Get the highlighting function of a search.
+
+        Besides the term itself, this covers its deinflected forms that were
+        found as a term, altterm or pronunciation in the results.
+        """
+        if not self.config["highlightTarget"]:
+            return lambda text: text
+        terms = [term]
+        deinflectors = self.view.conjugations.values() if self.view.deinflect else []
+        if deinflectors:
+            found = set()
+            for dictResults in results.values():
+                for entry in dictResults:
+                    found.add(entry["term"])
+                    found.add(entry["altterm"])
+                    found.add(entry["pronunciation"])
+            for deinflector in deinflectors:
+                for candidate in deinflector.deinflect([term])[1:]:
+                    if candidate in found and candidate not in terms:
+                        terms.append(candidate)
+        return Highlighter(terms).highlight
+
+    def getHeaderValues(
+        self,
+        highlight: Callable[[Any], str],
+        term: str,
+        altterm: str,
+        pronunciation: str,
+        frontBracket: str,
+        backBracket: str,
+    ) -> Dict[str, str]:
+        """Get the values of the ◳ placeholders for one entry."""
+        if pronunciation == term:
+            pronunciation = ""
+        if altterm == term:
+            altterm = ""
+        hasAlt = altterm != ""
+        return {
+            "t": highlight(term),
+            "a": highlight(altterm),
+            "p": highlight(pronunciation),
+            "f": frontBracket,
+            "b": backBracket,
+            "x": frontBracket if hasAlt else "",
+            "y": backBracket if hasAlt else "",
+        }
+
+    def getDictionarySettings(self, dictName: str, dictCount: int) -> str:
+        """Get the settings controls shown in a dictionary's title block.
+
+        They read the add-on's database and collection, so lookups running off
+        the UI thread are given these up front.
+        """
+        view = self.view
+        if dictName == "Images":
+            return view.getOverwriteChecks(dictCount, dictName) + view.getFieldChecks(
+                dictName
+            )
+        return (
+            view.getDuplicateHeaderCB(dictName)
+            + view.getOverwriteChecks(dictCount, dictName)
+            + view.getFieldChecks(dictName)
+        )
+
+    def render(
+        self,
+        results: Dict[str, List[Dict[str, Any]]],
+        term: str,
+        font: str,
+        settings: Optional[Dict[str, str]] = None,
+        imagesId: str = "images",
+    ) -> str:
+        """Render the page with the results of every dictionary, for addNewTab()."""
+        if len(results) == 0:
+            return self.renderNoResults(term)
+        sideBar, main, _, _ = self.renderDictionaries(
+            results, term, font, 0, 0, settings, imagesId
+        )
+        return self.renderPage(sideBar, main, font)
+
+    def renderNoResults(self, term: str) -> str:
+        return NO_RESULTS.render(
+            icon=self.view.getBase64Icon("searchzero.svg"), term=term
+        )
+
+    def renderPage(self, sideBar: str, main: str, font: str) -> str:
+        """Wrap rendered dictionaries into the side bar and main display of a page."""
+        return (
+            SIDEBAR_START.render(font=font)
+            + sideBar
+            + SIDEBAR_END.render(tooltips="true" if self.config["tooltips"] else "false")
+            + main
+        )
+
+    def renderDictionaries(
+        self,
+        results: Dict[str, List[Dict[str, Any]]],
+        term: str,
+        font: str,
+        dictCount: int,
+        entryCount: int,
+        settings: Optional[Dict[str, str]] = None,
+        imagesId: str = "images",
+        deferred: Optional["DeferredEntries"] = None,
+    ) -> Tuple[str, str, int, int]:
+        """Render the side bar lists and main display blocks of some dictionaries.
+
+        Dictionaries and entries are numbered from dictCount and entryCount, so
+        results streamed in after the first page continue its numbering.
+        Settings controls come from settings when given, which makes rendering
+        safe off the UI thread. The Images block waits for images in the
+        element with the id imagesId. With deferred, only the entries its
+        budget allows are put in the main display; the others are kept there
+        in pages and left as placeholders for dictionary.js to request. The
+        side bar always lists every entry. Returns both fragments and the
+        counts to continue from.
+        """
+        fb = self.config["frontBracket"]
+        bb = self.config["backBracket"]
+        highlight = self.getHighlighter(results, term)
+        sideBar: List[str] = []
+        main: List[str] = []
+        for dictName, dictResults in results.items():
+            header, sbHeader = self.getHeaders(dictName)
+            sideBar.append(SIDEBAR_TITLE.render(index=str(dictCount), dictName=dictName))
+            if dictName == "Images":
+                values = self.getHeaderValues(highlight, term, term, term, fb, bb)
+                sideBar.append(
+                    SIDEBAR_ENTRY.render(index=str(entryCount), header=sbHeader.render(**values))
+                )
+                sideBar.append("</ol>")
+                if settings is None:
+                    imageSettings = self.getDictionarySettings(dictName, dictCount)
+                else:
+                    imageSettings = settings[dictName]
+                main.append(
+                    IMAGES.render(
+                        index=str(dictCount),
+                        entryIndex=str(entryCount),
+                        settings=imageSettings,
+                        f=fb,
+                        b=bb,
+                        font=font,
+                        term=highlight(term),
+                        imagesId=imagesId,
+                    )
+                )
+                dictCount += 1
+                entryCount += 1
+                continue
+            if settings is None:
+                dictSettings = self.getDictionarySettings(dictName, dictCount)
+            else:
+                dictSettings = settings[dictName]
+            main.append(
+                DICTIONARY_TITLE.render(
+                    index=str(dictCount),
+                    dictName=dictName,
+                    font=font,
+                    title=dictName.replace("_", " "),
+                    settings=dictSettings,
+                )
+            )
+            dictCount += 1
+            inline = len(dictResults)
+            if deferred is not None:
+                inline = min(inline, deferred.inlineRemaining)
+                deferred.inlineRemaining -= inline
+            for offset, entry in enumerate(dictResults):
+                index = str(entryCount + offset)
+                values = self.getHeaderValues(
+                    highlight, entry["term"], entry["altterm"], entry["pronunciation"], fb, bb
+                )
+                sideBar.append(
+                    SIDEBAR_ENTRY.render(index=index, header=sbHeader.render(**values))
+                )
+                if offset < inline:
+                    main.append(
+                        self.renderEntry(header, values, index, font, entry, highlight)
+                    )
+            if deferred is not None:
+                for offset in range(inline, len(dictResults), deferred.pageSize):
+                    page = dictResults[offset : offset + deferred.pageSize]
+                    start = entryCount + offset
+                    deferred.pages[start] = (dictName, page, highlight, font)
+                    main.append(
+                        ENTRY_PAGE.render(
+                            start=str(start),
+                            end=str(start + len(page)),
+                            count=str(len(page)),
+                        )
+                    )
+            entryCount += len(dictResults)
+            sideBar.append("</ol>")
+        return "".join(sideBar), "".join(main), dictCount, entryCount
+
+    def renderEntry(
+        self,
+        header: HtmlTemplate,
+        values: Dict[str, str],
+        index: str,
+        font: str,
+        entry: Dict[str, Any],
+        highlight: Callable[[Any], str],
+    ) -> str:
+        definition = highlight(self.view.highlightExamples(entry["definition"]))
+        return ENTRY.render(
+            index=index,
+            font=font,
+            header=header.render(**values),
+            starCount=entry["starCount"],
+            definition=definition,
+        )
+
+    def renderEntryPage(self, deferred: "DeferredEntries", start: int) -> Optional[str]:
+        """Render a page of entries left out of the results page, for loadEntryPage()."""
+        page = deferred.pages.get(start)
+        if page is None:
+            return None
+        dictName, entries, highlight, font = page
+        header, _ = self.getHeaders(dictName)
+        fb = self.config["frontBracket"]
+        bb = self.config["backBracket"]
+        html = []
+        for offset, entry in enumerate(entries):
+            values = self.getHeaderValues(
+                highlight, entry["term"], entry["altterm"], entry["pronunciation"], fb, bb
+            )
+            html.append(
+                self.renderEntry(
+                    header, values, str(start + offset), font, entry, highlight
+                )
+            )
+        return "".join(html)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Lookups off the UI thread. The first dictionary of a group can be searched
+on its own so its results are shown before the rest of the group is
+searched.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from aqt.qt import QObject, QRunnable, pyqtSignal
+
+from .latency import LatencyHistogram
+from .rendering import DeferredEntries, ResultsPage
+
+SEARCH_PHASES = ("query", "render", "eval")
+
+
+def countDefinitions(results: Dict[str, Any]) -> int:
+    """Count the definitions of a lookup towards maxSearch; Images does not count."""
+    return sum(len(r) for dictName, r in results.items() if dictName != "Images")
+
+
+class StreamedSearch:
+    """A lookup that searches a group's dictionaries in group order.
+
+    When streaming, the first dictionary is searched on its own and the rest
+    of the group with one more group search; otherwise the group is searched
+    at once. Repeated lookups search the same batches with the same budget,
+    so they hit the search cache. The maxSearch budget is shared by all
+    dictionaries, as in DictDB.searchGroup. Only one thread may use a search
+    at a time.
+    """
+
+    def __init__(
+        self,
+        db,
+        term: str,
+        dictionaries: List[Dict[str, str]],
+        conjugations,
+        sT: str,
+        deinflect: bool,
+        dictLimit: str,
+        maxDefs: int,
+        stream: bool = True,
+    ) -> None:
+        self.db = db
+        self.term = term
+        if stream and len(dictionaries) > 1:
+            self.batches = [dictionaries[:1], dictionaries[1:]]
+        else:
+            self.batches = [dictionaries]
+        self.conjugations = conjugations
+        self.sT = sT
+        self.deinflect = deinflect
+        self.dictLimit = dictLimit
+        self.remaining = maxDefs
+        self.position = 0
+
+    def done(self) -> bool:
+        return self.position >= len(self.batches) or self.remaining <= 0
+
+    def nextResults(self) -> Dict[str, Any]:
+        """Search the next batches until one has results; {} once all are searched."""
+        while not self.done():
+            batch = self.batches[self.position]
+            self.position += 1
+            results = self.db.searchTerm(
+                self.term,
+                {"dictionaries": batch},
+                self.conjugations,
+                self.sT,
+                self.deinflect,
+                self.dictLimit,
+                self.remaining,
+            )
+            if results:
+                self.remaining -= countDefinitions(results)
+                return results
+        return {}
+
+
+class SearchWorkerSignals(QObject):
+    pageReady = pyqtSignal(str, str)
+    resultsReady = pyqtSignal(str, str, str)
+    finished = pyqtSignal()
+
+
+class SearchWorker(QRunnable):
+    """Searches and renders a lookup off the UI thread.
+
+    The first dictionaries with results are emitted as a whole page
+    (pageReady), later ones as side bar and main display fragments to append
+    (resultsReady); both carry the id of the element awaiting image results,
+    or "". A worker with a restoreId fills the dropped tab of that search
+    instead of opening a tab. Entries beyond the first page are kept in
+    deferred. Settings
+    controls are rendered on the UI thread beforehand. Query and render times
+    are recorded in the latency histogram.
+    """
+
+    def __init__(
+        self,
+        search: StreamedSearch,
+        page: ResultsPage,
+        latency: LatencyHistogram,
+        searchId: int,
+        term: str,
+        font: str,
+        singleTab: str,
+        settings: Dict[str, str],
+        deferred: DeferredEntries,
+        restoreId: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        self.signals = SearchWorkerSignals()
+        self.search = search
+        self.page = page
+        self.latency = latency
+        self.searchId = searchId
+        self.term = term
+        self.font = font
+        self.singleTab = singleTab
+        self.settings = settings
+        self.deferred = deferred
+        self.restoreId = restoreId
+        self.dictCount = 0
+        self.entryCount = 0
+        self.shown = False
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stop searching; results already emitted are ignored by the receiver."""
+        self.cancelled = True
+
+    def run(self) -> None:
+        first = True
+        try:
+            while not self.cancelled:
+                start = time.perf_counter()
+                results = self.search.nextResults()
+                self.latency.record("query", time.perf_counter() - start)
+                if self.cancelled:
+                    break
+                if not results:
+                    if first:
+                        self.signals.pageReady.emit(self.page.renderNoResults(self.term), "")
+                    break
+                start = time.perf_counter()
+                imagesId = ""
+                if "Images" in results:
+                    imagesId = "gcon%d_%d" % (self.searchId, self.dictCount)
+                sideBar, main, self.dictCount, self.entryCount = (
+                    self.page.renderDictionaries(
+                        results,
+                        self.term,
+                        self.font,
+                        self.dictCount,
+                        self.entryCount,
+                        self.settings,
+                        imagesId,
+                        self.deferred,
+                    )
+                )
+                if first:
+                    html = self.page.renderPage(sideBar, main, self.font)
+                    self.latency.record("render", time.perf_counter() - start)
+                    self.signals.pageReady.emit(html, imagesId)
+                    first = False
+                else:
+                    self.latency.record("render", time.perf_counter() - start)
+                    self.signals.resultsReady.emit(sideBar, main, imagesId)
+        finally:
+            self.signals.finished.emit()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of image search results.
+
+The image URLs found for a term are stored by term, region and page offset;
+thumbnails are stored by the hash of the image URL. Both expire after their
+time to live, and the least recently used files are removed once the cache
+grows beyond its size limit. A file's modification time is when it was
+stored and its access time when it was last used, so the cache survives
+restarts without an index.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_SIZE_MB = 200
+DEFAULT_THUMBNAIL_DAYS = 30
+DEFAULT_URL_LIST_DAYS = 7
+# Eviction removes files until the cache is this fraction of its limit.
+EVICTION_TARGET = 0.9
+
+
+def cacheKey(*parts: Any) -> str:
+    """Hash the parts of a cache key into a file name."""
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """Size-bounded LRU cache of image URL lists and thumbnails.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        maxSizeMB: int = DEFAULT_CACHE_SIZE_MB,
+        thumbnailDays: float = DEFAULT_THUMBNAIL_DAYS,
+        urlListDays: float = DEFAULT_URL_LIST_DAYS,
+    ) -> None:
+        self.root = root
+        self.listDir = os.path.join(root, "lists")
+        self.thumbDir = os.path.join(root, "thumbs")
+        self.maxSize = maxSizeMB * 1024 * 1024
+        self.thumbnailTTL = thumbnailDays * 86400
+        self.urlListTTL = urlListDays * 86400
+        self.lock = threading.Lock()
+        # Total size of the cached files, counted on first write.
+        self.size: Optional[int] = None
+        os.makedirs(self.listDir, exist_ok=True)
+        os.makedirs(self.thumbDir, exist_ok=True)
+
+    @classmethod
+    def fromConfig(cls, root: str, config: Optional[Dict[str, Any]]) -> "ImageCache":
+        """Build a cache from the add-on config, falling back to the defaults."""
+        config = config or {}
+        return cls(
+            root,
+            maxSizeMB=int(config.get("imageCacheSizeMB", DEFAULT_CACHE_SIZE_MB)),
+            thumbnailDays=float(config.get("imageCacheDays", DEFAULT_THUMBNAIL_DAYS)),
+            urlListDays=float(config.get("imageListCacheDays", DEFAULT_URL_LIST_DAYS)),
+        )
+
+    def listPath(self, term: str, region: str, offset: int) -> str:
+        return os.path.join(self.listDir, cacheKey(term, region, offset) + ".json")
+
+    def thumbnailPath(self, url: str) -> str:
+        return os.path.join(self.thumbDir, cacheKey(url) + ".jpg")
+
+    def getUrls(self, term: str, region: str, offset: int) -> Optional[List[str]]:
+        """Get the image URLs of a results page, or None if they are not cached."""
+        path = self.listPath(term, region, offset)
+        if not self.touch(path, self.urlListTTL):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as listFile:
+                return json.load(listFile)["urls"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def putUrls(self, term: str, region: str, offset: int, urls: List[str]) -> None:
+        data = json.dumps(
+            {"term": term, "region": region, "offset": offset, "urls": urls},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        self.write(self.listPath(term, region, offset), data)
+
+    def getThumbnail(self, url: str) -> Optional[str]:
+        """Get the path of the cached thumbnail of an image, or None."""
+        path = self.thumbnailPath(url)
+        return path if self.touch(path, self.thumbnailTTL) else None
+
+    def putThumbnail(self, url: str, data: bytes) -> str:
+        """Store the JPEG thumbnail of an image and return its path."""
+        path = self.thumbnailPath(url)
+        self.write(path, data)
+        return path
+
+    def touch(self, path: str, ttl: float) -> bool:
+        """Mark a cached file as used; expired files are removed and count as missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        now = time.time()
+        if now - stat.st_mtime > ttl:
+            self.remove(path, stat.st_size)
+            return False
+        try:
+            os.utime(path, (now, stat.st_mtime))
+        except OSError:
+            pass
+        return True
+
+    def write(self, path: str, data: bytes) -> None:
+        tmpPath = path + ".tmp%d" % threading.get_ident()
+        try:
+            with open(tmpPath, "wb") as tmpFile:
+                tmpFile.write(data)
+            oldSize = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmpPath, path)
+        except OSError as e:
+            print(f"Error writing image cache file {path}: {e}")
+            return
+        with self.lock:
+            if self.size is None:
+                self.size = self.scan()[1]
+            else:
+                self.size += len(data) - oldSize
+            overLimit = self.size > self.maxSize
+        if overLimit:
+            self.evict()
+
+    def remove(self, path: str, size: int) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self.lock:
+            if self.size is not None:
+                self.size -= size
+
+    def scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        """List the cached files as (last use, size, path) and their total size."""
+        files = []
+        total = 0
+        for directory in (self.listDir, self.thumbDir):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_atime, stat.st_size, entry.path))
+                total += stat.st_size
+        return files, total
+
+    def evict(self) -> None:
+        """Remove the least recently used files until the cache is below its limit."""
+        files, total = self.scan()
+        target = self.maxSize * EVICTION_TARGET
+        files.sort()
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self.lock:
+            self.size = total
+
+    def prune(self) -> None:
+        """Remove expired files and trim the cache to its size limit."""
+        now = time.time()
+        for directory, ttl in (
+            (self.listDir, self.urlListTTL),
+            (self.thumbDir, self.thumbnailTTL),
+        ):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if now - entry.stat().st_mtime > ttl:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+        self.evict()
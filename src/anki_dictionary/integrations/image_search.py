@@ -10,39 +10,35 @@
 # Technical Implementation:
 # - DuckDuckGo API pagination using offset parameter
 # - Persistent search instances to maintain state across load more requests
-# - Async image downloading and base64 embedding for better performance
+# - Async image downloading into an on-disk cache; thumbnails are referenced by file URL
 # - CSS flexbox layout with responsive design
 
 # -*- coding: utf-8 -*-
 # - Persistent search instances to maintain state across load more requests
-# - Async image downloading and base64 embedding for better performance
+# - Async image downloading into an on-disk cache; thumbnails are referenced by file URL
 # - CSS flexbox layout with responsive design
 
 # -*- coding: utf-8 -*-
 import argparse
 import os
 from os.path import dirname, join
-import requests
 import re
-from aqt.qt import QRunnable, QObject, pyqtSignal
-from PIL import Image
-import io
-import hashlib
-from aqt import mw
-import os
+from aqt.qt import QObject, pyqtSignal
 import io
 import asyncio
 import aiohttp
-import hashlib
 import concurrent.futures
 from PIL import Image
 import json
 import ssl
-import urllib3
+import threading
+import time
 import warnings
-
-# Disable SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from collections import OrderedDict
+from html import escape
+from pathlib import Path
+from .image_cache import ImageCache
+from ..utils.config import get_addon_config
 
 # Suppress PIL warnings globally
 warnings.filterwarnings("ignore", category=UserWarning, module="PIL")
@@ -154,123 +150,189 @@ countryToDuckDuckGo = {
 addon_path = dirname(dirname(dirname(dirname(__file__))))
 temp_dir = join(addon_path, "temp")
 os.makedirs(temp_dir, exist_ok=True)
+# Kept outside temp/, which is emptied on every profile load.
+image_cache_dir = join(addon_path, "user_files", "image_cache")
+_imageCache = None
+
+
+def getImageCache():
+    """Get the image search cache shared by all searches."""
+    global _imageCache
+    if _imageCache is None:
+        _imageCache = ImageCache.fromConfig(image_cache_dir, get_addon_config())
+    return _imageCache
+
 
 ########################################
-# DuckDuckGo Search Engine Implementation
+# Image Search Service
 ########################################
 
+# Image results per DuckDuckGo page
+IMAGES_PER_PAGE = 15
+# vqd tokens are reused for this many seconds per term and region
+VQD_TOKEN_TTL = 600
+VQD_TOKEN_CACHE_SIZE = 256
+# Threads that turn downloaded images into thumbnails
+THUMBNAIL_WORKERS = 4
+# Downloads still running this many seconds into a lookup are given up
+IMAGE_DEADLINE = 15
+# Concurrent connections to one host, so a slow host only holds up its own images
+IMAGE_HOST_CONNECTIONS = 6
+SEARCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Referer": "https://duckduckgo.com",
+    "DNT": "1",
+}
 
-class DuckDuckGoSignals(QObject):
-    resultsFound = pyqtSignal(list)
-    noResults = pyqtSignal(str)
-    finished = pyqtSignal()
 
+class ImageSearchService:
+    """
+    Runs image lookups on one background event loop.
 
-class DuckDuckGo(QRunnable):
-    def __init__(self):
-        super().__init__()
-        self.signals = DuckDuckGoSignals()
-        self.term = ""
-        self.idName = ""
-        self.language = "us-en"  # Default to US English
-        self.search_offset = 0  # Track search pagination
+    The loop, its HTTP session and connection pool, the thumbnail workers
+    and the vqd tokens DuckDuckGo hands out per query live as long as the
+    service, so a lookup only pays for its own requests. Coroutines are
+    handed to the loop with submit().
+    """
 
-    def setTermIdName(self, term, idName):
-        self.term = term
-        self.idName = idName
-        # Reset offset for new searches (but not for load more)
-        if idName != "load_more":
-            self.search_offset = 0
+    def __init__(self, cache):
+        self.cache = cache
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS, thread_name_prefix="DictImages"
+        )
+        self.session = None
+        self.hasCookies = False
+        # (term, region) -> (vqd token, time fetched); only used on the loop
+        self.vqdTokens = OrderedDict()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="DictImageSearch", daemon=True
+        )
+        self.thread.start()
 
-    def setSearchRegion(self, region_or_code):
-        """Set search language/region. Can accept country names or ISO codes like 'zh-CN'"""
-        # Try to find the region/code in our unified mapping
-        if region_or_code in countryToDuckDuckGo:
-            self.language = countryToDuckDuckGo[region_or_code]
-        else:
-            print(f"Warning: Unsupported region/language '{region_or_code}', using default US English")
-            self.language = "us-en"
+    def submit(self, coro):
+        """Run a coroutine on the service loop; returns a concurrent future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
 
-    def getCleanedUrls(self, urls):
-        return [x.replace("\\", "\\\\") for x in urls]
+    def close(self):
+        """Close the HTTP session and stop the loop and the thumbnail workers."""
 
-    def search(self, term, maximum=15, offset=0):
+        async def closeSession():
+            if self.session is not None:
+                await self.session.close()
+
+        try:
+            self.submit(closeSession()).result(timeout=5)
+        except Exception as e:
+            print(f"Error closing image search session: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
+
+    def getSession(self):
+        if self.session is None or self.session.closed:
+            # Create SSL context that doesn't verify certificates
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context,
+                limit=100,
+                limit_per_host=IMAGE_HOST_CONNECTIONS,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                keepalive_timeout=60,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30, connect=10),
+                headers=SEARCH_HEADERS,
+            )
+            self.hasCookies = False
+        return self.session
+
+    async def getVqdToken(self, term, region, refresh=False):
+        """Get the vqd token DuckDuckGo requires for an image query."""
+        key = (term, region)
+        cached = self.vqdTokens.get(key)
+        if cached and not refresh and time.time() - cached[1] < VQD_TOKEN_TTL:
+            self.vqdTokens.move_to_end(key)
+            return cached[0]
+        session = self.getSession()
+        search_url = "https://duckduckgo.com/"
+        if not self.hasCookies:
+            # The first request of a session only picks up DuckDuckGo's cookies
+            async with session.get(search_url) as response:
+                await response.read()
+            self.hasCookies = True
+        params = {"q": term, "iax": "images", "ia": "images", "kl": region}
+        async with session.get(search_url, params=params) as response:
+            text = await response.text()
+        vqd = re.search(r"vqd=[\d-]+", text)
+        if not vqd:
+            return None
+        token = vqd.group().split("=")[1]
+        self.vqdTokens[key] = (token, time.time())
+        if len(self.vqdTokens) > VQD_TOKEN_CACHE_SIZE:
+            self.vqdTokens.popitem(last=False)
+        return token
+
+    async def search(self, term, region, maximum=IMAGES_PER_PAGE, offset=0):
         """
         Search for images using DuckDuckGo
         Args:
         term: Search term string
+        region: DuckDuckGo region code
         maximum: Maximum number of images to return (default: 15)
         offset: Pagination offset for getting more results
         Returns:
         List of image URLs
         """
-        session = requests.Session()
-        # Disable SSL verification to handle problematic certificates
-        session.verify = False
-        session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-                "Referer": "https://duckduckgo.com",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
-        )
-
+        urls = self.cache.getUrls(term, region, offset)
+        if urls is not None:
+            return urls[:maximum]
+        session = self.getSession()
         try:
-            # Get the initial token
-            search_url = "https://duckduckgo.com/"
-            response = session.get(search_url, timeout=30)
-            session.cookies.update(response.cookies)
-
-            # Perform the search
-            params = {
-                "q": term,
-                "iax": "images",
-                "ia": "images",
-                "kl": self.language,  # Add language/region parameter
-            }
-
-            response = session.get(search_url, params=params, timeout=30)
-
-            # Extract the vqd token using regex
-            vqd = re.search(r"vqd=[\d-]+", response.text)
-            if not vqd:
-                return []
-
-            # Build the API URL request
-            api_url = "https://duckduckgo.com/i.js"
-            params = {
-                "l": "wt-wt",
-                "o": "json",
-                "q": term,
-                "vqd": vqd.group().split("=")[1],
-                "f": ",,,",
-                "p": str(offset),  # Use offset for pagination
-            }
-
-            response = session.get(api_url, params=params, timeout=30)
-            if response.status_code == 200:
-                results = [img["image"] for img in response.json().get("results", [])]
-                return results[
-                    :maximum
-                ]  # Limit results to maximum TODO: check if this is a legit way to do it
-
+            for refresh in (False, True):
+                vqd = await self.getVqdToken(term, region, refresh)
+                if not vqd:
+                    return []
+                params = {
+                    "l": "wt-wt",
+                    "o": "json",
+                    "q": term,
+                    "vqd": vqd,
+                    "f": ",,,",
+                    "p": str(offset),  # Use offset for pagination
+                }
+                async with session.get(
+                    "https://duckduckgo.com/i.js", params=params
+                ) as response:
+                    if response.status == 403 and not refresh:
+                        # The token expired; fetch a new one and try once more
+                        continue
+                    if response.status != 200:
+                        return []
+                    data = await response.json(content_type=None)
+                results = [img["image"] for img in data.get("results", [])]
+                if results:
+                    self.cache.putUrls(term, region, offset, results)
+                return results[:maximum]
         except Exception as e:
             print(f"Error in DuckDuckGo search: {str(e)}")
         return []
 
     def process_image(self, url: str, content: bytes) -> str:
-        """Process the image: open, convert, resize, and save to disk."""
-        import warnings
-        
+        """Process the image: open, convert, resize, and store it in the cache.
+
+        Returns the path of the thumbnail.
+        """
         # Suppress all PIL warnings at the beginning
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, module="PIL")
             warnings.filterwarnings("ignore", message=".*Palette images with Transparency.*")
-            
+
             try:
                 img = Image.open(io.BytesIO(content))
                 # Convert image if necessary
@@ -278,43 +340,34 @@ class DuckDuckGo(QRunnable):
                     img = img.convert("RGB")
                 # Resize image maintaining aspect ratio
                 img.thumbnail((200, 200))
-                # Generate a unique filename based on the URL
-                img_hash = hashlib.md5(url.encode()).hexdigest()
-                filename = f"dict_img_{img_hash}.jpg"
-                filepath = os.path.join(temp_dir, filename)
-                img.save(filepath, "JPEG", quality=85)
-                return filename
+                output = io.BytesIO()
+                img.save(output, "JPEG", quality=85)
+                return self.cache.putThumbnail(url, output.getvalue())
             except Exception as e:
                 # Only log serious errors, not common issues like corrupted images
                 if "cannot identify image file" not in str(e):
                     print(f"Error processing image from {url}: {e}")
         return ""
 
-    async def download_and_process_image(
-        self,
-        url: str,
-        session: aiohttp.ClientSession,
-        executor: concurrent.futures.Executor,
-    ) -> str:
-        """Download an image asynchronously and process it using a thread pool."""
+    async def download_and_process_image(self, url: str) -> str:
+        """Download an image and turn it into a thumbnail on the worker threads."""
+        cached = self.cache.getThumbnail(url)
+        if cached:
+            return cached
         try:
-            # Create a specific timeout for this request
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with session.get(url, timeout=timeout) as response:
+            async with self.getSession().get(url) as response:
                 if response.status == 200:
                     content = await response.read()
-                    loop = asyncio.get_running_loop()
                     # Offload the synchronous image processing to the executor
-                    filename = await loop.run_in_executor(
-                        executor, self.process_image, url, content
+                    return await self.loop.run_in_executor(
+                        self.executor, self.process_image, url, content
                     )
-                    return filename
         except Exception as e:
             # Only log serious connection errors, not common SSL issues
             error_str = str(e)
             if not any(x in error_str.lower() for x in [
-                'certificate verify failed', 
-                'ssl:', 
+                'certificate verify failed',
+                'ssl:',
                 'server disconnected',
                 'cannot connect to host',
                 'timeout'
@@ -322,158 +375,190 @@ class DuckDuckGo(QRunnable):
                 print(f"Error downloading image from {url}: {e}")
         return ""
 
-    async def download_all_images(self, urls: list) -> list:
-        """Download and process all images concurrently."""
-        # Create SSL context that doesn't verify certificates
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        # Create connector with SSL context and increased timeout
-        connector = aiohttp.TCPConnector(
-            ssl=ssl_context,
-            limit=100,
-            limit_per_host=30,
-            ttl_dns_cache=300,
-            use_dns_cache=True,
-        )
-        
-        # Create timeout configuration
-        timeout = aiohttp.ClientTimeout(total=30, connect=10)
-        
-        # Create a thread pool for image processing
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            async with aiohttp.ClientSession(
-                connector=connector, 
-                timeout=timeout,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-            ) as session:
-                tasks = [
-                    self.download_and_process_image(url, session, executor)
-                    for url in urls
-                ]
-                # Gather all tasks concurrently
-                results = await asyncio.gather(*tasks)
-                # Filter out any None results
-                return [filename for filename in results if filename]
-
-    def getHtml(self, term, is_load_more=False):
+    async def download_ranked_image(self, rank: int, url: str):
+        return rank, url, await self.download_and_process_image(url)
+
+    async def iter_thumbnails(self, urls: list, deadline: float = IMAGE_DEADLINE):
         """
-        Generate HTML using the images from the search results.
-        Downloads images to the temp folder.
+        Download and process images concurrently, yielding (rank, url, path)
+        for each thumbnail as soon as it is ready. Failed downloads are left
+        out; those still running at the deadline are cancelled.
         """
-        # Note: search_offset is now controlled by the dictionary class
-        # and is set before this method is called
-        images = self.search(term, offset=self.search_offset)  # Get image URLs
-        if not images or len(images) < 1:
-            return "No Images Found. This is likely due to a connectivity error."
-
-        # Download images asynchronously
+        tasks = [
+            asyncio.ensure_future(self.download_ranked_image(rank, url))
+            for rank, url in enumerate(urls)
+        ]
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            local_images = loop.run_until_complete(self.download_all_images(images))
-            loop.close()
-        except Exception as e:
-            print(f"Error in async image download: {e}")
-            return "Error downloading images"
+            for next_done in asyncio.as_completed(tasks, timeout=deadline):
+                try:
+                    rank, url, path = await next_done
+                except asyncio.TimeoutError:
+                    break
+                if path:
+                    yield rank, url, path
+        finally:
+            for task in tasks:
+                task.cancel()
 
-        def generate_image_html(filename):
-            # Use base64 data URL to embed the image directly in HTML
-            import base64
+    async def prefetch(self, term, region, offset, pages):
+        """
+        Search and download the thumbnails of the given number of pages from
+        offset on, so Load More finds them in the cache.
+        """
+        for page in range(pages):
+            urls = await self.search(
+                term, region, offset=offset + page * IMAGES_PER_PAGE
+            )
+            if not urls:
+                return
+            await self.download_all_images(urls)
 
-            image_path = os.path.join(temp_dir, filename)
-            try:
-                with open(image_path, "rb") as img_file:
-                    img_data = img_file.read()
-                    img_base64 = base64.b64encode(img_data).decode("utf-8")
-                    data_url = f"data:image/jpeg;base64,{img_base64}"
-                    return (
-                        '<div class="imgBox">'
-                        f'<div onclick="toggleImageSelect(this)" data-url="{data_url}" class="imageHighlight"></div>'
-                        f'<img class="searchImage" src="{data_url}" ankiDict="{image_path}">'
-                        "</div>"
-                    )
-            except Exception as e:
-                print(f"Error reading image {filename}: {e}")
-                return '<div class="imgBox">Error loading image</div>'
+    async def download_all_images(self, urls: list) -> list:
+        """Download and process all images, returning (url, path) pairs in search order."""
+        results = [result async for result in self.iter_thumbnails(urls)]
+        return [(url, path) for rank, url, path in sorted(results)]
 
-        # Create horizontal layout with all images in one container
-        html = '<div class="imageCont horizontal-layout">'
-        html += "".join(generate_image_html(img) for img in local_images)
-        html += "</div>"
 
-        # Add Load More button that triggers a new search
-        # Use JSON encoding to properly escape the term for JavaScript
-        # But we need to escape the quotes for HTML attribute
-        escaped_term = json.dumps(term).replace('"', "&quot;")
-        html += f'<button class="imageLoader" onclick="loadMoreImages(this, {escaped_term})">Load More</button>'
+_imageSearchService = None
 
-        return html
 
-    def getMoreImages(self, term):
+def getImageSearchService():
+    """Get the image search service, starting it on first use."""
+    global _imageSearchService
+    if _imageSearchService is None:
+        _imageSearchService = ImageSearchService(getImageCache())
+    return _imageSearchService
+
+
+def closeImageSearchService():
+    """Stop the image search service; the next lookup starts a new one."""
+    global _imageSearchService
+    if _imageSearchService is not None:
+        _imageSearchService.close()
+        _imageSearchService = None
+
+
+########################################
+# DuckDuckGo Search Engine Implementation
+########################################
+
+
+class DuckDuckGoSignals(QObject):
+    resultsFound = pyqtSignal(list)
+    imageFound = pyqtSignal(str, str, int)
+    imagesDone = pyqtSignal(str, int)
+    noResults = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class DuckDuckGo:
+    """
+    One image lookup. start() runs it on the image search service; the
+    signals are delivered on the thread that created the lookup.
+
+    A new lookup first emits the empty image strip (resultsFound), a Load
+    More lookup adds to the strip of its idName. Either way each thumbnail
+    is emitted as soon as it is ready (imageFound) and imagesDone reports
+    how many were found.
+    """
+
+    def __init__(self):
+        self.signals = DuckDuckGoSignals()
+        self.term = ""
+        self.idName = ""
+        self.language = "us-en"  # Default to US English
+        self.search_offset = 0  # Track search pagination
+        self.loadMore = False
+        self.service = getImageSearchService()
+
+    def setTermIdName(self, term, idName, loadMore=False):
+        self.term = term
+        self.idName = idName
+        self.loadMore = loadMore
+
+    def setSearchRegion(self, region_or_code):
+        """Set search language/region. Can accept country names or ISO codes like 'zh-CN'"""
+        # Try to find the region/code in our unified mapping
+        if region_or_code in countryToDuckDuckGo:
+            self.language = countryToDuckDuckGo[region_or_code]
+        else:
+            print(f"Warning: Unsupported region/language '{region_or_code}', using default US English")
+            self.language = "us-en"
+
+    def getCleanedUrls(self, urls):
+        return [x.replace("\\", "\\\\") for x in urls]
+
+    def search(self, term, maximum=IMAGES_PER_PAGE, offset=0):
+        """Search for image URLs, waiting for the result. Not for use on the service loop."""
+        return self.service.submit(
+            self.service.search(term, self.language, maximum, offset)
+        ).result()
+
+    def getImageBoxHtml(self, url, path, rank):
         """
-        Get more images for the load more functionality.
-        Returns HTML for additional images without container wrapper.
+        Markup of one search result. The thumbnail is loaded from the cache by
+        file URL; exports look it up in the cache by the image URL. The rank
+        keeps the strip in search order when images arrive out of order.
         """
-        # Note: search_offset is now controlled by the dictionary class
-        # and is set before this method is called
-        images = self.search(term, offset=self.search_offset)  # Get image URLs
-        if not images or len(images) < 1:
-            return ""  # Return empty if no more images
-
-        # Download images asynchronously
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            local_images = loop.run_until_complete(self.download_all_images(images))
-            loop.close()
-        except Exception as e:
-            print(f"Error in async image download: {e}")
-            return ""
+        return (
+            f'<div class="imgBox" data-rank="{rank}">'
+            f'<div onclick="toggleImageSelect(this)" data-url="{escape(url)}" class="imageHighlight"></div>'
+            f'<img class="searchImage" src="{escape(Path(path).as_uri())}" ankiDict="{escape(path)}">'
+            "</div>"
+        )
 
-        def generate_image_html(filename):
-            # Use base64 data URL to embed the image directly in HTML (same as initial search)
-            import base64
+    def getContainerHtml(self, term):
+        """Generate the image strip that thumbnails are added to, with its Load More button."""
+        html = '<div class="imageCont horizontal-layout"></div>'
 
-            image_path = os.path.join(temp_dir, filename)
-            try:
-                with open(image_path, "rb") as img_file:
-                    img_data = img_file.read()
-                    img_base64 = base64.b64encode(img_data).decode("utf-8")
-                    data_url = f"data:image/jpeg;base64,{img_base64}"
-                    return (
-                        '<div class="imgBox">'
-                        f'<div onclick="toggleImageSelect(this)" data-url="{data_url}" class="imageHighlight"></div>'
-                        f'<img class="searchImage" src="{data_url}" ankiDict="{image_path}">'
-                        "</div>"
-                    )
-            except Exception as e:
-                print(f"Error reading image {filename}: {e}")
-                return '<div class="imgBox">Error loading image</div>'
+        # Add Load More button that triggers a new search
+        # Use JSON encoding to properly escape the term for JavaScript
+        # But we need to escape the quotes for HTML attribute
+        escaped_term = json.dumps(term).replace('"', "&quot;")
+        html += f'<button class="imageLoader" onclick="loadMoreImages(this, {escaped_term})">Load More</button>'
 
-        # Just return the image HTML without container wrapper
-        html = "".join(generate_image_html(img) for img in local_images)
         return html
 
-    def getPreparedResults(self, term, idName):
-        html = self.getHtml(term)
-        return [html, idName]
+    def start(self):
+        """Run the lookup on the image search service."""
+        return self.service.submit(self.run())
 
-    def run(self):
+    def prefetch(self, pages):
+        """Fetch the pages after this lookup's in the background; returns a cancellable future."""
+        return self.service.submit(
+            self.service.prefetch(
+                self.term, self.language, self.search_offset + IMAGES_PER_PAGE, pages
+            )
+        )
+
+    async def run(self):
         try:
             if self.term:
-                is_load_more = self.idName == "load_more"
-                if is_load_more:
-                    # For load more, just get more images
-                    html = self.getMoreImages(self.term)
-                    resultList = [html, self.idName]
-                else:
-                    # For initial search, get normal results
-                    resultList = self.getPreparedResults(self.term, self.idName)
-                self.signals.resultsFound.emit(resultList)
+                # Note: search_offset is controlled by the dictionary class
+                # and is set before the lookup is started
+                images = await self.service.search(
+                    self.term, self.language, offset=self.search_offset
+                )
+                if not self.loadMore:
+                    if not images:
+                        self.signals.resultsFound.emit(
+                            [
+                                "No Images Found. This is likely due to a connectivity error.",
+                                self.idName,
+                            ]
+                        )
+                        return
+                    self.signals.resultsFound.emit(
+                        [self.getContainerHtml(self.term), self.idName]
+                    )
+                found = 0
+                async for rank, url, path in self.service.iter_thumbnails(images):
+                    rank += self.search_offset
+                    self.signals.imageFound.emit(
+                        self.getImageBoxHtml(url, path, rank), self.idName, rank
+                    )
+                    found += 1
+                self.signals.imagesDone.emit(self.idName, found)
         except Exception as e:
             print(f"DuckDuckGo run error: {e}")
             self.signals.noResults.emit(
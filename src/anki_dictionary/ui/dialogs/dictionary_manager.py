@@ -8,6 +8,7 @@ import logging
 import os
 from aqt.qt import *
 from aqt import mw
+from ...core.importer import iterDictRows
 from ...web.installer import DictionaryWebInstallWizard
 from ...web.windows import FreqConjWebWindow
 
@@ -44,6 +45,10 @@ class DictionaryManagerWidget(QWidget):
         web_installer_btn.clicked.connect(self.web_installer)
         left_lyt.addWidget(web_installer_btn)
 
+        compact_db_btn = QPushButton("Compact Database")
+        compact_db_btn.clicked.connect(self.compact_db)
+        left_lyt.addWidget(compact_db_btn)
+
         right_side = QWidget()
         splitter.addWidget(right_side)
         right_lyt = QVBoxLayout()
@@ -221,6 +226,17 @@ class DictionaryManagerWidget(QWidget):
         DictionaryWebInstallWizard.execute_modal()
         self.reload_tree_widget()
 
+    def compact_db(self):
+        db = aqt.mw.miDictDB
+
+        if not db.compactDatabase():
+            self.info("The database is already being compacted.")
+            return
+        self.info(
+            "The database is being compacted in the background.\n"
+            "Installing or removing dictionaries may wait until it has finished."
+        )
+
     def add_lang(self):
         db = aqt.mw.miDictDB
 
@@ -315,8 +331,14 @@ class DictionaryManagerWidget(QWidget):
             self.info("Importing frequency data failed.")
             return
 
+        db = aqt.mw.miDictDB
+        if not db.loadFrequencyFile(lang_name, dst_path):
+            self.info("Importing frequency data failed.")
+            return
+        db.applyFrequencyList(lang_name)
+
         self.info(
-            'Imported frequency data for "%s".\n\nNote that the frequency data is only applied to newly imported dictionaries for this language.'
+            'Imported frequency data for "%s".\n\nThe frequency data was applied to all dictionaries of this language.'
             % lang_name
         )
 
@@ -543,10 +565,12 @@ def importDict(lang_name, file, dict_name):
     has_index = any(fn == "index.json" for fn in zfile.namelist())
 
     print("Importing dict")
-    frequency_dict = getFrequencyList(lang_name)
+    loadFrequencyList(lang_name)
     term_header = json.dumps(["term", "altterm", "pronunciation"])
 
-    success, message, final_name = db.addDict(dict_name, lang_name, term_header)
+    success, message, final_name = db.addDict(
+        dict_name, lang_name, term_header, deferIndexes=True
+    )
 
     if not success:
         raise ValueError(
@@ -564,7 +588,7 @@ def importDict(lang_name, file, dict_name):
         dict_files.append(fn)
     dict_files = natural_sort(dict_files)
 
-    loadDict(zfile, dict_files, lang_name, final_name, frequency_dict, not is_yomichan)
+    loadDict(zfile, dict_files, lang_name, final_name, not is_yomichan)
 
 
 def natural_sort(l):
@@ -573,389 +597,23 @@ def natural_sort(l):
     return sorted(l, key=alphanum_key)
 
 
-def loadDict(zfile, filenames, lang, dictName, frequencyDict, miDict=False):
+def loadDict(zfile, filenames, lang, dictName, miDict=False):
     tableName = "l" + str(mw.miDictDB.getLangId(lang)) + "name" + dictName
-    jsonDict = []
-    for filename in filenames:
-        with zfile.open(filename, "r") as jsonDictFile:
-            jsonDict += json.loads(jsonDictFile.read())
-    if frequencyDict:
-        print("FreqDICT!")
-        if miDict:
-            jsonDict = organizeDictionaryByFrequency(
-                jsonDict, frequencyDict, dictName, lang, True
-            )
-        else:
-            jsonDict = organizeDictionaryByFrequency(
-                jsonDict, frequencyDict, dictName, lang
-            )
-    for count, entry in enumerate(jsonDict):
-        if (
-            isinstance(entry, list)
-            and len(entry) == 3
-            and isinstance(entry[2], dict)
-            and "pitches" in entry[2]
-        ):
-            handlePitchDictEntry(jsonDict, count, entry)
-        elif miDict:
-            handleMiDictEntry(jsonDict, count, entry, frequencyDict is not None)
-        else:
-            handleYomiDictEntry(jsonDict, count, entry, frequencyDict is not None)
-    mw.miDictDB.importToDict(tableName, jsonDict)
-    mw.miDictDB.commitChanges()
-
-
-def getAdjustedTerm(term):
-    term = term.replace("\n", "")
-    if len(term) > 1:
-        term = term.replace("=", "")
-    return term
-
-
-def getAdjustedPronunciation(pronunciation):
-    return pronunciation.replace("\n", "")
-
-
-def getAdjustedDefinition(definition):
-    # First handle newlines and special characters
-    definition = definition.replace("\n", "<br>")
-    definition = definition.replace("◟", "<br>")
-    
-    # Normalize all <br> variants to standard <br> (case insensitive, with or without closing slash)
-    definition = re.sub(r"<br\s*/?>", "<br>", definition, flags=re.IGNORECASE)
-    
-    # Handle HTML entities
-    definition = definition.replace("<", "&lt;").replace(">", "&gt;")
-    
-    # But keep our normalized <br> tags as HTML
-    definition = definition.replace("&lt;br&gt;", "<br>")
-    
-    # Remove trailing <br> tags
-    definition = re.sub(r"<br>$", "", definition)
-    return definition
-
-
-def handlePitchDictEntry(jsonDict, count, entry):
-    # Initialize default values
-    term = ""
-    altterm = ""
-    reading = ""
-    pos = ""
-    definition = ""
-    examples = ""
-    audio = ""
-    frequency = ""
-    starCount = ""
-    pitch_accent = ""
-
-    # Extract pitch dictionary data
-    term = entry[0]
-    reading = entry[2].get("reading", entry[0])
-    pitch_accent = (
-        entry[2]["pitches"][0].get("position") if entry[2]["pitches"] else None
-    )
-    # altterm = str(pitch_accent) if pitch_accent is not None else ""
-
-    # Create a 9-element tuple
-    jsonDict[count] = (
-        term,  # term
-        altterm,  # altterm (pitch accent position)
-        reading,  # pronunciation
-        pos,  # part of speech
-        definition,  # definition
-        examples,  # examples
-        audio,  # audio
-        frequency,  # frequency
-        starCount,  # star count
-    )
-
-
-def handleMiDictEntry(jsonDict, count, entry, freq=False):
-    # Handle both list and dict formats
-    if isinstance(entry, list):
-        # Convert list format to expected structure
-        term = entry[0] if len(entry) > 0 else ""
-        altterm = entry[1] if len(entry) > 1 else ""
-        details = entry[2] if len(entry) > 2 and isinstance(entry[2], dict) else {}
-
-        # Extract from details or use defaults
-        pronunciation = details.get("pronunciation", altterm)
-        pos = details.get("pos", "")
-        definition = details.get("definition", "")
-        frequency = details.get("frequency", "") if freq else ""
-        starCount = details.get("starCount", "") if freq else ""
-    elif isinstance(entry, dict):
-        # Handle dict format (original code)
-        term = entry.get("term", "")
-        altterm = entry.get("altterm", "")
-        pronunciation = entry.get("pronunciation", "")
-        pos = entry.get("pos", "")
-        definition = entry.get("definition", "")
-        frequency = entry.get("frequency", "") if freq else ""
-        starCount = entry.get("starCount", "") if freq else ""
-    else:
-        # Fallback for unexpected formats
-        return
-
-    if pronunciation == "":
-        pronunciation = term
-
-    term = getAdjustedTerm(term)
-    altTerm = getAdjustedTerm(altterm)
-    pronunciation = getAdjustedPronunciation(pronunciation)
-    definition = getAdjustedDefinition(definition)
-
-    jsonDict[count] = (
-        term,
-        altTerm,
-        pronunciation,
-        pos,
-        definition,
-        "",
-        "",
-        frequency,
-        starCount,
-    )
-
-
-def handleYomiDictEntry(jsonDict, count, entry, freq=False):
-    def extract_definition(items):
-        """Extracts definition text from deeply nested dictionary structure."""
-
-        def recursive_extract(item):
-            if isinstance(item, str):
-                return item.strip()
-            elif isinstance(item, dict):
-                if "name" in item.get("data", {}) and item["data"]["name"] == "語釈":
-                    return recursive_extract(item.get("content", ""))
-                return recursive_extract(item.get("content", ""))
-            elif isinstance(item, list):
-                return " ".join(
-                    recursive_extract(x) for x in item if recursive_extract(x)
-                )
-            return ""
-
-        definitions = []
-        for item in items:
-            text = recursive_extract(item)
-            if text:
-                # Replace any newline characters with <br/> to preserve line breaks
-                text = text.replace("\n", "<br/>")
-                definitions.append(text)
-        return "<br/>".join(definitions)  # Join definitions with <br/>
-
-    def find_header_section(items):
-        """Find the header section in the content."""
-        if isinstance(items, list):
-            for item in items:
-                if isinstance(item, dict):
-                    if item.get("type") == "structured-content":
-                        return find_header_section(item.get("content", []))
-                    if item.get("data", {}).get("name") == "見出部":
-                        return item.get("content", [])
-        return []
-
-    def extract_pitch(content):
-        """
-        Extract pitch accents from content by recursively searching through nested structures.
-        Returns a list of integer accent positions.
-        """
-        accents = []
-
-        def recursive_search(item):
-            if isinstance(item, dict) and "data" in item:
-                name = item.get("data", {}).get("name", "")
-
-            if not isinstance(item, (dict, list)):
-                return
-
-            if isinstance(item, dict):
-                name = item.get("data", {}).get("name", "")
-                if name.startswith("accent"):
-                    try:
-                        accent_num = int(name.replace("accent", ""))
-                        accents.append(accent_num)
-                    except ValueError:
-                        pass
-
-                if "content" in item:
-                    recursive_search(item["content"])
-
-            elif isinstance(item, list):
-                for sub_item in item:
-                    recursive_search(sub_item)
-
-        accents.clear()
-        recursive_search(content)
-        accents.sort()
-        return accents
-
-    term = entry[0]
-    reading = entry[1] if entry[1] else term
-    pos = entry[2] if len(entry) > 2 else ""
-    frequency = entry[8] if freq and len(entry) > 8 else ""
-    starCount = entry[9] if freq and len(entry) > 9 else ""
-    definition = ""
-    pitch_accents = []
-
-    if len(entry) > 5 and isinstance(entry[5], list):
-        definition = extract_definition(entry[5])
-
-        header_section = find_header_section(entry[5])
-        if header_section:
-            pitch_accents = extract_pitch(header_section)
-
-    # Always create a 9-element tuple
-    jsonDict[count] = (
-        term,  # term
-        (
-            " ".join(str(p) for p in pitch_accents) if pitch_accents else ""
-        ),  # altterm (pitch accent)
-        reading,  # pronunciation
-        pos,  # part of speech
-        definition,  # definition
-        "",  # examples
-        "",  # audio
-        frequency,  # frequency
-        starCount,  # star count
-    )
-
-
-def kaner(to_translate, hiraganer=False):
-    hiragana = (
-        "がぎぐげござじずぜぞだぢづでどばびぶべぼぱぴぷぺぽ"
-        "あいうえおかきくけこさしすせそたちつてと"
-        "なにぬねのはひふへほまみむめもやゆよらりるれろ"
-        "わをんぁぃぅぇぉゃゅょっゐゑ"
-    )
-    katakana = (
-        "ガギグゲゴザジズゼゾダヂヅデドバビブベボパピプペポ"
-        "アイウエオカキクケコサシスセソタチツテト"
-        "ナニヌネノハヒフヘホマミムメモヤユヨラリルレロ"
-        "ワヲンァィゥェォャュョッヰヱ"
-    )
-    if hiraganer:
-        katakana = [ord(char) for char in katakana]
-        translate_table = dict(zip(katakana, hiragana))
-        return to_translate.translate(translate_table)
-    else:
-        hiragana = [ord(char) for char in hiragana]
-        translate_table = dict(zip(hiragana, katakana))
-        return to_translate.translate(translate_table)
-
-
-def adjustReading(reading):
-    return kaner(reading)
-
-
-def organizeDictionaryByFrequency(
-    jsonDict, frequencyDict, dictName, lang, miDict=False
-):
-    readingHyouki = frequencyDict.get("readingDictionaryType", False)
-
-    for idx, entry in enumerate(jsonDict):
-        if isinstance(entry, list):
-            term = entry[0] if len(entry) > 0 else ""
-            reading = entry[1] if len(entry) > 1 and isinstance(entry[1], str) else ""
-            details = (
-                entry[2] if len(entry) > 2 and isinstance(entry[2], dict) else None
-            )
-
-            if readingHyouki:
-                if details:
-                    reading = details.get("reading", "") or reading or term
-                adjusted = adjustReading(reading)
-            else:
-                adjusted = None
-
-            frequency = 999999
-            starCount = ""
-
-            if miDict and details is not None:
-                if readingHyouki and term in frequencyDict:
-                    if adjusted in frequencyDict[term]:
-                        frequency = frequencyDict[term][adjusted]
-                elif not readingHyouki and term in frequencyDict:
-                    frequency = frequencyDict[term]
-                details["frequency"] = frequency
-                details["starCount"] = getStarCount(frequency)
-            else:
-                if readingHyouki and term in frequencyDict:
-                    if adjusted in frequencyDict[term]:
-                        frequency = frequencyDict[term][adjusted]
-                elif not readingHyouki and term in frequencyDict:
-                    frequency = frequencyDict[term]
-
-                if len(entry) <= 8:
-                    entry.extend([frequency, getStarCount(frequency)])
-                else:
-                    entry[8] = frequency
-                    entry[9] = getStarCount(frequency)
-
-        else:
-            continue
-
-    if miDict:
-        # For miDict, handle both processed tuples and raw dict entries
-        def get_frequency(item):
-            if isinstance(item, tuple) and len(item) > 7:
-                # Already processed entry
-                return item[7] if item[7] != "" else 999999
-            elif isinstance(item, list) and len(item) > 2 and isinstance(item[2], dict):
-                # Raw dict entry
-                return item[2].get("frequency", 999999)
-            else:
-                return 999999
-
-        return sorted(jsonDict, key=get_frequency)
-    else:
-        return sorted(jsonDict, key=lambda i: i[8] if len(i) > 8 else 999999)
-
-
-def getStarCount(freq):
-    if freq < 1501:
-        return "★★★★★"
-    elif freq < 5001:
-        return "★★★★"
-    elif freq < 15001:
-        return "★★★"
-    elif freq < 30001:
-        return "★★"
-    elif freq < 60001:
-        return "★"
-    else:
-        return ""
-
-
-def getFrequencyList(lang):
+    mw.miDictDB.beginBulkImport()
+    try:
+        mw.miDictDB.importToDict(tableName, iterDictRows(zfile, filenames, miDict))
+        mw.miDictDB.applyFrequencyList(lang, [tableName])
+    finally:
+        # Index whatever was loaded so the table is never left without indexes.
+        mw.miDictDB.finishBulkImport(tableName)
+
+
+def loadFrequencyList(lang):
+    """Make sure a language's frequency file has been imported into the database."""
+    db = mw.miDictDB
+    if db.hasFrequencyList(lang):
+        return True
     filePath = os.path.join(
         addon_path, "user_files", "db", "frequency", "%s.json" % lang
     )
-    frequencyDict = {}
-    if os.path.exists(filePath):
-        frequencyList = json.load(open(filePath, "r", encoding="utf-8-sig"))
-        if isinstance(frequencyList[0], str):
-            yomi = False
-            frequencyDict["readingDictionaryType"] = False
-        elif (
-            isinstance(frequencyList[0], list)
-            and len(frequencyList[0]) == 2
-            and isinstance(frequencyList[0][0], str)
-            and isinstance(frequencyList[0][1], str)
-        ):
-            yomi = True
-            frequencyDict["readingDictionaryType"] = True
-        else:
-            return False
-        for idx, f in enumerate(frequencyList):
-            if yomi:
-                if f[0] in frequencyDict:
-                    frequencyDict[f[0]][f[1]] = idx
-                else:
-                    frequencyDict[f[0]] = {}
-                    frequencyDict[f[0]][f[1]] = idx
-            else:
-                frequencyDict[f] = idx
-        return frequencyDict
-    else:
-        return False
+    return os.path.exists(filePath) and db.loadFrequencyFile(lang, filePath)
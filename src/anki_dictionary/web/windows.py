@@ -1,3 +1,4 @@
+import aqt
 import os
 from enum import Enum
 from aqt.qt import *
@@ -87,8 +88,15 @@ class FreqConjWebWindow(QDialog):
             f.write(data)
 
         if self.mode == self.Mode.Freq:
+            db = aqt.mw.miDictDB
+            if not db.loadFrequencyFile(self.dst_lang, dst_path):
+                QMessageBox.information(
+                    self, self.windowTitle(), "Importing frequency data failed."
+                )
+                return
+            db.applyFrequencyList(self.dst_lang)
             msg = (
-                'Imported frequency data for "%s".\n\nNote that the frequency data is only applied to newly imported dictionaries for this language.'
+                'Imported frequency data for "%s".\n\nThe frequency data was applied to all dictionaries of this language.'
                 % self.dst_lang
             )
         else:
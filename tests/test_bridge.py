@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the web view message bridge
+"""
+
+import json
+import unittest
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.bridge import Bridge, encodeMessages, jsCall
+
+
+class TestBridge(unittest.TestCase):
+    """Test message dispatch and JavaScript calls."""
+
+    def test_dispatch_batch(self):
+        """Test that every message of a batch reaches its handler."""
+        received = []
+        bridge = Bridge()
+        bridge.register("addDef", lambda dictName, word, text: received.append((dictName, word, text)))
+        bridge.register("loaded", lambda: received.append("loaded"))
+        message = encodeMessages(
+            [("loaded", {}), ("addDef", {"dictName": "D", "word": "w", "text": "a◳◴b's"})]
+        )
+        self.assertEqual(bridge.handle(message), 2)
+        self.assertEqual(received, ["loaded", ("D", "w", "a◳◴b's")])
+
+    def test_rejects_unknown(self):
+        """Test that other versions, unknown actions and non-bridge messages are ignored."""
+        bridge = Bridge()
+        bridge.register("loaded", lambda: None)
+        self.assertEqual(bridge.handle("updateTerm:word"), 0)
+        self.assertEqual(
+            bridge.handle("bridge:" + json.dumps({"v": 2, "messages": []})), 0
+        )
+        self.assertEqual(bridge.handle(encodeMessages([("missing", {}), ("loaded", {})])), 1)
+
+    def test_failing_handler_keeps_batch(self):
+        """Test that a handler raising does not stop the later messages of its batch."""
+        received = []
+        bridge = Bridge()
+
+        def addDef(dictName, word, text):
+            raise RuntimeError("no note type")
+
+        bridge.register("addDef", addDef)
+        bridge.register("updateTerm", lambda term: received.append(term))
+        message = encodeMessages(
+            [("addDef", {"dictName": "D", "word": "w", "text": "t"}), ("updateTerm", {"term": "食べる"})]
+        )
+        self.assertEqual(bridge.handle(message), 1)
+        self.assertEqual(received, ["食べる"])
+
+    def test_js_call(self):
+        """Test that arguments are passed as JSON literals."""
+        self.assertEqual(
+            jsCall("addNewTab", "<b class='x'>\n</b>", "食べる", True, 3),
+            'addNewTab("<b class=\'x\'>\\n</b>","食べる",true,3);',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
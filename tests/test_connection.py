@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the background jobs and reader pool of the dictionary database
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.connection import (
+    ConnectionProfile,
+    DefinitionMigrationJob,
+    ReaderPool,
+)
+from anki_dictionary.core.importer import normalizeDefinition
+
+
+class TestDefinitionMigration(unittest.TestCase):
+    """Test filling in definitionHtml of tables from older versions."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.dbFile = os.path.join(self.root, "dictionaries.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def runJob(self, tables):
+        job = DefinitionMigrationJob(self.dbFile, ConnectionProfile(), tables, 1)
+        job.run()
+
+    def test_migrates_table_without_id(self):
+        """Test that a table created before the id column is migrated by rowid."""
+        conn = sqlite3.connect(self.dbFile)
+        conn.execute(
+            "CREATE TABLE l1nameOld (term CHAR(40) NOT NULL, altterm CHAR(40), pronunciation CHAR(100), pos CHAR(40), definition TEXT, examples TEXT, audio TEXT, frequency MEDIUMINT, starCount TEXT);"
+        )
+        conn.executemany(
+            "INSERT INTO l1nameOld (term, definition) VALUES (?, ?);",
+            [("t%d" % i, "line one\nline two %d" % i) for i in range(5000)],
+        )
+        conn.execute("ALTER TABLE l1nameOld ADD COLUMN definitionHtml TEXT;")
+        conn.commit()
+        conn.close()
+
+        self.runJob(["l1nameOld"])
+
+        conn = sqlite3.connect(self.dbFile)
+        self.assertEqual(
+            conn.execute(
+                "SELECT COUNT(*) FROM l1nameOld WHERE definitionHtml IS NULL;"
+            ).fetchone()[0],
+            0,
+        )
+        self.assertEqual(
+            conn.execute(
+                "SELECT definitionHtml FROM l1nameOld WHERE term = 't7';"
+            ).fetchone()[0],
+            normalizeDefinition("line one\nline two 7"),
+        )
+        self.assertEqual(conn.execute("PRAGMA user_version;").fetchone()[0], 1)
+        conn.close()
+
+    def test_version_kept_after_failure(self):
+        """Test that the schema version is not stored while a table failed to migrate."""
+        conn = sqlite3.connect(self.dbFile)
+        conn.execute("CREATE TABLE l1nameBroken (term CHAR(40), definition TEXT);")
+        conn.execute("INSERT INTO l1nameBroken VALUES ('a', 'b');")
+        conn.commit()
+        conn.close()
+
+        self.runJob(["l1nameBroken", "l1nameDeleted"])
+
+        conn = sqlite3.connect(self.dbFile)
+        self.assertEqual(conn.execute("PRAGMA user_version;").fetchone()[0], 0)
+        conn.close()
+
+
+class TestReaderPool(unittest.TestCase):
+    """Test the pool of read-only connections."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.dbFile = os.path.join(self.root, "dictionaries.sqlite")
+        self.writer = sqlite3.connect(self.dbFile, check_same_thread=False)
+        ConnectionProfile().apply(self.writer)
+        self.writer.execute("CREATE TABLE langnames (id INTEGER PRIMARY KEY, langname TEXT);")
+        self.writer.execute("INSERT INTO langnames (langname) VALUES ('Japanese');")
+        self.writer.commit()
+        self.pool = ReaderPool(self.dbFile, ConnectionProfile(), size=3)
+
+    def tearDown(self):
+        self.pool.close()
+        self.writer.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_read_only(self):
+        """Test that pooled connections cannot write."""
+        with self.pool.cursor() as cursor:
+            with self.assertRaises(sqlite3.OperationalError):
+                cursor.execute("INSERT INTO langnames (langname) VALUES ('German');")
+
+    def test_waits_for_free_connection(self):
+        """Test that a cursor beyond the pool size waits until one is released."""
+        first = ExitStack()
+        first.enter_context(self.pool.cursor())
+        acquired = threading.Event()
+
+        def read():
+            with self.pool.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM langnames;")
+                acquired.set()
+
+        with ExitStack() as others:
+            for _ in range(2):
+                others.enter_context(self.pool.cursor())
+            reader = threading.Thread(target=read)
+            reader.start()
+            self.assertFalse(acquired.wait(0.2))
+            first.close()
+            self.assertTrue(acquired.wait(5))
+            reader.join()
+        self.assertEqual(len(self.pool.connections), 3)
+
+    def test_uncommitted_rows_hidden(self):
+        """Test that readers only see rows the writer has committed."""
+        self.writer.execute("INSERT INTO langnames (langname) VALUES ('German');")
+        with self.pool.cursor() as cursor:
+            cursor.execute("SELECT langname FROM langnames ORDER BY id;")
+            self.assertEqual(cursor.fetchall(), [("Japanese",)])
+        self.writer.commit()
+        with self.pool.cursor() as cursor:
+            cursor.execute("SELECT langname FROM langnames ORDER BY id;")
+            self.assertEqual(cursor.fetchall(), [("Japanese",), ("German",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
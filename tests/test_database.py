@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Tests for dictionary table imports and lookups
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add src and scripts directories to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from create_empty_db import create_empty_database
+
+try:
+    from anki_dictionary.core.database import FTS_SEARCH_TYPES, DictDB
+except ImportError as e:
+    DictDB = None
+    importError = e
+
+ROWS_A = [
+    ("食べ物", "", "たべもの", "n", "食べる物。「食べ物を買う」", "", "", 5, "", None),
+    ("食べる", "", "たべる", "v", "口に入れる。「ご飯を食べる」", "", "", 2, "", None),
+    ("飲み物", "", "のみもの", "n", "飲む物", "", "", 8, "", None),
+    ("物語", "", "ものがたり", "n", "話。「長い物語」", "", "", 3, "", None),
+    ("abcdef", "abc", "abcdef", "n", "letters abc", "", "", 7, "", None),
+    ("xabcx", "", "xabcx", "n", "more letters", "", "", 1, "", None),
+]
+ROWS_B = [
+    ("食べ物屋", "", "たべものや", "n", "食べ物を売る店", "", "", 4, "", None),
+    ("abc", "", "abc", "n", "「abcの歌」", "", "", 6, "", None),
+]
+SEARCH_TERMS = ["abc", "bcd", "食べ物", "べ物", "物", "食べる", "letters", "歌"]
+FREQUENCY_ROWS = [
+    ("食べる", "", "たべる", "v", "eat", "", "", "", "", None),
+    ("飲む", "", "のむ", "v", "drink", "", "", "", "", None),
+    ("走る", "", "はしる", "v", "run", "", "", "", "", None),
+    ("見る", "", "みる", "v", "see", "", "", "", "", None),
+    ("見る", "", "けん", "n", "other reading", "", "", "", "", None),
+    ("未知", "", "みち", "n", "unlisted", "", "", "", "", None),
+]
+
+
+def rankedList(ranked, size):
+    """Build a frequency list with the given entries at their ranks and filler elsewhere."""
+    frequencyList = ["filler%d" % i for i in range(size)]
+    for rank, entry in ranked.items():
+        frequencyList[rank] = entry
+    return frequencyList
+
+
+class TestDictDB(unittest.TestCase):
+    """Test searches narrowed through the FTS5 index against plain LIKE searches."""
+
+    def setUp(self):
+        if DictDB is None:
+            self.skipTest(f"Anki dependencies not available: {importError}")
+        self.root = tempfile.mkdtemp()
+        self.dbFile = os.path.join(self.root, "dictionaries.sqlite")
+        create_empty_database(self.dbFile)
+        self.db = DictDB(self.dbFile)
+        self.db.migrationJob.join()
+        if not self.db.ftsEnabled:
+            self.db.closeConnection()
+            self.skipTest("SQLite was built without FTS5 trigram support")
+        self.db.addLanguages(["Japanese"])
+        # A is indexed as it is imported, B is indexed after a bulk import.
+        self.db.addDict("A", "Japanese", "[]")
+        self.db.importToDict("l1nameA", ROWS_A)
+        self.db.commitChanges()
+        self.db.addDict("B", "Japanese", "[]", deferIndexes=True)
+        self.db.beginBulkImport()
+        self.db.importToDict("l1nameB", ROWS_B)
+        self.db.finishBulkImport("l1nameB")
+
+    def tearDown(self):
+        self.db.closeConnection()
+        if self.db.vacuumJob is not None:
+            self.db.vacuumJob.join()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def search(self, term, sT, dictionaries=("l1nameA", "l1nameB")):
+        group = {"dictionaries": [{"dict": d, "lang": "Japanese"} for d in dictionaries]}
+        return self.db.searchGroup(term, group, {}, sT, False, "50", 100)
+
+    def test_fts_matches_like(self):
+        """Test that FTS-narrowed searches find exactly what LIKE searches find."""
+        found = {}
+        for sT in FTS_SEARCH_TYPES:
+            for term in SEARCH_TERMS:
+                found[(sT, term)] = self.search(term, sT)
+        self.db.ftsEnabled = False
+        self.db.ftsTables = None
+        for (sT, term), results in found.items():
+            self.assertEqual(results, self.search(term, sT), (sT, term))
+        self.assertEqual(
+            [r["term"] for r in found[("Anywhere", "abc")]["A"]], ["xabcx", "abcdef"]
+        )
+        self.assertEqual([r["term"] for r in found[("Backward", "べ物")]["A"]], ["食べ物"])
+        self.assertEqual([r["term"] for r in found[("Example", "歌")]["B"]], ["abc"])
+
+    def test_fts_term_length(self):
+        """Test that only searches for terms of at least three characters use FTS."""
+        self.assertTrue(self.db.canUseFts("l1nameA", ["食べ物"], "Anywhere"))
+        self.assertTrue(self.db.canUseFts("l1nameB", ["abc", "Abc"], "Definition"))
+        self.assertFalse(self.db.canUseFts("l1nameA", ["べ物"], "Anywhere"))
+        self.assertFalse(self.db.canUseFts("l1nameA", ["食べ物", "べ物"], "Backward"))
+        self.assertFalse(self.db.canUseFts("l1nameA", ["食べ物"], "Forward"))
+
+    def test_group_results_by_dictionary(self):
+        """Test that the rows of one UNION ALL statement go back to their dictionaries."""
+        results = self.search("食べ物", "Forward")
+        self.assertEqual([r["term"] for r in results["A"]], ["食べ物"])
+        self.assertEqual([r["term"] for r in results["B"]], ["食べ物屋"])
+        self.assertIn("食べ物を売る店", results["B"][0]["definition"])
+
+    def test_broken_dictionary_fallback(self):
+        """Test that a missing table does not hide the other dictionaries' results."""
+        results = self.search("abc", "Anywhere", ("l1nameMissing", "l1nameB"))
+        self.assertEqual(list(results), ["B"])
+        self.assertEqual([r["term"] for r in results["B"]], ["abc"])
+
+    def test_drop_removes_fts_index(self):
+        """Test that deleting a dictionary drops its FTS index and shadow tables."""
+        self.db.deleteDict("l1nameA")
+        cursor = self.db.conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'l1nameA%';")
+        self.assertEqual(cursor.fetchall(), [])
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'l1nameB_fts';")
+        self.assertEqual(len(cursor.fetchall()), 1)
+        self.assertFalse(self.db.hasFtsIndex("l1nameA"))
+
+
+class TestFrequencyList(unittest.TestCase):
+    """Test back-filling frequency ranks and star counts from a frequency list."""
+
+    def setUp(self):
+        if DictDB is None:
+            self.skipTest(f"Anki dependencies not available: {importError}")
+        self.root = tempfile.mkdtemp()
+        self.dbFile = os.path.join(self.root, "dictionaries.sqlite")
+        create_empty_database(self.dbFile)
+        self.db = DictDB(self.dbFile)
+        self.db.migrationJob.join()
+        self.db.addLanguages(["Japanese"])
+        self.db.addDict("F", "Japanese", "[]", deferIndexes=True)
+
+    def tearDown(self):
+        self.db.closeConnection()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def ranks(self):
+        cursor = self.db.conn.cursor()
+        cursor.execute("SELECT frequency, starCount FROM l1nameF ORDER BY id;")
+        return cursor.fetchall()
+
+    def test_reading_list(self):
+        """Test a [term, reading] list, with hiragana readings matched in katakana.
+
+        The expected ranks and stars are what organizeDictionaryByFrequency and
+        getStarCount produced before frequency lists moved into the database.
+        """
+        self.db.importFrequencyList(
+            "Japanese",
+            rankedList(
+                {
+                    0: ["食べる", "タベル"],
+                    1600: ["飲む", "ノム"],
+                    20000: ["走る", "ハシル"],
+                    70000: ["見る", "ミル"],
+                },
+                70001,
+            ),
+        )
+        self.db.beginBulkImport()
+        self.db.importToDict("l1nameF", FREQUENCY_ROWS)
+        self.db.applyFrequencyList("Japanese", ["l1nameF"])
+        # The bulk loaded rows are only committed once they are indexed.
+        self.assertTrue(self.db.conn.in_transaction)
+        self.db.finishBulkImport("l1nameF")
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(
+            self.ranks(),
+            [
+                (0, "★★★★★"),
+                (1600, "★★★★"),
+                (20000, "★★"),
+                (70000, ""),
+                (999999, ""),
+                (999999, ""),
+            ],
+        )
+
+    def test_plain_list(self):
+        """Test a list of terms, which ranks every reading of a term alike."""
+        self.db.importToDict("l1nameF", FREQUENCY_ROWS)
+        self.db.commitChanges()
+        self.db.importFrequencyList(
+            "Japanese", rankedList({0: "食べる", 5000: "見る", 14000: "走る"}, 14001)
+        )
+        self.db.applyFrequencyList("Japanese")
+        self.assertEqual(
+            self.ranks(),
+            [
+                (0, "★★★★★"),
+                (999999, ""),
+                (14000, "★★★"),
+                (5000, "★★★★"),
+                (5000, "★★★★"),
+                (999999, ""),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
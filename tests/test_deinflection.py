@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the conjugation rule deinflector
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.deinflection import Deinflector
+
+
+class TestDeinflector(unittest.TestCase):
+    """Test suffix matching and chained deinflection."""
+
+    def test_single_rule(self):
+        """Test that a matching suffix is replaced by every dictionary form."""
+        deinflector = Deinflector([{"inflected": "かった", "dict": ["い"]}])
+        self.assertEqual(deinflector.deinflect(["高かった"]), ["高かった", "高い"])
+
+    def test_no_match_keeps_terms(self):
+        """Test that terms without a matching rule are returned unchanged."""
+        deinflector = Deinflector([{"inflected": "ます", "dict": ["る"]}])
+        self.assertEqual(deinflector.deinflect(["食べた"]), ["食べた"])
+
+    def test_prefix(self):
+        """Test that rules with a prefix also produce the deprefixed form."""
+        deinflector = Deinflector(
+            [{"inflected": "ません", "dict": ["る"], "prefix": "お"}]
+        )
+        self.assertEqual(
+            deinflector.deinflect(["お食べません"]),
+            ["お食べません", "食べる", "お食べる"],
+        )
+
+    def test_chained_rules(self):
+        """Test that deinflected candidates are deinflected again."""
+        deinflector = Deinflector(
+            [
+                {"inflected": "た", "dict": ["る"]},
+                {"inflected": "られる", "dict": ["る"]},
+            ]
+        )
+        self.assertEqual(
+            deinflector.deinflect(["食べさせられた"]),
+            ["食べさせられた", "食べさせられる", "食べさせる"],
+        )
+
+    def test_candidate_limit(self):
+        """Test that the number of candidates is bounded."""
+        rules = [{"inflected": "s", "dict": [str(i) for i in range(100)]}]
+        deinflector = Deinflector(rules, maxCandidates=10)
+        self.assertEqual(len(deinflector.deinflect(["words"])), 11)
+
+
+if __name__ == "__main__":
+    unittest.main()
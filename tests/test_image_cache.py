@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the image search cache
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.integrations.image_cache import ImageCache
+
+
+class TestImageCache(unittest.TestCase):
+    """Test lookups, expiry and eviction."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_url_lists_by_page(self):
+        """Test that URL lists are kept per term, region and offset."""
+        cache = ImageCache(self.root)
+        cache.putUrls("食べる", "jp-ja", 0, ["https://a/1.jpg", "https://a/2.jpg"])
+        self.assertEqual(
+            cache.getUrls("食べる", "jp-ja", 0), ["https://a/1.jpg", "https://a/2.jpg"]
+        )
+        self.assertIsNone(cache.getUrls("食べる", "jp-ja", 15))
+        self.assertIsNone(cache.getUrls("食べる", "us-en", 0))
+
+    def test_thumbnails_expire(self):
+        """Test that a thumbnail older than its time to live is removed."""
+        cache = ImageCache(self.root, thumbnailDays=1)
+        path = cache.putThumbnail("https://a/1.jpg", b"jpeg")
+        self.assertEqual(cache.getThumbnail("https://a/1.jpg"), path)
+        old = time.time() - 2 * 86400
+        os.utime(path, (old, old))
+        self.assertIsNone(cache.getThumbnail("https://a/1.jpg"))
+        self.assertFalse(os.path.exists(path))
+
+    def test_evicts_least_recently_used(self):
+        """Test that the files used longest ago are removed over the size limit."""
+        cache = ImageCache(self.root)
+        cache.maxSize = 3500
+        now = time.time()
+        paths = []
+        for i in range(3):
+            path = cache.putThumbnail("https://a/%d.jpg" % i, b"x" * 1000)
+            os.utime(path, (now - 100 + i, now))
+            paths.append(path)
+        self.assertIsNotNone(cache.getThumbnail("https://a/0.jpg"))
+        cache.putThumbnail("https://a/3.jpg", b"x" * 1000)
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertFalse(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+        self.assertLessEqual(cache.size, cache.maxSize)
+
+
+if __name__ == "__main__":
+    unittest.main()
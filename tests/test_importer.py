@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Tests for converting dictionary bank files
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.importer import convertBank
+
+
+class TestConvertBank(unittest.TestCase):
+    """Test turning bank entries into table rows."""
+
+    def test_skips_unrecognized_entries(self):
+        """Test that an entry in an unknown format does not stop the import."""
+        rows = convertBank(
+            [
+                {"term": "a", "definition": "first"},
+                "not an entry",
+                {"term": "b", "definition": "second"},
+            ],
+            miDict=True,
+        )
+        self.assertEqual([row[0] for row in rows], ["a", "b"])
+        self.assertEqual(len(rows[0]), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
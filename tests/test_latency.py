@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the lookup latency histograms
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.latency import LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test recording and summarizing phase timings."""
+
+    def test_buckets(self):
+        """Test that timings are counted in their millisecond bucket."""
+        histogram = LatencyHistogram(["query"], buckets=(1, 10, 100))
+        for seconds in (0.0005, 0.005, 0.006, 0.05, 0.5):
+            histogram.record("query", seconds)
+        stats = histogram.getStats()["query"]
+        self.assertEqual(stats["buckets"], [1, 2, 1, 1])
+        self.assertEqual(stats["count"], 5)
+        self.assertAlmostEqual(stats["maxMs"], 500.0)
+
+    def test_percentiles(self):
+        """Test that percentiles are bucket bounds, capped at the slowest timing."""
+        histogram = LatencyHistogram(["render"], buckets=(1, 10, 100))
+        for _ in range(19):
+            histogram.record("render", 0.002)
+        histogram.record("render", 0.05)
+        stats = histogram.getStats()["render"]
+        self.assertEqual(stats["p50Ms"], 10.0)
+        self.assertEqual(stats["p95Ms"], 10.0)
+        histogram.record("render", 0.3)
+        self.assertEqual(histogram.percentile("render", 1.0), 300.0)
+
+    def test_empty_and_reset(self):
+        """Test that phases without timings report zeros."""
+        histogram = LatencyHistogram(["eval"])
+        histogram.record("eval", 0.01)
+        histogram.reset()
+        stats = histogram.getStats()["eval"]
+        self.assertEqual((stats["count"], stats["p50Ms"], stats["meanMs"]), (0, 0.0, 0.0))
+        self.assertIn("eval", histogram.format())
+
+
+if __name__ == "__main__":
+    unittest.main()
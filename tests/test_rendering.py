@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests for the results page templates
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from anki_dictionary.core.deinflection import Deinflector
+from anki_dictionary.core.rendering import (
+    DeferredEntries,
+    Highlighter,
+    ResultsPage,
+    compileHeader,
+)
+
+
+class FakeView:
+    """Minimal dictionary view with the helpers used by the results page."""
+
+    def __init__(self):
+        self.config = {
+            "frontBracket": "[",
+            "backBracket": "]",
+            "tooltips": False,
+            "highlightTarget": False,
+        }
+        self.termHeaders = None
+        self.conjugations = {}
+        self.deinflect = True
+
+    def getBase64Icon(self, icon_name):
+        return "data:" + icon_name
+
+    def highlightExamples(self, text):
+        return text
+
+    def getDuplicateHeaderCB(self, dictName):
+        return ""
+
+    def getOverwriteChecks(self, dictCount, dictName):
+        return ""
+
+    def getFieldChecks(self, dictName):
+        return ""
+
+
+class TestRendering(unittest.TestCase):
+    """Test template compilation and escaping."""
+
+    def test_markup_not_escaped(self):
+        """Test that quotes and newlines are kept, as pages are sent as JSON."""
+        self.assertEqual(compileHeader("it's\n◳t").render(t="a"), "it's\na")
+
+    def test_compile_header(self):
+        """Test that ◳ placeholders become template slots."""
+        header = compileHeader("◳f<b>◳t</b>◳b{◳p}")
+        self.assertEqual(
+            header.render(f="[", t="食べる", b="]", p="たべる"), "[<b>食べる</b>]{たべる}"
+        )
+
+    def test_render_entry(self):
+        """Test that an entry is rendered once into the side bar and the main display."""
+        page = ResultsPage(FakeView())
+        html = page.render(
+            {
+                "Test_Dict": [
+                    {
+                        "term": "食べる",
+                        "altterm": "",
+                        "pronunciation": "たべる",
+                        "starCount": "★",
+                        "definition": "to eat\nsomebody's food",
+                    }
+                ]
+            },
+            "食べる",
+            " ",
+        )
+        self.assertIn('<div data-index="0" class="listTitle">Test_Dict</div>', html)
+        self.assertIn('class="dictionaryTitle">Test Dict</div>', html)
+        self.assertIn('data-dictname="Test_Dict" class="dictionaryTitleBlock"', html)
+        self.assertIn("to eat\nsomebody's food", html)
+        self.assertEqual(html.count('<span class="listPronunciation">たべる</span>'), 1)
+
+    def test_entry_boilerplate(self):
+        """Test that entries carry no inline handlers, tooltips or icons."""
+        view = FakeView()
+        view.config["tooltips"] = True
+        entry = {
+            "term": "a",
+            "altterm": "",
+            "pronunciation": "",
+            "starCount": "",
+            "definition": "b",
+        }
+        html = ResultsPage(view).render({"Dict": [entry] * 3}, "a", " ")
+        main = html[html.index("mainDictDisplay"):]
+        self.assertIn('data-tooltips="true"', main)
+        self.assertNotIn("onclick", main)
+        self.assertNotIn("title=", main)
+        self.assertNotIn("data:", main)
+
+    def test_highlight_outside_tags(self):
+        """Test that terms are marked in text but not inside tags."""
+        highlighter = Highlighter(["eat"])
+        self.assertEqual(
+            highlighter.highlight('<a title="eat">eat</a> eaten'),
+            '<a title="eat"><span class="targetTerm">eat</span></a> eaten',
+        )
+
+    def test_highlight_cjk(self):
+        """Test that CJK terms are marked without word boundaries."""
+        self.assertEqual(
+            Highlighter(["食べ"]).highlight("食べ物"),
+            '<span class="targetTerm">食べ</span>物',
+        )
+
+    def test_highlight_deinflected(self):
+        """Test that deinflected forms found in the results are marked too."""
+        view = FakeView()
+        view.config["highlightTarget"] = True
+        view.conjugations = {"ja": Deinflector([{"inflected": "た", "dict": ["る"]}])}
+        entry = {
+            "term": "食べる",
+            "altterm": "",
+            "pronunciation": "",
+            "starCount": "",
+            "definition": "食べる, 食べた",
+        }
+        html = ResultsPage(view).render({"Dict": [entry]}, "食べた", " ")
+        self.assertIn(
+            '<span class="targetTerm">食べる</span>, <span class="targetTerm">食べた</span>',
+            html,
+        )
+
+    def test_render_appended_dictionaries(self):
+        """Test that dictionaries rendered after the page continue its numbering."""
+        entry = {
+            "term": "a",
+            "altterm": "",
+            "pronunciation": "",
+            "starCount": "",
+            "definition": "b",
+        }
+        sideBar, main, dictCount, entryCount = ResultsPage(
+            FakeView()
+        ).renderDictionaries({"Second": [entry] * 2}, "a", " ", 1, 3)
+        self.assertEqual((dictCount, entryCount), (2, 5))
+        self.assertIn('<div data-index="1" class="listTitle">Second</div>', sideBar)
+        self.assertIn('<li data-index="4">', sideBar)
+        self.assertNotIn("definitionSideBar", sideBar)
+        self.assertIn('<div data-index="3" class="termPronunciation">', main)
+        self.assertNotIn("mainDictDisplay", main)
+
+    def test_deferred_entries(self):
+        """Test that entries beyond the inline budget are left as pages to request."""
+        entries = [
+            {
+                "term": "a" + str(i),
+                "altterm": "",
+                "pronunciation": "",
+                "starCount": "",
+                "definition": "def" + str(i),
+            }
+            for i in range(7)
+        ]
+        page = ResultsPage(FakeView())
+        deferred = DeferredEntries(pageSize=3, inline=2)
+        sideBar, main, _, entryCount = page.renderDictionaries(
+            {"One": entries[:1], "Two": entries[1:]}, "a", " ", 0, 0, deferred=deferred
+        )
+        self.assertEqual(entryCount, 7)
+        self.assertEqual(sideBar.count("<li "), 7)
+        self.assertEqual(main.count('class="definitionBlock"'), 2)
+        self.assertIn('<div class="entryPage" data-start="2" data-end="5" data-count="3">', main)
+        self.assertIn('<div class="entryPage" data-start="5" data-end="7" data-count="2">', main)
+        html = page.renderEntryPage(deferred, 5)
+        self.assertIn('<div data-index="6" class="termPronunciation">', html)
+        self.assertIn("def6", html)
+        self.assertNotIn("def4", html)
+        self.assertIsNone(page.renderEntryPage(deferred, 4))
+
+    def test_render_images_with_settings(self):
+        """Test that given settings are used instead of asking the view."""
+        view = FakeView()
+        view.getFieldChecks = None
+        sideBar, main, dictCount, entryCount = ResultsPage(view).renderDictionaries(
+            {"Images": True}, "a", " ", 0, 0, {"Images": "<i>settings</i>"}, "gcon1_0"
+        )
+        self.assertEqual((dictCount, entryCount), (1, 1))
+        self.assertIn('data-dictname="Images"', main)
+        self.assertIn("<i>settings</i>", main)
+        self.assertIn('<div class="imageBlock" id="gcon1_0">Loading...</div>', main)
+
+    def test_no_results(self):
+        """Test the page shown when nothing was found."""
+        html = ResultsPage(FakeView()).render({}, "it's", " ")
+        self.assertIn("No dictionary entries were found for \"it's\"", html)
+
+
+if __name__ == "__main__":
+    unittest.main()